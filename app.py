@@ -1,6 +1,18 @@
+import threading
 from src.ui.chat_ui import demo as gradio_app  # UPDATED IMPORT PATH
 
+def warm_up_model():
+    # Imported here so requests and the summarizer modules load off the path to the window
+    from src.utils.map_reduce_summarizer import DEFAULT_NUM_CTX
+    from src.utils.model_health import get_model_health
+    # Load the model with the same num_ctx the daily summary uses,
+    # so the first request does not wait for a cold model load
+    result = get_model_health(num_ctx=DEFAULT_NUM_CTX).warm_up()
+    if not result['status']:
+        print(result['message'])
+
 if __name__ == "__main__":
+    threading.Thread(target=warm_up_model, name="model-warm-up", daemon=True).start()
     try:
         gradio_app.launch(
             prevent_thread_lock=False,  # Changed to False to block main thread
@@ -10,4 +22,4 @@ if __name__ == "__main__":
         print("Application stopped by user")
     except Exception as e:
         print(f"Error launching application: {e}")
-        input("Press Enter to exit...")  # Keep window open to see error
\ No newline at end of file
+        input("Press Enter to exit...")  # Keep window open to see error
@@ -0,0 +1,56 @@
+"""
+Headless batch mode: daily updates for a whole team, from a manifest of authors, repositories and
+date windows (see src/activities/team_update_activity.py for the format). Results are appended to a
+JSONL file as they finish; running the same command again resumes an interrupted batch.
+
+Usage:
+    python batch.py team.json --output reports.jsonl
+    python batch.py team.json --output reports.jsonl --workers 2 --no-resume
+    python batch.py team.json --output reports.jsonl --repo-timeout 0
+"""
+import argparse
+import sys
+from src.activities.team_update_activity import TeamUpdateActivity, load_manifest, DEFAULT_LLM_WORKERS
+from src.tools.git_tools import DEFAULT_MAX_WORKERS, DEFAULT_REPO_TIMEOUT
+from src.utils.map_reduce_summarizer import DEFAULT_NUM_CTX
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("manifest", help="JSON manifest of authors, repos and windows")
+    parser.add_argument("--output", required=True, help="JSONL file the results are appended to")
+    parser.add_argument("--workers", type=int, default=DEFAULT_LLM_WORKERS, help="Model calls running at the same time")
+    parser.add_argument("--git-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Repositories read at the same time")
+    parser.add_argument("--repo-timeout", type=float, default=DEFAULT_REPO_TIMEOUT,
+                        help="Seconds to wait for each repository, from when its read starts (0 waits forever)")
+    parser.add_argument("--num-ctx", type=int, default=DEFAULT_NUM_CTX, help="Model context size")
+    parser.add_argument("--no-resume", action="store_true", help="Start a new results file instead of resuming")
+    args = parser.parse_args()
+
+    try:
+        items = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"Error reading manifest: {e}")
+        return 2
+
+    activity = TeamUpdateActivity(items, num_ctx=args.num_ctx, max_workers=args.workers, git_workers=args.git_workers,
+                                  repo_timeout=args.repo_timeout or None)
+
+    def on_result(result):
+        status = result.get("error") or f"{result['commits']} commits"
+        print(f"{result['id']}: {status} ({result['seconds']:.1f}s)", flush=True)
+
+    try:
+        counts = activity.run(args.output, resume=not args.no_resume, on_result=on_result)
+    except KeyboardInterrupt:
+        print("Batch interrupted; run the same command again to resume.")
+        return 130
+    finally:
+        activity.commit_cache.close()
+    if "message" in counts:
+        print(counts["message"])
+        return 1
+    print(f"Done: {counts['ok']} ok, {counts['error']} failed, {counts['skipped']} already finished.")
+    return 1 if counts["error"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
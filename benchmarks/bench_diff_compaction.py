@@ -0,0 +1,68 @@
+"""
+Benchmark: estimated prompt tokens of real-world diffs before and after diff compaction. Takes the
+per-file patches of the last commits of a repository (this one by default), as GitTools produces
+them for the file summaries, and compacts them with several context sizes.
+
+Usage:
+    python benchmarks/bench_diff_compaction.py --repo C:/src/api --commits 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, sysPath)
+from git import Repo
+from src.tools.git_diff import DiffLimits, EMPTY_TREE_SHA, iter_file_patches
+from src.utils.diff_compactor import compact_diffs
+
+
+def collect_patches(repo_dir, commits):
+    repo = Repo(repo_dir)
+    limits = DiffLimits()
+    patches = []
+    for commit in repo.iter_commits("HEAD", max_count=commits, no_merges=True):
+        parent = commit.parents[0].hexsha if commit.parents else EMPTY_TREE_SHA
+        for path, patch in iter_file_patches(repo, parent, commit.hexsha, limits=limits):
+            if patch:
+                patches.append((f"{commit.hexsha[:8]}:{path}", patch))
+    return patches
+
+
+def measure(patches, context_lines):
+    start = time.perf_counter()
+    compacted, stats = compact_diffs(dict(patches), context_lines=context_lines)
+    seconds = time.perf_counter() - start
+    savings = [1 - len(compacted[key]) / len(patch) for key, patch in patches]
+    return {
+        "seconds": round(seconds, 3),
+        "tokens_before": stats["tokens_before"],
+        "tokens_after": stats["tokens_after"],
+        "tokens_saved_pct": round(100 * (1 - stats["tokens_after"] / max(stats["tokens_before"], 1)), 1),
+        "median_file_saved_pct": round(100 * statistics.median(savings), 1) if savings else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repo", default=sysPath, help="Repository to take the diffs from")
+    parser.add_argument("--commits", type=int, default=100, help="Number of recent commits")
+    parser.add_argument("--context", type=int, nargs="+", default=[0, 1, 2, 3], help="Context sizes to compare")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    patches = collect_patches(args.repo, args.commits)
+    results = {f"context_{context_lines}": measure(patches, context_lines) for context_lines in args.context}
+    report = {"benchmark": "diff_compaction", "repo": args.repo, "commits": args.commits,
+              "patches": len(patches), "results": results}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: peak memory and patch text of GitTools diffs with and without DiffLimits, on a repository
+whose last commits add a large lockfile, a one-line minified bundle, a binary blob and a big source file.
+
+Usage:
+    python benchmarks/bench_diff_limits.py --megabytes 20
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, sysPath)
+from src.tools.git_diff import DiffLimits
+from src.tools.git_tools import GitTools, DIFF_MODE_COMMIT, DIFF_MODE_RANGE
+from tests.tools.git_repo_helpers import make_repo, commit_file, git
+
+
+def create_heavy_repo(parent_dir, megabytes):
+    repo_dir = make_repo(parent_dir, "heavy")
+    commit_file(repo_dir, "README.md", "# heavy\n", "Initial commit", date="2020-01-01T12:00:00")
+    size = megabytes * 1024 * 1024
+    commit_file(repo_dir, "package-lock.json", '{"dependency": "x"},\n' * (size // 20), "Update lockfile")
+    commit_file(repo_dir, "static/app.min.js", "var a=1;" * (size // 8), "Rebuild bundle")
+    with open(os.path.join(repo_dir, "assets.bin"), "wb") as f:
+        f.write(os.urandom(size))
+    git(repo_dir, "add", "assets.bin")
+    git(repo_dir, "commit", "-q", "-m", "Add assets")
+    commit_file(repo_dir, "src/big.py", "".join(f"value_{i} = {i}\n" for i in range(size // 20)), "Add big module")
+    return repo_dir
+
+
+def measure(repo_dir, since, diff_mode, limits):
+    git_tools = GitTools([repo_dir], diff_limits=limits)
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = git_tools.get_changes_since_date(since, with_diffs=True, diff_mode=diff_mode)[0]
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(seconds, 3),
+        "peak_mb": round(peak / 1024 / 1024, 2),
+        "patch_chars": sum(len(patch) for patch in result["diffs"].values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=int, default=10, help="Size of each large file")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    workspace = tempfile.mkdtemp(prefix="syl-bench-")
+    try:
+        repo_dir = create_heavy_repo(workspace, args.megabytes)
+        since = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        unlimited = DiffLimits(max_file_bytes=None, max_run_bytes=None, generated_globs=(), skip_binary=False)
+        results = {}
+        for diff_mode in (DIFF_MODE_COMMIT, DIFF_MODE_RANGE):
+            results[f"{diff_mode}.unlimited"] = measure(repo_dir, since, diff_mode, unlimited)
+            results[f"{diff_mode}.default_limits"] = measure(repo_dir, since, diff_mode, DiffLimits())
+        report = {"benchmark": "diff_limits", "megabytes_per_file": args.megabytes, "results": results}
+        print(json.dumps(report, indent=2))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: reading commit history with per-commit `commit.stats` versus one streamed
+`git log --numstat` pass.
+
+Usage:
+    python benchmarks/bench_git_history.py --commits 3000
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, sysPath)
+from git import Repo
+from benchmarks.synthetic_repos import create_synthetic_repo
+from src.tools.git_history import iter_commit_history
+
+
+def read_with_commit_stats(repo):
+    changed_files = set()
+    for commit in repo.iter_commits():
+        changed_files.update(commit.stats.files.keys())
+    return changed_files
+
+
+def read_with_numstat_stream(repo):
+    changed_files = set()
+    for record in iter_commit_history(repo):
+        changed_files.update(record["files"])
+    return changed_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commits", type=int, default=3000)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    workspace = tempfile.mkdtemp(prefix="syl-bench-")
+    try:
+        repo_dir = create_synthetic_repo(os.path.join(workspace, "repo"), commits=args.commits, files=args.files)
+        repo = Repo(repo_dir)
+
+        start = time.perf_counter()
+        expected = read_with_commit_stats(repo)
+        stats_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = read_with_numstat_stream(repo)
+        stream_seconds = time.perf_counter() - start
+        repo.close()
+
+        if actual != expected:
+            raise SystemExit("Streamed history returned different files than commit.stats")
+        results = {
+            "benchmark": "git_history",
+            "commits": args.commits,
+            "commit_stats_seconds": round(stats_seconds, 4),
+            "numstat_stream_seconds": round(stream_seconds, 4),
+            "speedup": round(stats_seconds / stream_seconds, 1) if stream_seconds else None,
+        }
+        print(json.dumps(results, indent=2))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Startup benchmark: time from starting the source entry point (app.py) to a served window, measured
+in fresh interpreters. Each run reports the interpreter start, the import of the entry point, the
+Gradio launch until the server answers, and which heavy modules were loaded by then; with --top the
+slowest imports from `python -X importtime` are listed as well.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 5 --top 15
+    python benchmarks/bench_startup.py --module src.ui.tools_list --no-launch
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Modules that should only be imported once a tool runs
+HEAVY_MODULES = ["git", "requests", "src.tools.git_tools", "src.activities.daily_update_activity",
+                 "src.ui.uitools.daily_summary_tool", "gradio"]
+
+# Runs in the child interpreter; prints one JSON line with its timings
+CHILD_SCRIPT = """
+import importlib, json, sys, time
+started = time.perf_counter()
+result = {}
+try:
+    module = importlib.import_module(MODULE)
+    result["import"] = time.perf_counter() - started
+    if LAUNCH:
+        import urllib.request
+        app = getattr(module, ATTRIBUTE)
+        app.launch(prevent_thread_lock=True, inbrowser=False, quiet=True)
+        urllib.request.urlopen(app.local_url, timeout=60).read()
+        result["launch"] = time.perf_counter() - started - result["import"]
+        app.close()
+except Exception as e:
+    result["error"] = f"{type(e).__name__}: {e}"
+result["loaded"] = {name: name in sys.modules for name in HEAVY_MODULES}
+print(json.dumps(result), flush=True)
+"""
+
+
+def child_script(module, attribute, launch):
+    return "\n".join([
+        f"MODULE = {module!r}",
+        f"ATTRIBUTE = {attribute!r}",
+        f"LAUNCH = {launch!r}",
+        f"HEAVY_MODULES = {HEAVY_MODULES!r}",
+        CHILD_SCRIPT,
+    ])
+
+
+def run_child(args, script):
+    """Run one fresh interpreter; returns its result with the wall time until it reported."""
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, *args, "-c", script], cwd=sysPath, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    lines = process.stdout.strip().splitlines()
+    if not lines:
+        raise SystemExit(f"The entry point produced no result:\n{process.stderr}")
+    result = json.loads(lines[-1])
+    result["wall"] = wall
+    return result, process.stderr
+
+
+def interpreter_start(repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def slowest_imports(importtime_output, top):
+    """Parse `python -X importtime` output into the top imports by cumulative time."""
+    imports = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if cumulative.isdigit():
+            imports.append((int(cumulative), name))
+    return [{"module": name, "cumulative_seconds": round(micro / 1e6, 4)}
+            for micro, name in sorted(imports, reverse=True)[:top]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app", help="Entry point module to import")
+    parser.add_argument("--attribute", default="gradio_app", help="The Gradio app in the entry point module")
+    parser.add_argument("--no-launch", action="store_true", help="Only time the import")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the median is reported")
+    parser.add_argument("--top", type=int, default=0, help="List the slowest imports of one run")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    script = child_script(args.module, args.attribute, not args.no_launch)
+    runs = []
+    for _ in range(args.repeat):
+        result, _ = run_child([], script)
+        if "error" in result:
+            raise SystemExit(f"Could not start {args.module}: {result['error']}")
+        runs.append(result)
+
+    results = {"interpreter_start": interpreter_start(args.repeat)}
+    for key in ("import", "launch", "wall"):
+        values = [run[key] for run in runs if key in run]
+        if values:
+            results[key] = statistics.median(values)
+    report = {
+        "benchmark": "startup",
+        "module": args.module,
+        "launch": not args.no_launch,
+        "python": sys.version.split()[0],
+        "results": {name: round(seconds, 4) for name, seconds in results.items()},
+        "loaded_at_startup": [name for name, loaded in runs[0]["loaded"].items() if loaded],
+    }
+    if args.top:
+        _, importtime = run_child(["-X", "importtime"], script)
+        report["slowest_imports"] = slowest_imports(importtime, args.top)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
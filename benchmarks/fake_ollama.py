@@ -0,0 +1,154 @@
+"""
+Local stand-in for the Ollama HTTP API, so benchmarks run without a model.
+
+It answers GET /api/tags with the configured model and POST /api/generate in both modes: newline
+delimited JSON chunks when "stream" is true, a single JSON object otherwise. The time to the
+first token and the token rate are configurable, so benchmarks measure the application rather
+than the model. An empty prompt only "loads" the model, like Ollama does.
+
+Usage:
+    with FakeOllamaServer(tokens_per_second=200, first_token_latency=0.05) as server:
+        summarizer = QwenSummarizer(host=server.url)
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RESPONSE = ("<think>Reading the changes before writing the summary.</think>\n"
+                    "- Updated the synthetic modules with new values.\n"
+                    "- Kept the public interfaces unchanged.")
+
+
+def tokenize(text):
+    """Splits text into word-sized tokens that join back into the same text."""
+    tokens, start = [], 0
+    for i in range(1, len(text)):
+        if text[i] in " \n" and text[i - 1] not in " \n":
+            tokens.append(text[start:i])
+            start = i
+    tokens.append(text[start:])
+    return [token for token in tokens if token]
+
+
+class FakeOllamaServer:
+    def __init__(self, model="qwen3", tokens_per_second=200.0, first_token_latency=0.05, response_text=DEFAULT_RESPONSE,
+                 host="127.0.0.1", port=0):
+        """
+        Args:
+            model (str): Model name reported by /api/tags.
+            tokens_per_second (float): Generation speed; 0 sends all tokens at once.
+            first_token_latency (float): Seconds before the first token (prompt evaluation time).
+            response_text (str or callable): The answer, or a function of the prompt returning it.
+            host (str): Interface to listen on.
+            port (int): Port to listen on; 0 picks a free one.
+        """
+        self.model = model
+        self.tokens_per_second = tokens_per_second
+        self.first_token_latency = first_token_latency
+        self.response_text = response_text
+        self.requests = {"tags": 0, "generate": 0, "load": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, kind):
+        with self._lock:
+            self.requests[kind] += 1
+
+    def _answer(self, prompt):
+        return self.response_text(prompt) if callable(self.response_text) else self.response_text
+
+    def _token_delay(self):
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path != "/api/tags":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                server._count("tags")
+                self._send_json(200, {"models": [{"name": f"{server.model}:latest", "model": f"{server.model}:latest"}]})
+
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                prompt = request.get("prompt", "")
+                if not prompt:
+                    server._count("load")
+                    self._send_json(200, {"model": server.model, "response": "", "done": True, "done_reason": "load"})
+                    return
+                server._count("generate")
+                tokens = tokenize(server._answer(prompt))
+                time.sleep(server.first_token_latency)
+                if request.get("stream", True):
+                    self._stream(tokens)
+                else:
+                    time.sleep(server._token_delay() * max(len(tokens) - 1, 0))
+                    self._send_json(200, self._final(tokens, "".join(tokens)))
+
+            def _final(self, tokens, response):
+                return {"model": server.model, "response": response, "done": True, "done_reason": "stop",
+                        "eval_count": len(tokens)}
+
+            def _stream(self, tokens):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                delay = server._token_delay()
+                for i, token in enumerate(tokens):
+                    if i and delay:
+                        time.sleep(delay)
+                    self._write_chunk({"model": server.model, "response": token, "done": False})
+                self._write_chunk(self._final(tokens, ""))
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, data):
+                body = json.dumps(data).encode("utf-8") + b"\n"
+                self.wfile.write(f"{len(body):X}\r\n".encode("ascii") + body + b"\r\n")
+                self.wfile.flush()
+
+            def _send_json(self, status, data):
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
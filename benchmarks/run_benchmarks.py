@@ -0,0 +1,236 @@
+"""
+Offline benchmark suite: times GitTools, ExtractPathsTool and DaillyUpdateActivity.run stage by
+stage against synthetic repositories and a fake Ollama server, so no model or real repository is
+needed. Results are written as JSON; pass an earlier results file with --compare to see how each
+measurement changed between versions.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --repos 4 --commits 2000 --tokens-per-second 50 --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, sysPath)
+from benchmarks.fake_ollama import FakeOllamaServer, DEFAULT_RESPONSE
+from benchmarks.synthetic_repos import create_synthetic_repo, add_working_tree_changes
+from src.tools.commit_cache import CommitCache
+from src.tools.git_tools import GitTools, DIFF_MODE_RANGE
+from src.tools.repo_index import RepoIndex
+from src.utils.qwen_summarizer import HOST_ENV
+from src.utils.summary_cache import SummaryCache
+
+
+def fake_answer(prompt):
+    """Answers the path extraction prompt with JSON and everything else with a short summary."""
+    if '"project_paths"' in prompt:
+        return json.dumps({"project_paths": ["repo_0"], "work_summary": "Reviewed pull requests."})
+    return DEFAULT_RESPONSE
+
+
+def median_seconds(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def instrument(obj, name, stages, label, only_if=None):
+    """Replaces obj.name with a wrapper that adds its run time to stages[label]."""
+    original = getattr(obj, name)
+
+    def wrapper(*args, **kwargs):
+        if only_if and not only_if(*args, **kwargs):
+            return original(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            stages[label] = stages.get(label, 0.0) + time.perf_counter() - start
+    setattr(obj, name, wrapper)
+
+
+def bench_git_tools(repo_dirs, since_date, cache_dir, repeat):
+    results = {}
+    git_tools = GitTools(repo_dirs)
+    results["git_tools.current_changes"] = median_seconds(lambda: git_tools.get_current_changes(with_diffs=True), repeat)
+    results["git_tools.history"] = median_seconds(
+        lambda: git_tools.get_changes_since_date(since_date, with_commit_messages=True), repeat)
+    results["git_tools.history_with_diffs"] = median_seconds(
+        lambda: git_tools.get_changes_since_date(since_date, with_diffs=True), repeat)
+    results["git_tools.history_range_diffs"] = median_seconds(
+        lambda: git_tools.get_changes_since_date(since_date, with_diffs=True, diff_mode=DIFF_MODE_RANGE), repeat)
+
+    commit_cache = CommitCache(cache_dir)
+    cached_tools = GitTools(repo_dirs, commit_cache=commit_cache)
+    results["git_tools.history_with_diffs_cold_cache"] = median_seconds(
+        lambda: cached_tools.get_changes_since_date(since_date, with_diffs=True), 1)
+    results["git_tools.history_with_diffs_warm_cache"] = median_seconds(
+        lambda: cached_tools.get_changes_since_date(since_date, with_diffs=True), repeat)
+    commit_cache.close()
+    return results
+
+
+def bench_extract_paths(workspace, repo_dirs, repeat):
+    from src.tools.extract_paths import ExtractPathsTool
+    results = {}
+    repo_index = RepoIndex(workspace_roots=[workspace], index_path=None)
+    results["repo_index.build"] = median_seconds(lambda: repo_index.refresh(force=True), repeat)
+    tool = ExtractPathsTool(repo_index=repo_index)
+    tool.qwen.summary_cache = None
+    names = [os.path.basename(path) for path in repo_dirs]
+    messages = {
+        "regex": f"Worked on {repo_dirs[0]} and reviewed pull requests.",
+        "repo_index": f"Worked on {' and '.join(names)} and reviewed pull requests.",
+        "llm": "Spent the day reviewing pull requests with the team.",
+    }
+    for tier, message in messages.items():
+        result = tool.extract_paths_and_summary(message)
+        if result.get("tier") != tier:
+            raise SystemExit(f"Expected the {tier} tier to answer, got {result.get('tier')}")
+        results[f"extract_paths.{tier}"] = median_seconds(lambda: tool.extract_paths_and_summary(message), repeat)
+    return results
+
+
+def run_activity(repo_dirs, since_date, cache_dir, summary_cache, report_cache, force_refresh):
+    from src.activities.daily_update_activity import DaillyUpdateActivity, DAILY_UPDATE_PROMPT_FILE
+    # Keep the benchmark away from the user's caches under ~/.syl
+    activity = DaillyUpdateActivity(repo_dirs, "Reviewed pull requests.", commit_cache=CommitCache(cache_dir))
+    activity.summarizer.summary_cache = summary_cache
+    activity.report_cache = report_cache
+    stages = {}
+    instrument(activity, "_report_key", stages, "report_cache_key")
+    instrument(activity.model_health, "get", stages, "health_check")
+    instrument(activity.git_tools, "get_current_changes", stages, "current_changes")
+    instrument(activity.change_summarizer, "summarize", stages, "file_summaries")
+    instrument(activity.git_tools, "get_changes_since_date", stages, "commit_history")
+    instrument(activity.summarizer, "summarize", stages, "final_summary",
+               only_if=lambda prompt_file, *args, **kwargs: prompt_file == DAILY_UPDATE_PROMPT_FILE)
+    first_token = []
+
+    def callback(chunk, is_done):
+        if not first_token:
+            first_token.append(time.perf_counter())
+
+    start = time.perf_counter()
+    activity.run(since_date=since_date, check_for_current_changes=True, stream=True, callback=callback,
+                 force_refresh=force_refresh)
+    end = time.perf_counter()
+    activity.git_tools.commit_cache.close()
+    stages["total"] = end - start
+    if first_token:
+        stages["time_to_first_token"] = first_token[0] - start
+    return stages
+
+
+def bench_activity(repo_dirs, since_date, cache_dir):
+    results = {}
+    summary_cache = SummaryCache(cache_dir=None)
+    report_cache = SummaryCache(cache_dir=None)
+    # cold: empty caches; warm: unchanged repositories, answered by the report cache;
+    # refresh: forced regeneration with the commit and summary caches warm
+    for run, force_refresh in (("cold", False), ("warm", False), ("refresh", True)):
+        for stage, seconds in run_activity(repo_dirs, since_date, cache_dir, summary_cache, report_cache, force_refresh).items():
+            results[f"activity_{run}.{stage}"] = seconds
+    return results
+
+
+def git_version():
+    try:
+        return subprocess.run(["git", "--version"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def source_revision():
+    try:
+        return subprocess.run(["git", "-C", sysPath, "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f).get("results", {})
+    print(f"{'measurement':<48} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, seconds in results.items():
+        old = baseline.get(name)
+        ratio = f"{seconds / old:.2f}" if old else "-"
+        old_text = f"{old:.4f}" if old is not None else "-"
+        print(f"{name:<48} {old_text:>10} {seconds:>10.4f} {ratio:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=3)
+    parser.add_argument("--commits", type=int, default=500, help="Commits per repository")
+    parser.add_argument("--files", type=int, default=100, help="Files per repository")
+    parser.add_argument("--files-per-commit", type=int, default=3)
+    parser.add_argument("--lines-per-change", type=int, default=5)
+    parser.add_argument("--dirty-files", type=int, default=10, help="Files with uncommitted changes per repository")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--first-token-latency", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the median is reported")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    workspace = tempfile.mkdtemp(prefix="syl-bench-")
+    try:
+        repos_root = os.path.join(workspace, "repos")
+        repo_dirs = []
+        for i in range(args.repos):
+            repo_dir = create_synthetic_repo(os.path.join(repos_root, f"repo_{i}"), commits=args.commits, files=args.files,
+                                             files_per_commit=args.files_per_commit, lines_per_change=args.lines_per_change,
+                                             commit_interval=30)
+            add_working_tree_changes(repo_dir, files=args.dirty_files)
+            repo_dirs.append(repo_dir)
+        # The whole synthetic history lies within the last day
+        since_date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+
+        with FakeOllamaServer(tokens_per_second=args.tokens_per_second, first_token_latency=args.first_token_latency,
+                              response_text=fake_answer) as server:
+            os.environ[HOST_ENV] = server.url
+            results = {}
+            results.update(bench_git_tools(repo_dirs, since_date, os.path.join(workspace, "git_cache"), args.repeat))
+            results.update(bench_extract_paths(repos_root, repo_dirs, args.repeat))
+            results.update(bench_activity(repo_dirs, since_date, os.path.join(workspace, "activity_cache")))
+            model_requests = dict(server.requests)
+
+        output = {
+            "benchmark": "suite",
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "git": git_version(),
+                "revision": source_revision(),
+            },
+            "config": vars(args),
+            "model_requests": model_requests,
+            "results": {name: round(seconds, 4) for name, seconds in results.items()},
+        }
+        print(json.dumps(output, indent=2))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(output, f, indent=2)
+        if args.compare:
+            compare(output["results"], args.compare)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Synthetic git repositories for benchmarks.
+
+Repositories are written with `git fast-import`, so thousands of commits take seconds to create.
+"""
+import os
+import subprocess
+import time
+
+DEFAULT_AUTHORS = [
+    ("Test User", "test@example.com"),
+    ("Other Person", "other@example.com"),
+]
+
+
+def create_synthetic_repo(repo_dir, commits=1000, files=50, files_per_commit=3, lines_per_change=5,
+                          authors=None, start_timestamp=None, commit_interval=60):
+    """
+    Creates a git repository at repo_dir with a linear history on branch main.
+
+    Args:
+        repo_dir (str): Directory to create the repository in.
+        commits (int): Number of commits to write.
+        files (int): Number of distinct files touched across the history.
+        files_per_commit (int): Files changed by every commit.
+        lines_per_change (int): Lines appended to each changed file per commit.
+        authors (list, optional): (name, email) tuples, used round-robin.
+        start_timestamp (int, optional): Unix time of the first commit; defaults so the last commit lands now.
+        commit_interval (int): Seconds between consecutive commits.
+    Returns:
+        str: repo_dir.
+    """
+    authors = authors or DEFAULT_AUTHORS
+    if start_timestamp is None:
+        start_timestamp = int(time.time()) - commits * commit_interval
+    os.makedirs(repo_dir, exist_ok=True)
+    subprocess.run(["git", "init", "-q", "-b", "main", repo_dir], check=True)
+    subprocess.run(["git", "-C", repo_dir, "config", "user.name", authors[0][0]], check=True)
+    subprocess.run(["git", "-C", repo_dir, "config", "user.email", authors[0][1]], check=True)
+
+    contents = {}
+    proc = subprocess.Popen(["git", "-C", repo_dir, "fast-import", "--quiet"], stdin=subprocess.PIPE)
+    try:
+        for i in range(commits):
+            name, email = authors[i % len(authors)]
+            timestamp = start_timestamp + i * commit_interval
+            message = f"Commit {i}: update {files_per_commit} files\n".encode("utf-8")
+            out = [b"commit refs/heads/main\n",
+                   f"author {name} <{email}> {timestamp} +0000\n".encode("utf-8"),
+                   f"committer {name} <{email}> {timestamp} +0000\n".encode("utf-8"),
+                   f"data {len(message)}\n".encode("utf-8"), message]
+            for j in range(files_per_commit):
+                path = f"src/module_{(i * files_per_commit + j) % files}.py"
+                new_lines = "".join(f"value_{i}_{k} = {i * k}\n" for k in range(lines_per_change))
+                contents[path] = contents.get(path, "") + new_lines
+                data = contents[path].encode("utf-8")
+                out.append(f"M 100644 inline {path}\ndata {len(data)}\n".encode("utf-8"))
+                out.append(data)
+                out.append(b"\n")
+            out.append(b"\n")
+            proc.stdin.write(b"".join(out))
+        proc.stdin.close()
+        if proc.wait() != 0:
+            raise RuntimeError(f"git fast-import failed for {repo_dir}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+    subprocess.run(["git", "-C", repo_dir, "checkout", "-q", "-f", "main"], check=True)
+    return repo_dir
+
+
+def add_working_tree_changes(repo_dir, files=10, lines_per_file=20):
+    """
+    Leaves uncommitted edits in a repository created by create_synthetic_repo, so current-changes
+    scans have diffs to read. Appends lines to the first tracked files under src/.
+
+    Args:
+        repo_dir (str): The repository.
+        files (int): Number of files to modify.
+        lines_per_file (int): Lines appended to each file.
+    Returns:
+        list: Paths of the modified files, relative to repo_dir.
+    """
+    tracked = subprocess.run(["git", "-C", repo_dir, "ls-files", "src"], check=True, capture_output=True,
+                             text=True).stdout.split()
+    modified = tracked[:files]
+    for path in modified:
+        with open(os.path.join(repo_dir, path), "a", encoding="utf-8") as f:
+            f.writelines(f"pending_{k} = {k}\n" for k in range(lines_per_file))
+    return modified
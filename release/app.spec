@@ -1,10 +1,17 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+import sys
 from PyInstaller.utils.hooks import collect_data_files
 
+# The chat UI imports its tools on first use, which the analysis cannot follow
+sys.path.insert(0, os.path.abspath(os.path.join(SPECPATH, '..')))
+from src.ui.tools_list import TOOL_MODULES
+
 datas = [('C:\\2_WorkSpace\\SYL\\venv\\Lib\\site-packages\\safehttpx\\version.txt', 'safehttpx'),
          ('C:\\2_WorkSpace\\SYL\\venv\\Lib\\site-packages\\groovy\\version.txt', 'groovy'),
          ('C:\\2_WorkSpace\\SYL\\src\\prompts\\summarize_daily_update.txt', 'src\\prompts'),
-         ('C:\\2_WorkSpace\\SYL\\src\\prompts\\summarize_file_changes.txt', 'src\\prompts')]
+         ('C:\\2_WorkSpace\\SYL\\src\\prompts\\summarize_file_changes.txt', 'src\\prompts'),
+         ('C:\\2_WorkSpace\\SYL\\src\\prompts\\merge_summaries.txt', 'src\\prompts')]
 datas += collect_data_files('gradio')
 datas += collect_data_files('gradio_client')
 
@@ -14,7 +21,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=datas,
-    hiddenimports=['pywin32ctypes', 'win32ctypes.pywin32'],
+    hiddenimports=['pywin32ctypes', 'win32ctypes.pywin32'] + TOOL_MODULES,
     hookspath=['./release/hooks'],
     hooksconfig={},
     runtime_hooks=['./release/runtime_hook.py'],
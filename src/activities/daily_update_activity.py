@@ -1,57 +1,191 @@
-import os
 import datetime
+import functools
+import json
+import os
+from src.tools.commit_cache import CommitCache, get_shared_commit_cache
 from src.tools.git_tools import GitTools
-from src.utils.qwen_summarizer import QwenSummarizer
+from src.utils.map_reduce_summarizer import MapReduceSummarizer, DEFAULT_NUM_CTX, MAP_PROMPT_FILE, REDUCE_PROMPT_FILE
+from src.utils.diff_compactor import compact_diffs
+from src.utils.model_health import get_model_health, create_summarizer
+from src.utils.prompt_registry import get_prompt_registry
+from src.utils.summary_cache import SummaryCache, get_shared_summary_cache, get_shared_report_cache
+from src.utils.single_flight import SingleFlight
+from src.utils.stage_graph import StageGraph, StopStages
+from src.utils.tracing import span
+
+DAILY_UPDATE_PROMPT_FILE = 'summarize_daily_update.txt'
+
+# Identical daily updates requested at the same time share one git scan and one set of model calls
+_daily_update_flights = SingleFlight()
+
+def format_commit_summary(project_dir, commit):
+    """
+    Format one commit for the daily update context.
+
+    Args:
+        project_dir (str): The repository the commit belongs to.
+        commit (dict): A commit with 'date' (ISO format), 'author' and 'message'.
+
+    Returns:
+        str: One line per commit, as the daily update prompt expects them.
+    """
+    return f"Project: {project_dir} - {commit['date']} {commit['author']}: {commit['message']}"
+
+def build_daily_update_context(work_summary_message, summaries, commit_summaries, day=None):
+    """
+    Combine the work summary, file change summaries and commits into the context of the daily update prompt.
+
+    Args:
+        work_summary_message (str): What the author reported besides the code changes; may be empty.
+        summaries (list): Summaries of the file changes.
+        commit_summaries (list): Commit lines from format_commit_summary.
+        day (datetime.date, optional): The day the update is for. Defaults to today.
+
+    Returns:
+        str: The context for the {daily_update_context} placeholder.
+    """
+    day = (day or datetime.date.today()).strftime("%A, %d %B %Y")
+    status = f"🗓️ Daily Status for {day}"
+    status += "✅ Tasks for Today:"
+    status += f"💬 Discussions and meetings : \n- {work_summary_message}" if work_summary_message else ""
+    daily_update_context = status
+    if summaries:
+        daily_update_context += "\n📝 File Summaries:\n" + "\n".join(summaries)
+    if commit_summaries:
+        daily_update_context += "\n\n🔨 Recent Commits:\n" + "\n".join(commit_summaries)
+    return daily_update_context
 
 class DaillyUpdateActivity:
-    def __init__(self, project_dirs=None, work_summary_message: str = ""):
+    def __init__(self, project_dirs=None, work_summary_message: str = "", num_ctx: int = DEFAULT_NUM_CTX,
+                 commit_cache: CommitCache = None):
         if project_dirs is None:
             project_dirs = []
         self.project_dirs = project_dirs
         self.work_summary_message = work_summary_message
-        self.git_tools = GitTools(self.project_dirs)
-        self.summarizer = QwenSummarizer()
+        # Commits never change, so repeat runs only read the commits the cache has not seen.
+        # Every activity shares the process-wide cache unless it is given its own.
+        self.git_tools = GitTools(self.project_dirs, commit_cache=commit_cache or get_shared_commit_cache())
+        self.summarizer = create_summarizer(num_ctx, summary_cache=get_shared_summary_cache())
+        # Shared with the startup warm-up; a recent successful check is reused instead of calling /api/tags
+        self.model_health = get_model_health(self.summarizer.host, self.summarizer.model, num_ctx=num_ctx)
+        # Splits large change sets into chunks that fit num_ctx and merges their summaries
+        self.change_summarizer = MapReduceSummarizer(self.summarizer, num_ctx=num_ctx)
+        # Finished reports, keyed by the repositories' state and everything else the report depends on
+        self.report_cache = get_shared_report_cache()
         self.tasks = []
 
-    def run(self, since_date=None, check_for_current_changes = False, stream=False, callback=None):
-        
-        # Check if Qwen is running
-        responsecheck = self.summarizer.check_ollama_and_model()
-        if not responsecheck['status']:
-            return responsecheck['message']
-        #end if
+    def run(self, since_date=None, check_for_current_changes = False, stream=False, callback=None, force_refresh=False):
+        """
+        Generate the daily update. When no repository changed since an earlier run with the same
+        settings, that run's report is returned from the report cache. force_refresh=True skips the
+        report cache and the cached model summaries, so every summary is generated again.
+        Concurrent runs for the same repositories, date window and work summary are coalesced: one
+        computation runs and every caller gets its result, and with stream=True every caller's
+        callback receives the same streamed chunks.
+        """
+        if since_date is None:
+            since_date = (datetime.date.today() - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+        with span("activity.report_cache", force_refresh=force_refresh) as cache_span:
+            report_key = self._report_key(since_date, check_for_current_changes)
+            cached = self.report_cache.get(report_key) if report_key and not force_refresh else None
+            cache_span.set(hit=cached is not None)
+        if cached is not None:
+            if stream and callback:
+                # Same final call a finished stream makes
+                callback(cached, True)
+            return cached
+        # The shared computation always streams, so streaming callers can join any in-flight run
+        def compute(shared_callback):
+            return self._run(since_date, check_for_current_changes, shared_callback, report_key, force_refresh)
+        return _daily_update_flights.run(self._request_key(since_date, check_for_current_changes, force_refresh), compute,
+                                         callback=callback if stream else None)
 
-        # 1. Summarize per file
-        summaries = []
-        today = datetime.date.today().strftime("%A, %d %B %Y")
-        status = f"🗓️ Daily Status for {today}"        
-        status += "✅ Tasks for Today:"
-        status += f"💬 Discussions and meetings : \n- {self.work_summary_message}" if self.work_summary_message else ""
+    def _request_key(self, since_date, check_for_current_changes, force_refresh=False):
+        """
+        Identifies runs that produce the same update: the resolved repository set and the request settings.
+        A forced refresh never joins a run that may answer from the caches.
+        """
+        repos = tuple(sorted({os.path.realpath(project_dir) for project_dir in self.project_dirs}))
+        return (repos, since_date, bool(check_for_current_changes), bool(force_refresh), self.work_summary_message,
+                self.summarizer.host, self.summarizer.model, self.summarizer.num_ctx)
 
-        # For each changed file, collect all diffs and ask the model at once
+    def _report_key(self, since_date, check_for_current_changes):
+        """
+        Key of the finished report: each repository's HEAD and (when current changes are summarized)
+        working tree fingerprint, the authors, the date window, the work summary, today's date (it is
+        part of the report), the model and the versions of the prompts. None if a repository cannot be read.
+        """
+        states = self.git_tools.get_repo_states(with_working_tree=check_for_current_changes)
+        if not states or any(state is None for state in states):
+            return None
+        registry = get_prompt_registry()
+        prompt_versions = ",".join(registry.get(name).version
+                                   for name in (DAILY_UPDATE_PROMPT_FILE, MAP_PROMPT_FILE, REDUCE_PROMPT_FILE))
+        repo_state = json.dumps({"repos": states, "authors": self.git_tools.resolve_authors()}, sort_keys=True)
+        return SummaryCache.make_key(self.summarizer.model, prompt_versions, repo_state,
+                                     since_date=since_date, today=datetime.date.today().isoformat(),
+                                     check_for_current_changes=bool(check_for_current_changes),
+                                     work_summary=self.work_summary_message, num_ctx=self.summarizer.num_ctx)
+
+    def _run(self, since_date, check_for_current_changes, callback, report_key=None, force_refresh=False):
+        """
+        Generate the update as a graph of stages. The git scans do not need the model, so they run
+        while the model is checked and while the file changes are summarized; the model stages
+        wait for the health check.
+        """
+        stages = StageGraph()
+        stages.add("health_check", self._check_model)
+        stages.add("commit_summaries", functools.partial(self._read_commit_summaries, since_date))
+        final_inputs = ("commit_summaries",)
         if check_for_current_changes:
-            current_changes_list = self.git_tools.get_current_changes(with_diffs=True)
-            all_file_summaries = []
-            if current_changes_list:
+            stages.add("file_changes", self._read_file_changes)
+            stages.add("summaries", functools.partial(self._summarize_file_changes, force_refresh=force_refresh),
+                       depends_on=("file_changes",), after=("health_check",))
+            final_inputs += ("summaries",)
+        stages.add("final_summary", functools.partial(self._write_final_summary, callback=callback, report_key=report_key,
+                                                      force_refresh=force_refresh),
+                   depends_on=final_inputs, after=("health_check",))
+        try:
+            return stages.run()["final_summary"]
+        except StopStages as stop:
+            return stop.value
+
+    def _check_model(self):
+        # Check if Qwen is running
+        with span("activity.health_check"):
+            responsecheck = self.model_health.get()
+        if not responsecheck['status']:
+            raise StopStages(responsecheck['message'])
+
+    def _read_file_changes(self):
+        """Returns one prompt item per modified file: its project, path and compacted diff."""
+        current_changes_list = self.git_tools.get_current_changes(with_diffs=True)
+        all_file_summaries = []
+        if current_changes_list:
+            # Trim context, whitespace-only and moved lines before the diffs reach the model
+            with span("activity.diff_compaction") as compaction_span:
+                tokens_before = tokens_after = 0
                 for current_changes in current_changes_list:
                     if current_changes and 'modified' in current_changes:
+                        diffs, stats = compact_diffs(current_changes.get('diffs', {}))
+                        tokens_before += stats['tokens_before']
+                        tokens_after += stats['tokens_after']
                         for file in current_changes['modified']:
-                            file_diff = current_changes.get('diffs', {}).get(file, '')
+                            file_diff = diffs.get(file, '')
                             all_file_summaries.append(f"Project: {current_changes['project_dir']}\nFile: {file}\nDiff:\n{file_diff}")
-            if all_file_summaries:
-                combined_diff_context = "\n\n".join(all_file_summaries)
-                replacements = [("{file_changes_context}", combined_diff_context)]
-                summary = self.summarizer.summarize(
-                    os.path.join(os.path.dirname(__file__), '../prompts/summarize_file_changes.txt'),
-                    replacements=replacements
-                )
-                summaries.append(f"Summary of all file changes:\n{summary}")
-        #end if
-
-        # Get commit history and current file changes
-        if since_date is None:
-            since_date = (datetime.date.today() - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+                compaction_span.set(tokens_before=tokens_before, tokens_after=tokens_after)
+        return all_file_summaries
 
+    def _summarize_file_changes(self, file_changes, force_refresh=False):
+        # For each changed file, collect all diffs and ask the model at once
+        summaries = []
+        if file_changes:
+            with span("activity.file_summaries", files=len(file_changes)):
+                summary = self.change_summarizer.summarize(file_changes, force_refresh=force_refresh)
+            summaries.append(f"Summary of all file changes:\n{summary}")
+        return summaries
+
+    def _read_commit_summaries(self, since_date):
         commit_info = self.git_tools.get_changes_since_date(since_date, with_commit_messages=True)
         commit_summaries = []
         if commit_info:
@@ -59,19 +193,18 @@ class DaillyUpdateActivity:
                 if project_commit_info and 'commit_messages' in project_commit_info:
                     project_dir = project_commit_info.get('project_dir', '')
                     for c in project_commit_info['commit_messages']:
-                        commit_summaries.append(f"Project: {project_dir} - {c['date']} {c['author']}: {c['message']}")
-        
+                        commit_summaries.append(format_commit_summary(project_dir, c))
+        return commit_summaries
+
+    def _write_final_summary(self, commit_summaries, summaries=(), callback=None, report_key=None, force_refresh=False):
         # Combine all summaries and commits into one context for Qwen
-        daily_update_context = status
-        if summaries:
-            daily_update_context += "\n📝 File Summaries:\n" + "\n".join(summaries)
-        if commit_summaries:
-            daily_update_context += "\n\n🔨 Recent Commits:\n" + "\n".join(commit_summaries)
-        
+        daily_update_context = build_daily_update_context(self.work_summary_message, summaries, commit_summaries)
+
         # Use the summarize_daily_update.txt prompt
-        prompt_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../prompts/summarize_daily_update.txt'))
-        with open(prompt_path, 'r', encoding='utf-8') as f:
-            prompt_template = f.read()
-        prompt = prompt_template.replace('{daily_update_context}', daily_update_context)
-        final_summary = self.summarizer.summarize_from_text(prompt, stream=stream, callback=callback, remove_think=True)
+        with span("activity.final_summary", commits=len(commit_summaries)):
+            final_summary = self.summarizer.summarize(DAILY_UPDATE_PROMPT_FILE, stream=True, callback=callback, remove_think=True,
+                                                      replacements=[('{daily_update_context}', daily_update_context)],
+                                                      force_refresh=force_refresh)
+        if report_key:
+            self.report_cache.put(report_key, final_summary)
         return final_summary
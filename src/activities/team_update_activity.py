@@ -0,0 +1,328 @@
+"""
+Team daily updates in batch: one daily update per author and date window, for many authors and
+repositories at once, without the chat UI.
+
+The work is described by a JSON manifest:
+
+    {
+        "repos": ["C:/src/api", "C:/src/web"],
+        "windows": [{"since": "2024-06-03", "until": "2024-06-03"}],
+        "authors": [
+            "Bob",
+            {"name": "Alice", "emails": ["alice@example.com"], "repos": ["C:/src/api"],
+             "work_summary": "Sprint planning", "windows": [{"since": "2024-06-01"}]}
+        ]
+    }
+
+Each author gets one item per window (their own "windows" and "repos" replace the manifest's).
+A commit belongs to an author when its author name or email equals the author's name or one of
+their emails, ignoring case. "until" is inclusive and defaults to no upper bound.
+
+Every repository is read once for the window covering all items, and the commits are handed out
+to the items from that one read. The model calls run on a bounded thread pool; each finished item is appended
+to a JSONL file right away, so an interrupted batch resumes with the items that are not in the
+file yet. Items that failed are retried, and so are items with a repository that could not be read:
+they are written as errors without a model call, since their report would be empty or partial.
+"""
+
+import datetime
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List
+from src.activities.daily_update_activity import DAILY_UPDATE_PROMPT_FILE, format_commit_summary, build_daily_update_context
+from src.tools.commit_cache import CommitCache, get_shared_commit_cache
+from src.tools.git_tools import GitTools, DEFAULT_MAX_WORKERS, DEFAULT_REPO_TIMEOUT
+from src.utils.map_reduce_summarizer import DEFAULT_NUM_CTX
+from src.utils.model_health import get_model_health, create_summarizer
+from src.utils.summary_cache import get_shared_summary_cache
+
+# Model calls running at the same time. Ollama works on a few requests in parallel at most,
+# so more workers only queue up on the server.
+DEFAULT_LLM_WORKERS = 2
+
+DATE_FORMAT = "%Y-%m-%d"
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+def _parse_date(value, field):
+    try:
+        return datetime.datetime.strptime(value, DATE_FORMAT).date()
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a date in YYYY-MM-DD format, got {value!r}")
+
+
+def _parse_windows(windows, owner):
+    if not isinstance(windows, list) or not windows:
+        raise ValueError(f"{owner} needs a non-empty list of windows")
+    parsed = []
+    for window in windows:
+        if not isinstance(window, dict):
+            raise ValueError(f"Windows of {owner} must be objects with 'since' and optionally 'until'")
+        since = _parse_date(window.get("since"), f"'since' of {owner}")
+        until = _parse_date(window["until"], f"'until' of {owner}") if window.get("until") else None
+        if until and until < since:
+            raise ValueError(f"Window of {owner} ends before it starts: {since} to {until}")
+        parsed.append((since, until))
+    return parsed
+
+
+def item_id(author, since, until):
+    """Identifies an item in the results file; the same manifest always yields the same ids."""
+    return f"{author}|{since.isoformat()}|{until.isoformat() if until else ''}"
+
+
+def parse_manifest(manifest: dict) -> List[dict]:
+    """
+    Turn a manifest into the list of items to run.
+
+    Args:
+        manifest (dict): The parsed manifest (see the module docstring).
+    Returns:
+        List[dict]: One item per author and window, with 'id', 'author', 'identities' (lower case
+        names and emails), 'repos', 'since', 'until' (datetime.date or None) and 'work_summary'.
+    Raises:
+        ValueError: If the manifest is incomplete or malformed.
+    """
+    if not isinstance(manifest, dict):
+        raise ValueError("The manifest must be a JSON object")
+    default_repos = manifest.get("repos", [])
+    default_windows = manifest.get("windows")
+    authors = manifest.get("authors")
+    if not isinstance(authors, list) or not authors:
+        raise ValueError("The manifest needs a non-empty list of authors")
+
+    items = []
+    seen = set()
+    for author in authors:
+        if isinstance(author, str):
+            author = {"name": author}
+        if not isinstance(author, dict) or not author.get("name"):
+            raise ValueError(f"Every author needs a name, got {author!r}")
+        name = author["name"]
+        emails = author.get("emails", [])
+        if isinstance(emails, str):
+            emails = [emails]
+        repos = author.get("repos", default_repos)
+        if not isinstance(repos, list) or not repos:
+            raise ValueError(f"No repos for author {name!r}")
+        identities = sorted({identity.strip().lower() for identity in [name, *emails] if identity.strip()})
+        for since, until in _parse_windows(author.get("windows", default_windows), f"author {name!r}"):
+            current_id = item_id(name, since, until)
+            if current_id in seen:
+                raise ValueError(f"Duplicate item {current_id!r} in the manifest")
+            seen.add(current_id)
+            items.append({
+                "id": current_id,
+                "author": name,
+                "identities": identities,
+                "repos": list(repos),
+                "since": since,
+                "until": until,
+                "work_summary": author.get("work_summary", ""),
+            })
+    return items
+
+
+def load_manifest(path: str) -> List[dict]:
+    """Read a manifest file and return its items (see parse_manifest)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_manifest(json.load(f))
+
+
+def read_finished_ids(output_path: str) -> set:
+    """
+    Return the ids of the items the results file already has a successful result for. Lines that
+    are not valid JSON (e.g. the last line of an interrupted write) are ignored.
+    """
+    finished = set()
+    if not os.path.exists(output_path):
+        return finished
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and record.get("status") == STATUS_OK:
+                finished.add(record.get("id"))
+    return finished
+
+
+class TeamUpdateActivity:
+    def __init__(self, items: List[dict], num_ctx: int = DEFAULT_NUM_CTX, max_workers: int = DEFAULT_LLM_WORKERS,
+                 git_workers: int = DEFAULT_MAX_WORKERS, commit_cache: CommitCache = None,
+                 repo_timeout: float = DEFAULT_REPO_TIMEOUT):
+        """
+        Initialize the TeamUpdateActivity.
+
+        Args:
+            items (List[dict]): The items to run, from parse_manifest or load_manifest.
+            num_ctx (int): Model context size.
+            max_workers (int): Model calls running at the same time.
+            git_workers (int): Repositories read at the same time.
+            commit_cache (CommitCache, optional): Cache of commit records. Defaults to the process-wide cache.
+            repo_timeout (float, optional): Seconds to wait for each repository, counted from when its read
+                starts. None waits forever, e.g. for a first read of large histories.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.items = items
+        self.max_workers = max_workers
+        self.git_workers = git_workers
+        self.repo_timeout = repo_timeout
+        self.summarizer = create_summarizer(num_ctx, summary_cache=get_shared_summary_cache())
+        self.model_health = get_model_health(self.summarizer.host, self.summarizer.model, num_ctx=num_ctx)
+        self.commit_cache = commit_cache or get_shared_commit_cache()
+
+    def run(self, output_path: str, resume: bool = True, on_result: Callable = None) -> dict:
+        """
+        Run every item that has no successful result in output_path yet and append the results to it.
+
+        Args:
+            output_path (str): JSONL file with one result per line.
+            resume (bool): Skip the items output_path already has; False starts a new file.
+            on_result (callable, optional): Called with each result as it is written.
+        Returns:
+            dict: Counts of 'ok', 'error' and 'skipped' items, and 'message' if the batch could not start.
+        """
+        finished = read_finished_ids(output_path) if resume else set()
+        pending = [item for item in self.items if item["id"] not in finished]
+        counts = {STATUS_OK: 0, STATUS_ERROR: 0, "skipped": len(self.items) - len(pending)}
+        if not pending:
+            return counts
+
+        health = self.model_health.get()
+        if not health['status']:
+            counts["message"] = health['message']
+            return counts
+
+        commits = self._scan(pending)
+        with self._open_output(output_path, resume) as output:
+            def write(result):
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+                counts[result["status"]] += 1
+                if on_result:
+                    on_result(result)
+
+            executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="team-update")
+            try:
+                futures = []
+                for item in pending:
+                    item_commits, unreadable = self._select_commits(item, commits)
+                    if unreadable:
+                        # A partial report would count as finished; fail the item so a resume retries it
+                        write(self._result(item, STATUS_ERROR, item_commits, unreadable, time.perf_counter(),
+                                           error=f"Could not read {', '.join(unreadable)}"))
+                    elif item_commits:
+                        futures.append(executor.submit(self._run_item, item, item_commits))
+                    else:
+                        # Nothing to summarize, so no model call
+                        write(self._result(item, STATUS_OK, [], [], time.perf_counter()))
+                # Results are written by this thread only, in the order they finish
+                for future in as_completed(futures):
+                    write(future.result())
+            finally:
+                # On an interruption, drop the queued items; they run again on resume
+                executor.shutdown(wait=False, cancel_futures=True)
+        return counts
+
+    @staticmethod
+    def _open_output(output_path, resume):
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if resume and os.path.exists(output_path) and os.path.getsize(output_path):
+            # An interrupted write can leave the last line unterminated; start on a new line
+            with open(output_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    with open(output_path, "a", encoding="utf-8") as fix:
+                        fix.write("\n")
+        return open(output_path, "a" if resume else "w", encoding="utf-8")
+
+    def _scan(self, items):
+        """
+        Read every repository of the items once, for the window covering all items, and index the
+        commits by lower case author name and email: {repo: {identity: [record]}}.
+        A repository that cannot be read maps to None.
+        """
+        repos = sorted({repo for item in items for repo in item["repos"]})
+        since_date = min(item["since"] for item in items).strftime(DATE_FORMAT)
+        until_date = None
+        if all(item["until"] for item in items):
+            until_date = max(item["until"] for item in items).strftime(DATE_FORMAT)
+        git_tools = GitTools(repos, max_workers=self.git_workers, repo_timeout=self.repo_timeout,
+                             commit_cache=self.commit_cache)
+        commits = {}
+        for repo, repo_records in zip(repos, git_tools.get_commit_records(since_date, until_date)):
+            if repo_records is None:
+                commits[repo] = None
+                continue
+            by_identity = {}
+            for record in repo_records["commits"]:
+                for identity in {record["author"].strip().lower(), record["author_email"].strip().lower()}:
+                    by_identity.setdefault(identity, []).append(record)
+            commits[repo] = by_identity
+        return commits
+
+    @staticmethod
+    def _select_commits(item, commits):
+        """Return the item's commits as (repo, record) pairs, oldest first, and the repos that could not be read."""
+        since = datetime.datetime.combine(item["since"], datetime.time.min)
+        until = datetime.datetime.combine(item["until"] + datetime.timedelta(days=1), datetime.time.min) if item["until"] else None
+        selected = {}
+        unreadable = []
+        for repo in item["repos"]:
+            by_identity = commits.get(repo)
+            if by_identity is None:
+                unreadable.append(repo)
+                continue
+            for identity in item["identities"]:
+                for record in by_identity.get(identity, []):
+                    committed = datetime.datetime.fromtimestamp(record["committed_date"])
+                    if committed >= since and (until is None or committed < until):
+                        # A commit matching both the name and an email is only taken once
+                        selected[(repo, record["commit"])] = (repo, record)
+        ordered = sorted(selected.values(), key=lambda pair: pair[1]["committed_date"])
+        return ordered, unreadable
+
+    def _run_item(self, item, item_commits):
+        started = time.perf_counter()
+        commit_summaries = [format_commit_summary(repo, {
+            "date": datetime.datetime.fromtimestamp(record["committed_date"]).isoformat(),
+            "author": record["author"],
+            "message": record["message"].strip(),
+        }) for repo, record in item_commits]
+        context = build_daily_update_context(item["work_summary"], [], commit_summaries,
+                                             day=item["until"] or datetime.date.today())
+        try:
+            summary = self.summarizer.summarize(DAILY_UPDATE_PROMPT_FILE, remove_think=True,
+                                                replacements=[('{daily_update_context}', context)])
+        except Exception as e:
+            return self._result(item, STATUS_ERROR, item_commits, [], started, error=f"{type(e).__name__}: {e}")
+        return self._result(item, STATUS_OK, item_commits, [], started, summary=summary)
+
+    @staticmethod
+    def _result(item, status, item_commits, unreadable, started, summary=None, error=None):
+        result = {
+            "id": item["id"],
+            "author": item["author"],
+            "since": item["since"].isoformat(),
+            "until": item["until"].isoformat() if item["until"] else None,
+            "status": status,
+            "commits": len(item_commits),
+            "repos": sorted({repo for repo, _ in item_commits}),
+            "summary": summary,
+            "seconds": round(time.perf_counter() - started, 3),
+            "finished_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+        if unreadable:
+            result["unreadable_repos"] = unreadable
+        if error:
+            result["error"] = error
+        return result
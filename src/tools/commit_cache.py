@@ -0,0 +1,143 @@
+"""
+Persistent cache of commit metadata and patches.
+
+Commits never change once written, so everything GitTools reads for a commit SHA (author,
+date, message, changed files and per-file patches) can be stored on disk and reused by later
+runs and overlapping date windows. Entries live in a small SQLite database under the cache
+directory and the least recently used ones are evicted once the database grows past max_bytes.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".syl", "cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_FILE_NAME = "commit_cache.sqlite3"
+
+KIND_COMMIT = "commit"
+KIND_PATCHES = "patches"
+
+
+class CommitCache:
+    def __init__(self, cache_dir: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir (str, optional): Directory holding the cache database. Defaults to ~/.syl/cache.
+            max_bytes (int): Approximate upper bound for the cached data; older entries are evicted beyond it.
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.path = os.path.join(self.cache_dir, CACHE_FILE_NAME)
+        # GitTools scans repositories on a thread pool, so one connection is shared behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " repo TEXT NOT NULL, key TEXT NOT NULL, kind TEXT NOT NULL,"
+                " value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL,"
+                " PRIMARY KEY (repo, key, kind))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+
+    @staticmethod
+    def repo_key(repo) -> str:
+        """Identifies a repository by the real path of its working directory."""
+        return os.path.realpath(repo.working_dir)
+
+    def get_commits(self, repo_key: str, shas: Iterable[str]) -> Dict[str, dict]:
+        """Returns {sha: commit record} for the SHAs that are cached."""
+        return self._get_many(repo_key, list(shas), KIND_COMMIT)
+
+    def put_commits(self, repo_key: str, records: Iterable[dict]):
+        """Stores commit records as produced by iter_commit_history, keyed by their 'commit' SHA."""
+        self._put_many(repo_key, [(record["commit"], record) for record in records], KIND_COMMIT)
+
+    def get_patches(self, repo_key: str, key: str) -> Optional[Dict[str, str]]:
+        """Returns the cached {path: patch} dict stored under key (a commit SHA or a range), or None."""
+        return self._get_many(repo_key, [key], KIND_PATCHES).get(key)
+
+    def put_patches(self, repo_key: str, key: str, patches: Dict[str, str]):
+        """Stores a {path: patch} dict under key. key must only depend on immutable commit SHAs."""
+        self._put_many(repo_key, [(key, patches)], KIND_PATCHES)
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _get_many(self, repo_key: str, keys: List[str], kind: str) -> dict:
+        found = {}
+        if not keys:
+            return found
+        now = time.time()
+        with self._lock, self._conn:
+            # SQLite limits the number of bound parameters, so look keys up in batches
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                params = [repo_key, kind, *batch]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM entries WHERE repo = ? AND kind = ? AND key IN ({placeholders})",
+                    params).fetchall()
+                for key, value in rows:
+                    found[key] = json.loads(value)
+                self._conn.execute(
+                    f"UPDATE entries SET last_used = ? WHERE repo = ? AND kind = ? AND key IN ({placeholders})",
+                    [now, *params])
+        return found
+
+    def _put_many(self, repo_key: str, items, kind: str):
+        now = time.time()
+        rows = []
+        for key, value in items:
+            encoded = json.dumps(value)
+            rows.append((repo_key, key, kind, encoded, len(encoded), now))
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._evict()
+
+    def _evict(self):
+        """Deletes the least recently used entries until the cache is back under max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% of the budget so a full cache does not evict on every write
+        to_free = total - int(self.max_bytes * 0.9)
+        freed = 0
+        stale = []
+        for repo, key, kind, size in self._conn.execute(
+                "SELECT repo, key, kind, size FROM entries ORDER BY last_used"):
+            stale.append((repo, key, kind))
+            freed += size
+            if freed >= to_free:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE repo = ? AND key = ? AND kind = ?", stale)
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_commit_cache() -> CommitCache:
+    """
+    Return the process-wide CommitCache, so activities created per request share one database connection.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = CommitCache()
+        return _shared_cache
@@ -1,26 +1,143 @@
+import os
 import re
+import threading
+from collections import Counter
 from typing import List
-from src.utils.qwen_summarizer import QwenSummarizer  # Adjust import if needed
+from src.tools.repo_index import RepoIndex, get_shared_repo_index, find_repo_root
+from src.utils.map_reduce_summarizer import DEFAULT_NUM_CTX
+from src.utils.model_health import create_summarizer
+from src.utils.summary_cache import get_shared_summary_cache
+from src.utils.tracing import span
+
+# Windows paths: e.g. C:\folder\subfolder or D:/folder/file.txt
+WIN_PATH_RE = re.compile(r"[A-Za-z]:\\(?:[^\s\/:*?\"<>|\r\n]+\\?)*|[A-Za-z]:/(?:[^\s/:*?\"<>|\r\n]+/?)*")
+# Unix paths: e.g. /home/user/project
+UNIX_PATH_RE = re.compile(r"/(?:[^\s/:*?\"<>|\r\n]+/?)+")
+# Words that may name a repository or a path inside one: e.g. backend-api or ProjectA/src/main.py
+REPO_REFERENCE_RE = re.compile(r"[\w.\-]+(?:[/\\][\w.\-]+)*")
+# Characters that make a word look like an identifier rather than an ordinary word ("backend-api", not "docs")
+IDENTIFIER_CHARS = "-_/\\."
+# Words that mark the word next to them as a project name: "the docs repo", "project test"
+PROJECT_MARKER = r"(?:repo|repository|project)"
+# Quotes around a word that mark it as a name: `docs`, "docs"
+NAME_QUOTES = "`'\""
+# Sentence punctuation that the path patterns pick up at the end of a path
+TRAILING_PUNCTUATION = ".,;:!?)]}'\""
+# Words that show the text left after the deterministic tiers still names a project, e.g. "the billing service"
+PROJECT_HINT_RE = re.compile(r"\b(?:repo|repository|project|service|app|application|api|library|module|package|codebase)s?\b",
+                             re.IGNORECASE)
+# Prompt template in src/prompts used for what the deterministic tiers could not resolve
+EXTRACT_PATHS_PROMPT_FILE = "extract_paths_and_activity.txt"
+
+# Which tier answered extract_paths_and_summary: the deterministic tiers save a model call each
+TIER_REGEX = "regex"
+TIER_REPO_INDEX = "repo_index"
+TIER_LLM = "llm"
+
+_tier_counts = Counter()
+_tier_counts_lock = threading.Lock()
+
+
+def get_tier_counts() -> dict:
+    """Returns how many extract_paths_and_summary calls each tier answered in this process."""
+    with _tier_counts_lock:
+        return dict(_tier_counts)
+
 
 class ExtractPathsTool:
-    def __init__(self):
-        self.qwen = QwenSummarizer()
+    def __init__(self, repo_index: RepoIndex = None, num_ctx: int = DEFAULT_NUM_CTX):
+        # Same num_ctx and keep_alive as the warm-up and the summaries, so the LLM tier does not reload the model
+        self.qwen = create_summarizer(num_ctx, summary_cache=get_shared_summary_cache())
+        self.repo_index = repo_index if repo_index is not None else get_shared_repo_index()
 
     def extract_paths(self, text: str) -> List[str]:
         """
         Extracts all Windows and Unix file/directory paths from a natural language string.
         Returns a list of unique paths found.
         """
-        # Windows paths: e.g. C:\folder\subfolder or D:/folder/file.txt
-        win_path_pattern = r"[A-Za-z]:\\(?:[^\s\/:*?\"<>|\r\n]+\\?)*|[A-Za-z]:/(?:[^\s/:*?\"<>|\r\n]+/?)*"
-        # Unix paths: e.g. /home/user/project
-        unix_path_pattern = r"/(?:[^\s/:*?\"<>|\r\n]+/?)+"
-        
-        win_paths = re.findall(win_path_pattern, text)
-        unix_paths = re.findall(unix_path_pattern, text)
-        # Remove duplicates and sort
-        all_paths = list(set(win_paths + unix_paths))
-        return all_paths
+        win_paths = WIN_PATH_RE.findall(text)
+        unix_paths = UNIX_PATH_RE.findall(text)
+        # Remove duplicates and trailing sentence punctuation
+        all_paths = {path.rstrip(TRAILING_PUNCTUATION) for path in win_paths + unix_paths}
+        all_paths.discard('')
+        return list(all_paths)
+
+    def extract_paths_and_summary(self, text: str) -> dict:
+        """
+        Extracts project paths and the work summary from a daily update, trying the cheapest tier first:
+        1. paths matched by the regexes that lie inside a git repository (the repository root is returned),
+        2. words that name a repository (or a path inside one) in the repository index, when they look like
+           identifiers (contain '-', '_', '/', '\\' or '.') or are marked as a name ("the docs repo", `docs`),
+        3. the LLM, for the text the first two tiers left: when they found no repository, when that text
+           still names a project (e.g. "the billing service"), or when an ordinary word in it is also a
+           repository name ("test", "docs"). Its paths are added to theirs.
+        Only references the first two tiers confirmed are removed from the work summary.
+        Returns a dictionary with 'project_paths' (list), 'work_summary' (str) and 'tier' (the last tier used).
+        """
+        with span("extract_paths") as extract_span:
+            project_paths, references = [], []
+            for path in self.extract_paths(text):
+                repo_root = find_repo_root(path) if os.path.exists(path) else None
+                if repo_root:
+                    if repo_root not in project_paths:
+                        project_paths.append(repo_root)
+                    references.append(path)
+            tier = TIER_REGEX
+
+            remaining = self._remove_references(text, references)
+            # Ordinary words that are also repository names, by lower case word; only the LLM may confirm them
+            ambiguous = {}
+            for match in REPO_REFERENCE_RE.finditer(remaining):
+                word = match.group().rstrip(TRAILING_PUNCTUATION)
+                repo_path = self.repo_index.resolve(word) if len(word) > 1 else None
+                if not repo_path:
+                    continue
+                if not self._is_confirmed_reference(remaining, match.start(), match.start() + len(word)):
+                    ambiguous[word.lower()] = repo_path
+                    continue
+                if repo_path not in project_paths:
+                    project_paths.append(repo_path)
+                references.append(word)
+                tier = TIER_REPO_INDEX
+
+            if not project_paths:
+                result = dict(self.extract_paths_and_summary_with_llm(text), tier=TIER_LLM)
+            else:
+                unresolved_text = self._remove_references(text, references)
+                result = {"project_paths": project_paths, "work_summary": unresolved_text, "tier": tier}
+                if ambiguous or PROJECT_HINT_RE.search(unresolved_text):
+                    llm_result = self.extract_paths_and_summary_with_llm(unresolved_text)
+                    for path in llm_result.get("project_paths", []):
+                        # A repository name the model confirmed maps to the path the index found for it
+                        path = ambiguous.get(str(path).lower(), path)
+                        if path not in project_paths:
+                            project_paths.append(path)
+                    result["tier"] = TIER_LLM
+            extract_span.set(tier=result["tier"], paths=len(result.get("project_paths", [])))
+        with _tier_counts_lock:
+            _tier_counts[result["tier"]] += 1
+        return result
+
+    @staticmethod
+    def _is_confirmed_reference(text: str, start: int, end: int) -> bool:
+        """Whether the word text[start:end] looks like an identifier or is marked as a project name."""
+        word = text[start:end]
+        if any(char in word for char in IDENTIFIER_CHARS):
+            return True
+        if 0 < start and end < len(text) and text[start - 1] in NAME_QUOTES and text[end] == text[start - 1]:
+            return True
+        return bool(re.search(r"\b" + PROJECT_MARKER + r"\s+$", text[:start], re.IGNORECASE)
+                    or re.match(r"\s+" + PROJECT_MARKER + r"\b", text[end:], re.IGNORECASE))
+
+    @staticmethod
+    def _remove_references(text: str, references: List[str]) -> str:
+        """Removes the matched paths and names from text, leaving the user's own words."""
+        for reference in sorted(references, key=len, reverse=True):
+            # A name in quotes goes with its quotes
+            text = re.sub(r"(?<![\w/\\])([`'\"]?)" + re.escape(reference) + r"\1(?![\w/\\])", " ", text)
+        text = re.sub(r"\s+", " ", text)
+        text = re.sub(r" ([.,;:!?])", r"\1", text)
+        return text.strip(" ,;:-")
 
     def extract_paths_with_llm(self, text: str) -> list:
         """
@@ -50,20 +167,12 @@ class ExtractPathsTool:
         and work summary from a daily update text.
         Returns a dictionary with 'project_paths' (list) and 'work_summary' (str).
         """
-        import os
-        
-        # Get the path to the extract_paths_and_activity prompt
-        prompt_file = os.path.abspath(os.path.join(
-            os.path.dirname(__file__), 
-            '../prompts/extract_paths_and_activity.txt'
-        ))
-        
         # Prepare replacements for the prompt
         replacements = [("{daily_update_context}", text)]
         
         try:
             # Call the Qwen LLM using the specific prompt file
-            result = self.qwen.summarize(prompt_file, replacements=replacements)
+            result = self.qwen.summarize(EXTRACT_PATHS_PROMPT_FILE, replacements=replacements)
             
             # Try to parse the result as JSON
             import json
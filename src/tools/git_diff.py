@@ -0,0 +1,258 @@
+"""
+Batched git diffs.
+
+Runs one `git diff` for many files and splits the patch into per-file sections while it
+streams, instead of starting a git process for every file.
+
+With DiffLimits the split keeps memory and prompt size bounded whatever is in the repository:
+each patch keeps at most max_file_bytes (the rest is counted, not stored), binary files and
+generated files (lockfiles, minified assets, snapshots, ...) are replaced by a one-line stat, and
+a DiffBudget caps the bytes of patch text one run keeps in total.
+"""
+import codecs
+import fnmatch
+import hashlib
+import json
+import re
+import threading
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# The object name git uses for an empty tree; diffing against it shows every file as added
+EMPTY_TREE_SHA = '4b825dc642cb6eb9a060e54bf8d69288fbee4904'
+
+DIFF_HEADER = b'diff --git '
+
+# Lines longer than this (minified bundles) are read in pieces, so one line never has to fit in memory
+READ_LINE_LIMIT = 64 * 1024
+
+# The note ending a truncated patch; it carries the line counts of the whole patch
+TRUNCATED_NOTE_RE = re.compile(r'\n\[diff truncated after \d+ bytes: \d+ more bytes, \+(\d+) -(\d+) lines in total\]$')
+
+DEFAULT_MAX_FILE_BYTES = 64 * 1024
+DEFAULT_MAX_RUN_BYTES = 2 * 1024 * 1024
+
+# Files whose diffs say nothing a summary needs; matched against the path and the file name
+DEFAULT_GENERATED_GLOBS = (
+    "*.lock", "package-lock.json", "npm-shrinkwrap.json", "pnpm-lock.yaml", "go.sum",
+    "*.min.js", "*.min.css", "*.map", "*.bundle.js",
+    "*.snap", "__snapshots__/*",
+    "*_pb2.py", "*.pb.go", "*.designer.cs",
+    "dist/*", "vendor/*", "node_modules/*",
+)
+
+
+class DiffLimits:
+    def __init__(self, max_file_bytes: int = DEFAULT_MAX_FILE_BYTES, max_run_bytes: int = DEFAULT_MAX_RUN_BYTES,
+                 generated_globs: Iterable[str] = DEFAULT_GENERATED_GLOBS, skip_binary: bool = True):
+        """
+        Initialize the DiffLimits.
+
+        Args:
+            max_file_bytes (int): Bytes of one file's patch to keep; None keeps everything.
+            max_run_bytes (int): Bytes of patch text one run keeps (see new_budget); None keeps everything.
+            generated_globs (Iterable[str]): Globs of generated files whose patch is replaced by a stat line.
+            skip_binary (bool): Replace the patches of binary files by a stat line.
+        """
+        self.max_file_bytes = max_file_bytes
+        self.max_run_bytes = max_run_bytes
+        self.generated_globs = tuple(generated_globs or ())
+        self.skip_binary = skip_binary
+
+    def is_generated(self, path: str) -> bool:
+        name = path.rsplit('/', 1)[-1]
+        for pattern in self.generated_globs:
+            # "vendor/*" matches vendor/ at the top and in any subdirectory
+            if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(path, f"*/{pattern}"):
+                return True
+        return False
+
+    def new_budget(self) -> "DiffBudget":
+        """A budget of max_run_bytes for one run."""
+        return DiffBudget(self.max_run_bytes)
+
+    def cache_tag(self) -> str:
+        """Short hash of the per-file settings; patches cached under other settings are not reused."""
+        settings = [self.max_file_bytes, list(self.generated_globs), self.skip_binary]
+        return hashlib.sha1(json.dumps(settings).encode('utf-8')).hexdigest()[:12]
+
+
+class DiffBudget:
+    def __init__(self, max_bytes: int = None):
+        """
+        Bytes of patch text one run may keep, shared by the threads of the run.
+
+        Args:
+            max_bytes (int): The cap; None admits every patch.
+        """
+        self.remaining = max_bytes
+        self._lock = threading.Lock()
+
+    def admit(self, patch: str) -> str:
+        """Return the patch if it fits in what is left of the budget, else its stat line."""
+        if self.remaining is None or not patch:
+            return patch
+        size = len(patch.encode('utf-8'))
+        with self._lock:
+            if size <= self.remaining:
+                self.remaining -= size
+                return patch
+        return summarize_patch(patch, "run size limit reached")
+
+
+def summarize_patch(patch: str, reason: str) -> str:
+    """Replace a patch by its header line and a stat line with the reason the diff was left out."""
+    lines = patch.split('\n')
+    truncated = TRUNCATED_NOTE_RE.search(patch)
+    if truncated:
+        added, removed = int(truncated.group(1)), int(truncated.group(2))
+    else:
+        added, removed = _count_changes(line.encode('utf-8') for line in lines)
+    return f"{lines[0]}\n[diff omitted, {reason}: +{added} -{removed} lines]"
+
+
+def _count_changes(lines) -> Tuple[int, int]:
+    added = removed = 0
+    in_hunk = False
+    for line in lines:
+        if line.startswith(b'@@'):
+            in_hunk = True
+        elif in_hunk and line.startswith(b'+'):
+            added += 1
+        elif in_hunk and line.startswith(b'-'):
+            removed += 1
+    return added, removed
+
+
+def iter_file_patches(repo, *diff_args, paths: Iterable[str] = None, limits: DiffLimits = None) -> Iterator[Tuple[str, str]]:
+    """
+    Runs `git diff <diff_args> [-- paths]` once and yields (path, patch) for every file in the output.
+
+    Args:
+        repo: GitPython Repo to diff in.
+        diff_args: revisions and options passed to `git diff`.
+        paths (Iterable[str], optional): limit the diff to these paths, matched literally.
+        limits (DiffLimits, optional): per-file caps, binary and generated file handling (see split_patch_stream).
+    """
+    # Explicit prefixes: the header parsing expects 'a/' and 'b/' even with diff.noprefix or diff.mnemonicPrefix set
+    args = ['--no-color', '--no-ext-diff', '--no-renames', '--src-prefix=a/', '--dst-prefix=b/', *diff_args]
+    if paths is not None:
+        args.append('--')
+        args.extend(f':(literal){path}' for path in paths)
+    proc = repo.git.diff(*args, as_process=True)
+    yield from split_patch_stream(proc.proc.stdout, limits)
+    # Raises GitCommandError if git exited with an error
+    proc.wait()
+
+
+def get_file_patches(repo, *diff_args, paths: Iterable[str] = None, limits: DiffLimits = None) -> Dict[str, str]:
+    """Same as iter_file_patches, collected into a {path: patch} dict."""
+    return dict(iter_file_patches(repo, *diff_args, paths=paths, limits=limits))
+
+
+def split_patch_stream(stream, limits: DiffLimits = None) -> Iterator[Tuple[str, str]]:
+    """
+    Splits a unified diff read line by line from a binary stream into (path, patch) pairs.
+    Each patch starts with its `diff --git` header line, like the output of `git diff <path>`.
+    With limits, a patch keeps at most limits.max_file_bytes after its header and ends with a note
+    of what was cut; binary and generated files get their header and a stat line instead.
+    """
+    patch = None
+    for chunk, line_start in _read_chunks(stream):
+        if line_start and chunk.startswith(DIFF_HEADER):
+            if patch is not None:
+                yield patch.path, patch.finish()
+            patch = _FilePatch(parse_diff_header_path(chunk), chunk, limits)
+        elif patch is not None:
+            patch.add(chunk, line_start)
+    if patch is not None:
+        yield patch.path, patch.finish()
+
+
+def _read_chunks(stream) -> Iterator[Tuple[bytes, bool]]:
+    """Yields the stream's lines in pieces of at most READ_LINE_LIMIT bytes, flagging the pieces that start a line."""
+    line_start = True
+    while True:
+        chunk = stream.readline(READ_LINE_LIMIT)
+        if not chunk:
+            return
+        yield chunk, line_start
+        line_start = chunk.endswith(b'\n')
+
+
+class _FilePatch:
+    def __init__(self, path: str, header: bytes, limits: DiffLimits = None):
+        self.path = path
+        self.limits = limits
+        self.lines: List[bytes] = [header]
+        self.kept_bytes = 0
+        self.dropped_bytes = 0
+        self.added = 0
+        self.removed = 0
+        self.in_hunk = False
+        self.binary = False
+        self.generated = bool(limits) and limits.is_generated(path)
+
+    def add(self, chunk: bytes, line_start: bool):
+        if line_start:
+            if chunk.startswith(b'@@'):
+                self.in_hunk = True
+            elif self.in_hunk and chunk.startswith(b'+'):
+                self.added += 1
+            elif self.in_hunk and chunk.startswith(b'-'):
+                self.removed += 1
+            elif not self.in_hunk and chunk.startswith((b'Binary files ', b'GIT binary patch')):
+                self.binary = True
+        if self.limits is None:
+            self.lines.append(chunk)
+            return
+        if self.generated or (self.binary and self.limits.skip_binary):
+            return
+        max_bytes = self.limits.max_file_bytes
+        # Once something is dropped the rest is too, so the kept part is a prefix of the patch
+        if self.dropped_bytes or (max_bytes is not None and self.kept_bytes + len(chunk) > max_bytes):
+            self.dropped_bytes += len(chunk)
+            return
+        self.kept_bytes += len(chunk)
+        self.lines.append(chunk)
+
+    def finish(self) -> str:
+        if self.limits is not None:
+            header = _join_patch(self.lines[:1])
+            if self.binary and self.limits.skip_binary:
+                return f"{header}\n[binary file, diff omitted]"
+            if self.generated:
+                return f"{header}\n[diff omitted, generated file: +{self.added} -{self.removed} lines]"
+        patch = _join_patch(self.lines)
+        if self.dropped_bytes:
+            patch += (f"\n[diff truncated after {self.kept_bytes} bytes: {self.dropped_bytes} more bytes, "
+                      f"+{self.added} -{self.removed} lines in total]")
+        return patch
+
+
+def _join_patch(lines) -> str:
+    return b''.join(lines).decode('utf-8', errors='ignore').rstrip('\n')
+
+
+def parse_diff_header_path(header: bytes) -> str:
+    """
+    Returns the file path from a `diff --git a/<path> b/<path>` header line.
+    Renames are disabled for these diffs, so both sides name the same path.
+    """
+    rest = header[len(DIFF_HEADER):].rstrip(b'\r\n')
+    if rest.startswith(b'"'):
+        # Paths with special characters are C-quoted: "a/dir/\303\274.txt" "b/dir/\303\274.txt"
+        quoted, _ = _read_quoted(rest)
+        return quoted[2:]
+    # "a/<path> b/<path>" with both paths of the same length
+    path_length = (len(rest) - 5) // 2
+    return rest[2:2 + path_length].decode('utf-8', errors='replace')
+
+
+def _read_quoted(data: bytes) -> Tuple[str, bytes]:
+    """Reads one C-quoted string from the start of data; returns it and the remaining bytes."""
+    i = 1
+    while i < len(data) and data[i:i + 1] != b'"':
+        # Skip the escaped byte so an escaped quote does not end the string
+        i += 2 if data[i:i + 1] == b'\\' else 1
+    unescaped = codecs.escape_decode(data[1:i])[0]
+    return unescaped.decode('utf-8', errors='replace'), data[i + 1:]
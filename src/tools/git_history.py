@@ -0,0 +1,140 @@
+"""
+Streaming reader for git commit history.
+
+Reads the commits of a repository together with the files each commit touched from a single
+`git log --numstat -z` process, parsing the output as it arrives instead of asking git for the
+stats of every commit separately.
+"""
+import subprocess
+from typing import Iterable, Iterator, List
+
+# Separators used in the --format string: every commit starts with RECORD_SEP and its header
+# fields are separated by FIELD_SEP. Neither byte shows up in normal commit metadata.
+RECORD_SEP = b'\x1e'
+FIELD_SEP = b'\x1f'
+LOG_FORMAT = '--format=%x1e%H%x1f%an%x1f%ae%x1f%ct%x1f%B'
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+# Walks every branch, tag and remote branch, but not the stash, whose WIP commits are not work anyone committed
+ALL_REFS = ['--exclude=refs/stash', '--all']
+
+
+def history_filters(since_date=None, until_date=None, author=None) -> List[str]:
+    """
+    Returns the `git log`/`git rev-list` arguments that select commits inside the window and by
+    the author, so git does the filtering and other commits never reach Python.
+
+    Args:
+        since_date (str, optional): YYYY-MM-DD; commits from the start of that day (local time).
+        until_date (str, optional): YYYY-MM-DD; commits up to the end of that day.
+        author (str, optional): Case-insensitive substring of the author's "Name <email>".
+    """
+    args = []
+    # A bare date would mean the current time of day on that date
+    if since_date:
+        args.append(f'--since={since_date} 00:00:00')
+    if until_date:
+        args.append(f'--until={until_date} 23:59:59')
+    if author:
+        # --fixed-strings: names like "J. Doe (Contractor)" are not regular expressions
+        args.extend([f'--author={author}', '--fixed-strings', '--regexp-ignore-case'])
+    return args
+
+
+def iter_commit_history(repo, since_date=None, extra_args: List[str] = None, revisions: Iterable[str] = None,
+                        refs: List[str] = None) -> Iterator[dict]:
+    """
+    Yields one dict per commit reachable from HEAD (or refs), newest first, as `git log` produces them.
+    When revisions is given, yields exactly those commits instead, in the given order.
+
+    Each dict has 'commit', 'author', 'author_email', 'committed_date' (unix timestamp),
+    'message' and 'files' (paths changed by the commit, compared to its first parent,
+    the same files GitPython's commit.stats reports).
+
+    Args:
+        repo: GitPython Repo to read.
+        since_date (str, optional): passed to git as --since.
+        extra_args (List[str], optional): additional `git log` arguments, e.g. from history_filters.
+        revisions (Iterable[str], optional): commit SHAs to read, fed to git on stdin.
+        refs (List[str], optional): branches to walk instead of HEAD, or ALL_REFS.
+    """
+    args = ['-z', '--numstat', '--no-renames', '--diff-merges=first-parent', LOG_FORMAT]
+    if since_date:
+        args.append(f'--since={since_date}')
+    if extra_args:
+        args.extend(extra_args)
+    if revisions is None:
+        proc = repo.git.log(*args, *(refs or []), '--', as_process=True)
+    else:
+        # git reads all of stdin before it starts writing, so the list can be sent up front
+        proc = repo.git.log(*args, '--no-walk=unsorted', '--stdin', as_process=True, istream=subprocess.PIPE)
+        proc.proc.stdin.write(''.join(f'{sha}\n' for sha in revisions).encode('ascii'))
+        proc.proc.stdin.close()
+    yield from parse_log_stream(proc.proc.stdout)
+    # Raises GitCommandError if git exited with an error
+    proc.wait()
+
+
+def list_commit_shas(repo, since_date=None, extra_args: List[str] = None, refs: List[str] = None) -> List[str]:
+    """
+    Returns the SHAs `iter_commit_history` would yield for the same arguments, without reading
+    any commit metadata or file stats.
+    """
+    args = []
+    if since_date:
+        args.append(f'--since={since_date}')
+    if extra_args:
+        args.extend(extra_args)
+    return repo.git.rev_list(*args, *(refs or ['HEAD']), '--').split()
+
+
+def parse_log_stream(stream) -> Iterator[dict]:
+    """
+    Parses the output of `git log -z --numstat` with LOG_FORMAT from a binary stream,
+    yielding each commit as soon as the start of the next one has been read.
+    """
+    buffer = b''
+    # Position from which to look for the next separator, so a record spanning several
+    # chunks is not rescanned from its start on every read
+    scan_from = 1
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(RECORD_SEP, max(start + 1, scan_from))
+            if end == -1:
+                break
+            if buffer[start:start + 1] == RECORD_SEP:
+                yield _parse_record(buffer[start + 1:end])
+            start = end
+        buffer = buffer[start:]
+        scan_from = max(len(buffer), 1)
+    if buffer.startswith(RECORD_SEP):
+        yield _parse_record(buffer[1:])
+
+
+def _parse_record(record: bytes) -> dict:
+    # The header runs up to the first NUL, followed by one NUL-terminated numstat entry per file
+    header, _, stats = record.partition(b'\0')
+    sha, author, email, committed_date, message = header.split(FIELD_SEP, 4)
+    files = []
+    for entry in stats.split(b'\0'):
+        entry = entry.lstrip(b'\n')
+        if not entry:
+            continue
+        parts = entry.split(b'\t', 2)
+        if len(parts) == 3:
+            files.append(parts[2].decode('utf-8', errors='replace'))
+    return {
+        "commit": sha.decode('ascii'),
+        "author": author.decode('utf-8', errors='replace'),
+        "author_email": email.decode('utf-8', errors='replace'),
+        "committed_date": int(committed_date),
+        "message": message.decode('utf-8', errors='replace'),
+        "files": files,
+    }
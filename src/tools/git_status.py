@@ -0,0 +1,96 @@
+"""
+Working tree status from a single `git status --porcelain=v2 -z` run.
+"""
+import hashlib
+import os
+from typing import Dict, Iterator, List
+
+STATUS_ARGS = ['--porcelain=v2', '-z', '--untracked-files=all', '--no-renames']
+
+
+def get_working_tree_status(repo) -> Dict[str, List[str]]:
+    """
+    Returns {'added': [...], 'modified': [...], 'removed': [...]} for the working tree of repo,
+    covering untracked files, unstaged changes and staged changes in one git call.
+    """
+    output = repo.git.status(*STATUS_ARGS, stdout_as_string=False)
+    return parse_porcelain_v2(output)
+
+
+def parse_porcelain_v2(output: bytes) -> Dict[str, List[str]]:
+    """
+    Parses `git status --porcelain=v2 -z` output into added, modified and removed file lists.
+
+    Untracked files and files newly added to the index are 'added'; files modified in the index
+    or the working tree are 'modified'; files deleted in either are 'removed'. Every file is
+    listed once per category, in the order git reports it.
+    """
+    # dicts used as ordered sets keep deduplication linear in the number of entries
+    added, modified, removed = {}, {}, {}
+    entries = output.split(b'\0')
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        i += 1
+        if not entry:
+            continue
+        kind = entry[:1]
+        if kind == b'?':
+            added[_decode(entry[2:])] = None
+        elif kind in (b'1', b'2', b'u'):
+            # Ordinary: "1 XY sub mH mI mW hH hI path"; renamed: "2 ... Xscore path\0origPath";
+            # unmerged: "u XY sub m1 m2 m3 mW h1 h2 h3 path"
+            field_count = {b'1': 9, b'2': 10, b'u': 11}[kind]
+            fields = entry.split(b' ', field_count - 1)
+            staged, unstaged = fields[1][:1], fields[1][1:2]
+            path = _decode(fields[-1])
+            if kind == b'2':
+                # Skip the original path of a rename or copy
+                i += 1
+            if staged == b'A':
+                added[path] = None
+            elif staged == b'M' or unstaged == b'M':
+                modified[path] = None
+            if staged == b'D' or unstaged == b'D':
+                removed[path] = None
+    return {"added": list(added), "modified": list(modified), "removed": list(removed)}
+
+
+def get_working_tree_fingerprint(repo) -> str:
+    """
+    Returns a hash that changes whenever the uncommitted state of repo changes. The status output
+    covers which files are changed and the staged content (it lists index object ids); the size and
+    modification time of every listed file cover further edits to files that were already modified.
+    """
+    output = repo.git.status(*STATUS_ARGS, stdout_as_string=False)
+    digest = hashlib.sha1(output)
+    for path in iter_status_paths(output):
+        try:
+            st = os.lstat(os.path.join(repo.working_dir, path.decode('utf-8', errors='surrogateescape')))
+            digest.update(f"\0{st.st_size}:{st.st_mtime_ns}".encode('ascii'))
+        except OSError:
+            digest.update(b"\0missing")
+    return digest.hexdigest()
+
+
+def iter_status_paths(output: bytes) -> Iterator[bytes]:
+    """Yields the path of every entry in `git status --porcelain=v2 -z` output, undecoded."""
+    entries = output.split(b'\0')
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        i += 1
+        if not entry:
+            continue
+        kind = entry[:1]
+        if kind == b'?':
+            yield entry[2:]
+        elif kind in (b'1', b'2', b'u'):
+            field_count = {b'1': 9, b'2': 10, b'u': 11}[kind]
+            yield entry.split(b' ', field_count - 1)[-1]
+            if kind == b'2':
+                i += 1
+
+
+def _decode(path: bytes) -> str:
+    return path.decode('utf-8', errors='replace')
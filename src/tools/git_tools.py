@@ -1,16 +1,53 @@
+import hashlib
 import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from git import Repo, InvalidGitRepositoryError, GitCommandError, Git
 from typing import List
+from src.tools.commit_cache import CommitCache
+from src.tools.git_history import iter_commit_history, list_commit_shas, history_filters, ALL_REFS
+from src.tools.git_diff import iter_file_patches, EMPTY_TREE_SHA, DiffLimits
+from src.tools.git_status import get_working_tree_status, get_working_tree_fingerprint
+from src.utils.tracing import span, propagate
+
+# Default number of repositories scanned at the same time.
+DEFAULT_MAX_WORKERS = 8
+# Seconds to wait for each repository, counted from when its scan starts; a hung repository
+# (network drive, lock wait) gets None in its slot after this instead of blocking the scan
+DEFAULT_REPO_TIMEOUT = 120
+
+# Diff modes for get_changes_since_date: one diff per file per commit, or one net diff for the whole window
+DIFF_MODE_COMMIT = "commit"
+DIFF_MODE_RANGE = "range"
+
+# Above this many characters of paths, range diffs run unrestricted and the files are picked from the output
+MAX_PATHSPEC_LENGTH = 8000
 
 class GitTools:
-    def __init__(self, project_dirs: List[str], mark_as_safe: bool = False):
+    def __init__(self, project_dirs: List[str], mark_as_safe: bool = False, max_workers: int = DEFAULT_MAX_WORKERS, repo_timeout: float = DEFAULT_REPO_TIMEOUT, commit_cache: CommitCache = None,
+                 diff_limits: DiffLimits = None):
+        """
+        project_dirs: list of repository directories to operate on.
+        mark_as_safe: add every directory to git's global safe.directory list.
+        max_workers: number of repositories scanned in parallel (1 scans them one after another).
+        repo_timeout: seconds to wait for each repository, counted from when its scan starts, before giving up on it (default 120; None waits forever).
+        commit_cache: optional CommitCache; commit metadata and patches found in it are not read from git again.
+        diff_limits: per-file and per-call byte caps, binary and generated file handling for all diffs (default DiffLimits()).
+        """
         # Accept a list of project directories
         if isinstance(project_dirs, str):
             project_dirs = [project_dirs]
         if not isinstance(project_dirs, list):
             raise TypeError("project_dirs must be a list of directory paths (str)")
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
         self.project_dirs = project_dirs
+        self.max_workers = max_workers
+        self.repo_timeout = repo_timeout
+        self.commit_cache = commit_cache
+        self.diff_limits = diff_limits or DiffLimits()
         self.repos = self.get_git_repos()
         if mark_as_safe:
             for repo, dir_path in zip(self.repos, self.project_dirs):
@@ -34,6 +71,8 @@ class GitTools:
             git_dir = os.path.join(dir_path, '.git')
             if not os.path.exists(git_dir):
                 print(f"Directory '{dir_path}' is not a git repository.")
+                # Keep a placeholder so repos stays aligned with project_dirs
+                repos.append(None)
                 continue
             try:
                 repos.append(Repo(dir_path))
@@ -42,128 +81,330 @@ class GitTools:
                 repos.append(None)
         return repos
 
+    def _map_repos(self, worker, *args):
+        """
+        Runs worker(repo, dir_path, *args) for every project dir and returns the results in project_dirs order.
+        At most max_workers repositories are scanned at the same time; a repo that fails or does not finish
+        within repo_timeout of its start gets None in its slot. A timed-out repo gives up its place to the
+        next one, so it does not hold up the repos queued behind it.
+        """
+        items = list(zip(self.repos, self.project_dirs))
+        if not items:
+            return []
+        # Without a timeout nothing needs a pool for one worker; with one, even a single repo runs
+        # on the pool so the scan can stop waiting for it
+        if self.repo_timeout is None and (self.max_workers == 1 or len(items) == 1):
+            return [self._run_worker(worker, repo, dir_path, *args) for repo, dir_path in items]
+
+        results = [None] * len(items)
+        queued = deque(range(len(items)))
+        # future -> (index, deadline) of the repos being scanned
+        running = {}
+        # One thread per repo at most: a timed-out repo keeps its thread until it finishes, but not its place
+        executor = ThreadPoolExecutor(max_workers=len(items), thread_name_prefix="git-scan")
+        try:
+            while queued or running:
+                while queued and len(running) < self.max_workers:
+                    index = queued.popleft()
+                    repo, dir_path = items[index]
+                    # Each task carries the caller's tracing context, so per-repo spans nest under the caller's span
+                    future = executor.submit(propagate(self._run_worker), worker, repo, dir_path, *args)
+                    deadline = None if self.repo_timeout is None else time.monotonic() + self.repo_timeout
+                    running[future] = (index, deadline)
+                deadlines = [deadline for _, deadline in running.values() if deadline is not None]
+                timeout = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, _ = running.pop(future)
+                    results[index] = future.result()
+                now = time.monotonic()
+                for future, (index, deadline) in list(running.items()):
+                    if deadline is not None and deadline <= now and not future.done():
+                        del running[future]
+                        print(f"Timed out reading git repository {items[index][1]}.")
+            return results
+        finally:
+            # Do not block on repos that timed out; their threads finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_worker(self, worker, repo, dir_path, *args):
+        if not repo:
+            print(f"No git repository found for {dir_path}.")
+            return None
+        try:
+            with span("git.repo", repo=dir_path):
+                return worker(repo, dir_path, *args)
+        except Exception as e:
+            print(f"Error reading git repository {dir_path}: {e}")
+            return None
+
     def get_current_changes(self, with_diffs=False):
         """
         Returns a dict with lists of added, modified, and removed files in the working directory for all project dirs.
-        If with_diffs is True, also returns the diffs for modified files.
+        If with_diffs is True, also returns the diffs for modified files, capped by diff_limits
+        (the per-run cap covers all repositories of the call).
         """
-        results = []
-        for repo, dir_path in zip(self.repos, self.project_dirs):
-            if not repo:
-                print(f"No git repository found for {dir_path}.")
-                results.append(None)
-                continue
-            added, modified, removed = [], [], []
-            diffs = {}
-            try:
-                for path in repo.untracked_files:
-                    added.append(path)
-                for item in repo.index.diff(None):
-                    if item.change_type == 'M':
-                        modified.append(item.a_path)
-                    elif item.change_type == 'D':
-                        removed.append(item.a_path)
-                for item in repo.index.diff('HEAD'):
-                    if item.change_type == 'A' and item.a_path not in added:
-                        added.append(item.a_path)
-                    elif item.change_type == 'M' and item.a_path not in modified:
-                        modified.append(item.a_path)
-                    elif item.change_type == 'D' and item.a_path not in removed:
-                        removed.append(item.a_path)
-                if with_diffs:
-                    for file_path in modified:
-                        try:
-                            diff_text = repo.git.diff(file_path)
-                            diffs[file_path] = diff_text
-                        except Exception as e:
-                            diffs[file_path] = f"Error getting diff: {e}"
-                result = {
-                    "project_dir": dir_path,
-                    "added": added,
-                    "modified": modified,
-                    "removed": removed
-                }
-                if with_diffs:
-                    result["diffs"] = diffs
-                results.append(result)
-            except GitCommandError as e:
-                print(f"Git error in {dir_path}: {e}")
-                results.append(None)
-        return results
-
-    def get_changes_since_date(self, since_date, with_diffs=False, with_commit_messages=False, author=None):
+        budget = self.diff_limits.new_budget()
+        with span("git.current_changes", repos=len(self.project_dirs), with_diffs=with_diffs):
+            return self._map_repos(self._current_changes_for_repo, with_diffs, budget)
+
+    def _current_changes_for_repo(self, repo, dir_path, with_diffs, budget):
+        diffs = {}
+        try:
+            # One `git status --porcelain=v2` run covers untracked, unstaged and staged changes
+            status = get_working_tree_status(repo)
+            modified = status["modified"]
+            if with_diffs and modified:
+                # Working tree diffs for all modified files come from one `git diff`, split per file;
+                # files modified only in the index have no working tree diff and map to ''
+                diffs = dict.fromkeys(modified, '')
+                try:
+                    for path, patch in iter_file_patches(repo, limits=self.diff_limits):
+                        if path in diffs:
+                            diffs[path] = budget.admit(patch)
+                except Exception as e:
+                    diffs = {file_path: f"Error getting diff: {e}" for file_path in modified}
+            result = {
+                "project_dir": dir_path,
+                "added": status["added"],
+                "modified": modified,
+                "removed": status["removed"]
+            }
+            if with_diffs:
+                result["diffs"] = diffs
+            return result
+        except GitCommandError as e:
+            print(f"Git error in {dir_path}: {e}")
+            return None
+
+    def get_changes_since_date(self, since_date, with_diffs=False, with_commit_messages=False, author=None, diff_mode=DIFF_MODE_COMMIT,
+                               until_date=None, branches=None, all_branches=False):
         """
         Returns a dict with a list of files changed in commits since the given date (YYYY-MM-DD),
-        optionally their diffs, and optionally the commit messages. If author is specified, includes commits where the author's name or email contains the substring (case-insensitive).
+        optionally their diffs, and optionally the commit messages. If author is specified, includes commits where the author's name or email contains the substring (case-insensitive);
+        otherwise each repository's own user.name (see resolve_authors).
+        until_date (YYYY-MM-DD, inclusive) ends the window. Commits reachable from HEAD are read, or from the
+        given branches, or with all_branches from every branch, tag and remote branch.
+        The author and the window are passed to git (--author, --since, --until), so other commits are never read.
+        diff_mode selects how diffs are collected: DIFF_MODE_COMMIT diffs every file of every commit against its parent,
+        DIFF_MODE_RANGE computes the net diff of the author's files from the last commit before since_date to HEAD
+        (or the last commit up to until_date) in a single git call; with branches or all_branches, one call per
+        ref that moved in the window, each from that ref's own history. Diffs are capped by diff_limits; the per-run
+        cap covers all repositories of the call.
         Runs for all project dirs.
         """
-        results = []
+        if diff_mode not in (DIFF_MODE_COMMIT, DIFF_MODE_RANGE):
+            raise ValueError(f"Unknown diff_mode: {diff_mode}")
+        try:
+            for date in (since_date, until_date):
+                if date is not None:
+                    datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            print("Date format should be YYYY-MM-DD")
+            return [None for _ in self.project_dirs]
 
-        # Get the global git user.name just in case
-        global_user_name = self.get_global_user_name()
+        authors = self.resolve_authors(author)
+        refs = ALL_REFS if all_branches else branches
+        budget = self.diff_limits.new_budget()
 
-        for repo, dir_path in zip(self.repos, self.project_dirs):
+        def worker(repo, dir_path):
+            filters = history_filters(since_date, until_date, authors.get(dir_path))
+            return self._changes_since_date_for_repo(repo, dir_path, filters, refs, since_date, until_date,
+                                                     with_diffs, with_commit_messages, diff_mode, budget)
+        with span("git.changes_since_date", repos=len(self.project_dirs), with_diffs=with_diffs, diff_mode=diff_mode):
+            return self._map_repos(worker)
+
+    def resolve_authors(self, author=None):
+        """
+        Returns {project_dir: author} with the author each repository's commits are filtered by:
+        the given author, else the repository's user.name, else the global user.name.
+        Every repository resolves its own identity, so one repository's user never filters another's commits.
+        """
+        authors = {}
+        global_user_name = None
+        for repo_index, (repo, dir_path) in enumerate(zip(self.repos, self.project_dirs)):
             if not repo:
-                print(f"No git repository found for {dir_path}.")
-                results.append(None)
-                continue
-            try:
-                since = datetime.strptime(since_date, "%Y-%m-%d")
-            except ValueError:
-                print("Date format should be YYYY-MM-DD")
-                results.append(None)
                 continue
+            repo_author = author
+            if not repo_author:
+                # Get the user name from the get_local_user_info
+                local_user_info = self.get_local_user_info(repo_index=repo_index)
+                repo_author = local_user_info.get('name') if local_user_info else None
+            if not repo_author:
+                # If local user info is NOT available, then use global user name (read once)
+                if global_user_name is None:
+                    global_user_name = self.get_global_user_name() or ""
+                repo_author = global_user_name or None
+            authors[dir_path] = repo_author
+        return authors
 
-            # Get the user name and email from the get_local_user_info
-            local_user_info = self.get_local_user_info(repo_index=self.project_dirs.index(dir_path)) if self.project_dirs else None
-            if local_user_info:
-                author = author or local_user_info.get('name', None)
+    def get_commit_records(self, since_date, until_date=None, branches=None, all_branches=False):
+        """
+        Returns, for every project dir, {'project_dir', 'commits'} with the commits of all authors
+        since since_date (YYYY-MM-DD), newest first, as records from iter_commit_history. Batch runs
+        read each repository once this way and pick every author's commits from the records.
+        until_date, branches and all_branches work as in get_changes_since_date.
+        A repository that cannot be read gets None.
+        """
+        filters = history_filters(since_date, until_date)
+        refs = ALL_REFS if all_branches else branches
+        with span("git.commit_records", repos=len(self.project_dirs)):
+            return self._map_repos(self._commit_records_for_repo, filters, refs)
 
-            # If local user info is NOT available, then use global user name
-            if not local_user_info and not author:
-                author = global_user_name
+    def _commit_records_for_repo(self, repo, dir_path, filters, refs):
+        return {"project_dir": dir_path, "commits": list(self._read_history(repo, filters, refs))}
 
-            changed_files = set()
-            diffs = {}
-            commit_messages = []
-            try:
-                for commit in repo.iter_commits(since=since_date):
-                    commit_date = datetime.fromtimestamp(commit.committed_date)
-                    # Author filtering: substring match (case-insensitive) on name or email
-                    if author:
-                        author_lower = author.lower()
-                        commit_author_name = commit.author.name.lower() if commit.author.name else ''
-                        commit_author_email = commit.author.email.lower() if commit.author.email else ''
-                        if author_lower not in commit_author_name and author_lower not in commit_author_email:
-                            continue
-                    if commit_date >= since:
-                        commit_messages.append({
-                            "commit": commit.hexsha,
-                            "author": commit.author.name,
-                            "date": commit_date.isoformat(),
-                            "message": commit.message.strip()
-                        })
-                        for file in commit.stats.files.keys():
-                            changed_files.add(file)
-                            if with_diffs:
-                                try:
-                                    diff_text = commit.diff(commit.parents[0] if commit.parents else None, paths=file, create_patch=True)
-                                    if diff_text:
-                                        diffs[file] = '\n'.join([d.diff.decode('utf-8', errors='ignore') if hasattr(d.diff, 'decode') else str(d.diff) for d in diff_text])
-                                    else:
-                                        diffs[file] = ''
-                                except Exception as e:
-                                    diffs[file] = f"Error getting diff: {e}"
-                result = {"project_dir": dir_path, "changed_files": list(changed_files)}
-                if with_diffs:
-                    result["diffs"] = diffs
-                if with_commit_messages:
-                    result["commit_messages"] = commit_messages
-                results.append(result)
-            except Exception as e:
-                print(f"Error reading commits in {dir_path}: {e}")
-                results.append(None)
-        return results
+    def get_repo_states(self, with_working_tree=True):
+        """
+        Returns, for every project dir, {'project_dir', 'head', 'working_tree'}: the HEAD commit SHA
+        (None for a repository without commits) and a fingerprint of the uncommitted changes
+        (see get_working_tree_fingerprint). Cheap enough to run before every report to tell
+        whether anything changed. A directory that is not a readable repository gets None.
+        """
+        with span("git.repo_states", repos=len(self.project_dirs)):
+            return self._map_repos(self._repo_state, with_working_tree)
+
+    def _repo_state(self, repo, dir_path, with_working_tree):
+        try:
+            head = repo.git.rev_parse('--verify', '-q', 'HEAD')
+        except GitCommandError:
+            head = None
+        working_tree = get_working_tree_fingerprint(repo) if with_working_tree else None
+        return {"project_dir": dir_path, "head": head, "working_tree": working_tree}
+
+    def _changes_since_date_for_repo(self, repo, dir_path, filters, refs, since_date, until_date, with_diffs, with_commit_messages, diff_mode, budget):
+        changed_files = set()
+        diffs = {}
+        commit_messages = []
+        try:
+            # git has already filtered by author and date
+            for record in self._read_history(repo, filters, refs):
+                commit_messages.append({
+                    "commit": record["commit"],
+                    "author": record["author"],
+                    "date": datetime.fromtimestamp(record["committed_date"]).isoformat(),
+                    "message": record["message"].strip()
+                })
+                changed_files.update(record["files"])
+                if with_diffs and diff_mode == DIFF_MODE_COMMIT:
+                    for path, patch in self._commit_diffs(repo, record).items():
+                        diffs[path] = budget.admit(patch)
+            if with_diffs and diff_mode == DIFF_MODE_RANGE:
+                diffs = {path: budget.admit(patch) for path, patch in self._range_diffs(repo, since_date, changed_files, until_date, refs).items()}
+            result = {"project_dir": dir_path, "changed_files": list(changed_files)}
+            if with_diffs:
+                result["diffs"] = diffs
+            if with_commit_messages:
+                result["commit_messages"] = commit_messages
+            return result
+        except Exception as e:
+            print(f"Error reading commits in {dir_path}: {e}")
+            return None
+
+    def _read_history(self, repo, filters, refs=None):
+        """
+        Returns the commit records selected by filters (see history_filters) on refs (default HEAD), newest
+        first. Without a cache they come from one streamed `git log --numstat` process; with a cache only
+        the commits it has not seen are read from git.
+        """
+        if not self.commit_cache:
+            return iter_commit_history(repo, extra_args=filters, refs=refs)
+        repo_key = CommitCache.repo_key(repo)
+        shas = list_commit_shas(repo, extra_args=filters, refs=refs)
+        records = self.commit_cache.get_commits(repo_key, shas)
+        missing = [sha for sha in shas if sha not in records]
+        if missing:
+            fetched = list(iter_commit_history(repo, revisions=missing))
+            self.commit_cache.put_commits(repo_key, fetched)
+            records.update((record["commit"], record) for record in fetched)
+        return [records[sha] for sha in shas if sha in records]
+
+    def _commit_diffs(self, repo, record):
+        """
+        Returns {file: patch} for every file of the commit, diffed against its first parent in one
+        streamed `git diff`, with diff_limits applied to every patch.
+        """
+        repo_key = CommitCache.repo_key(repo) if self.commit_cache else None
+        # Patches are stored as capped by the limits, so other limits need their own entry
+        cache_key = f"{record['commit']}:{self.diff_limits.cache_tag()}"
+        if repo_key:
+            cached = self.commit_cache.get_patches(repo_key, cache_key)
+            if cached is not None:
+                return cached
+        commit = repo.commit(record["commit"])
+        parent = commit.parents[0].hexsha if commit.parents else EMPTY_TREE_SHA
+        diffs = dict.fromkeys(record["files"], '')
+        try:
+            for path, patch in iter_file_patches(repo, parent, commit.hexsha, limits=self.diff_limits):
+                if path in diffs:
+                    diffs[path] = patch
+        except GitCommandError as e:
+            return {path: f"Error getting diff: {e}" for path in record["files"]}
+        if repo_key:
+            self.commit_cache.put_patches(repo_key, cache_key, diffs)
+        return diffs
+
+    def _range_diffs(self, repo, since_date, changed_files, until_date=None, refs=None):
+        """
+        Returns {file: patch} with the net change of changed_files between the last commit before
+        since_date and HEAD (or the last commit up to the end of until_date), taken from one `git diff` call.
+        With refs (branches, or ALL_REFS), every ref gets its own range from its own history, and a
+        file changed differently on several of them gets their patches one after another.
+        Files whose net change is empty map to ''.
+        """
+        if not changed_files:
+            return {}
+        paths = sorted(changed_files)
+        ranges = []
+        for rev in self._range_revisions(repo, refs):
+            base = repo.git.rev_list('-1', f'--before={since_date} 00:00:00', rev, '--').strip() or EMPTY_TREE_SHA
+            if until_date:
+                target = repo.git.rev_list('-1', f'--before={until_date} 23:59:59', rev, '--').strip() or EMPTY_TREE_SHA
+            else:
+                target = repo.git.rev_parse('--verify', f'{rev}^{{commit}}')
+            # Refs that did not move in the window, or share their range with another ref, add nothing
+            if base != target and (base, target) not in ranges:
+                ranges.append((base, target))
+        diffs = {path: [] for path in paths}
+        for base, target in ranges:
+            for path, patch in self._range_diff(repo, base, target, paths).items():
+                if patch and patch not in diffs[path]:
+                    diffs[path].append(patch)
+        return {path: '\n'.join(patches) for path, patches in diffs.items()}
+
+    @staticmethod
+    def _range_revisions(repo, refs):
+        """The revisions range diffs end at: HEAD, the given branches, or for ALL_REFS HEAD and every branch, tag and remote branch."""
+        if not refs:
+            return ['HEAD']
+        if refs == ALL_REFS:
+            names = repo.git.for_each_ref('--format=%(refname)', 'refs/heads', 'refs/remotes', 'refs/tags').split()
+            return ['HEAD', *names]
+        return list(refs)
+
+    def _range_diff(self, repo, base, target, paths):
+        """Returns {file: patch} for paths between two commits, from one `git diff` call (cached by SHA)."""
+        repo_key, cache_key = None, None
+        if self.commit_cache:
+            # base and target are SHAs, so the net diff for the same paths never changes
+            repo_key = CommitCache.repo_key(repo)
+            paths_hash = hashlib.sha1('\0'.join(paths).encode('utf-8')).hexdigest()
+            cache_key = f"{base}..{target}:{paths_hash}:{self.diff_limits.cache_tag()}"
+            cached = self.commit_cache.get_patches(repo_key, cache_key)
+            if cached is not None:
+                return cached
+        pathspec = paths if sum(len(path) + 1 for path in paths) <= MAX_PATHSPEC_LENGTH else None
+        diffs = dict.fromkeys(paths, '')
+        try:
+            # Patches of files outside changed_files are dropped as they stream by
+            for path, patch in iter_file_patches(repo, base, target, paths=pathspec, limits=self.diff_limits):
+                if path in diffs:
+                    diffs[path] = patch
+        except GitCommandError as e:
+            return {path: f"Error getting diff: {e}" for path in paths}
+        if cache_key:
+            self.commit_cache.put_patches(repo_key, cache_key, diffs)
+        return diffs
 
     def get_global_user_name(self):
         """
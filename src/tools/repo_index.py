@@ -0,0 +1,255 @@
+import configparser
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Workspace roots to index, separated by os.pathsep (";" on Windows, ":" elsewhere)
+WORKSPACE_ROOTS_ENV = "SYL_WORKSPACE_ROOTS"
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".syl", "cache", "repo_index.json")
+DEFAULT_MAX_DEPTH = 4
+# Seconds between checks of the walked directories' mtimes, so back-to-back lookups stay O(1)
+FRESHNESS_CHECK_INTERVAL = 5.0
+INDEX_VERSION = 1
+
+# Directories that never contain repositories worth indexing
+SKIP_DIRS = {"node_modules", "__pycache__", ".venv", "venv", ".tox", ".mypy_cache", ".pytest_cache", "bin", "obj"}
+
+
+def get_default_workspace_roots() -> List[str]:
+    """Returns the workspace roots configured in the SYL_WORKSPACE_ROOTS environment variable."""
+    value = os.environ.get(WORKSPACE_ROOTS_ENV, "")
+    return [root for root in value.split(os.pathsep) if root.strip()]
+
+
+def find_repo_root(path: str, stop_at: str = None) -> Optional[str]:
+    """
+    Walks up from path (a file or directory) to the closest directory containing .git.
+    stop_at: optional directory the walk does not go above.
+    """
+    current = os.path.abspath(path)
+    if not os.path.isdir(current):
+        current = os.path.dirname(current)
+    stop_at = os.path.abspath(stop_at) if stop_at else None
+    while True:
+        if os.path.exists(os.path.join(current, ".git")):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current or current == stop_at:
+            return None
+        current = parent
+
+
+class RepoIndex:
+    def __init__(self, workspace_roots: List[str] = None, index_path: str = DEFAULT_INDEX_PATH, max_depth: int = DEFAULT_MAX_DEPTH):
+        """
+        Index of the git repositories under a set of workspace roots, so project names and paths
+        mentioned by users can be resolved to repository directories without walking the filesystem.
+
+        workspace_roots: directories to index; defaults to get_default_workspace_roots().
+        index_path: JSON file the index is persisted to (None keeps it in memory only).
+        max_depth: how many directory levels below a root are searched for repositories.
+        """
+        roots = workspace_roots if workspace_roots is not None else get_default_workspace_roots()
+        self.workspace_roots = [os.path.abspath(root) for root in roots]
+        self.index_path = index_path
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._repos: List[dict] = []
+        self._by_name: Dict[str, List[dict]] = {}
+        self._dir_mtimes: Dict[str, float] = {}
+        self._loaded = False
+        self._built = False
+        self._checked_at = 0.0
+
+    @property
+    def repos(self) -> List[dict]:
+        """Every indexed repository as {'name', 'path', 'remote'}."""
+        self._ensure_fresh()
+        return list(self._repos)
+
+    def refresh(self, force: bool = False):
+        """
+        Rebuilds the index if any directory that was walked has changed since it was built
+        (a repository was added, moved or removed), or always when force is True.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+            if not force and time.monotonic() - self._checked_at < FRESHNESS_CHECK_INTERVAL:
+                return
+            if force or not self._is_fresh():
+                self._build()
+                self._save()
+            self._checked_at = time.monotonic()
+
+    def resolve(self, reference: str) -> Optional[str]:
+        """
+        Resolves a repository name ("backend-api"), an absolute path or a workspace-relative path
+        ("ProjectA/src/main.py") to the root directory of the repository it belongs to.
+        Returns None when it cannot be resolved unambiguously.
+        """
+        reference = (reference or "").strip().strip('"\'').rstrip("/\\")
+        if not reference:
+            return None
+        if os.path.isabs(reference):
+            return find_repo_root(reference) if os.path.exists(reference) else None
+        self._ensure_fresh()
+        # Exact repository name: a dictionary lookup
+        repo = self._unique(reference)
+        if repo:
+            return repo["path"]
+        # A path inside a repository: the first segment that names a repository wins
+        segments = [segment for segment in reference.replace("\\", "/").split("/") if segment]
+        for i, segment in enumerate(segments):
+            repo = self._unique(segment)
+            if repo:
+                inner = os.path.join(repo["path"], *segments[i + 1:])
+                if i + 1 == len(segments) or os.path.exists(inner):
+                    return repo["path"]
+        # A path relative to one of the workspace roots
+        for root in self.workspace_roots:
+            candidate = os.path.join(root, *segments)
+            if os.path.exists(candidate):
+                found = find_repo_root(candidate, stop_at=root)
+                if found:
+                    return found
+        return None
+
+    def resolve_all(self, references: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Resolves every reference. Returns (repository paths, unresolved references);
+        repository paths are deduplicated and keep the order of the references.
+        """
+        resolved, unresolved = {}, []
+        for reference in references:
+            path = self.resolve(reference)
+            if path:
+                resolved[path] = None
+            else:
+                unresolved.append(reference)
+        return list(resolved), unresolved
+
+    def _unique(self, name: str) -> Optional[dict]:
+        matches = self._by_name.get(name.lower())
+        if matches and len(matches) == 1:
+            return matches[0]
+        return None
+
+    def _ensure_fresh(self):
+        if self.workspace_roots:
+            self.refresh()
+
+    def _is_fresh(self) -> bool:
+        if not self._built:
+            return False
+        for path, mtime in self._dir_mtimes.items():
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _build(self):
+        repos, dir_mtimes = [], {}
+        for root in self.workspace_roots:
+            self._walk(root, 0, repos, dir_mtimes)
+        self._set(repos, dir_mtimes)
+
+    def _walk(self, directory, depth, repos, dir_mtimes):
+        try:
+            mtime = os.stat(directory).st_mtime
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        if any(entry.name == ".git" for entry in entries):
+            repos.append({"name": os.path.basename(directory), "path": directory, "remote": self._read_remote(directory)})
+            # Repositories are not searched for nested repositories, and edits inside them do not
+            # invalidate the index; adding, moving or removing one changes its parent's mtime
+            return
+        dir_mtimes[directory] = mtime
+        if depth >= self.max_depth:
+            return
+        for entry in entries:
+            if entry.name.startswith(".") or entry.name in SKIP_DIRS:
+                continue
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                self._walk(entry.path, depth + 1, repos, dir_mtimes)
+
+    @staticmethod
+    def _read_remote(repo_path) -> Optional[str]:
+        """Reads the origin (or first) remote URL straight from .git/config, without starting git."""
+        config_path = os.path.join(repo_path, ".git", "config")
+        if not os.path.isfile(config_path):
+            return None
+        parser = configparser.ConfigParser(strict=False, interpolation=None)
+        try:
+            parser.read(config_path, encoding="utf-8")
+        except configparser.Error:
+            return None
+        remotes = [section for section in parser.sections() if section.startswith("remote ")]
+        remotes.sort(key=lambda section: section != 'remote "origin"')
+        for section in remotes:
+            url = parser.get(section, "url", fallback=None)
+            if url:
+                return url
+        return None
+
+    def _set(self, repos, dir_mtimes):
+        self._repos = repos
+        self._dir_mtimes = dir_mtimes
+        self._built = True
+        self._by_name = {}
+        for repo in repos:
+            self._by_name.setdefault(repo["name"].lower(), []).append(repo)
+
+    def _load(self):
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading repository index: {e}")
+            return
+        # An index built for other roots is rebuilt rather than reused
+        if data.get("version") == INDEX_VERSION and data.get("workspace_roots") == self.workspace_roots:
+            self._set(data.get("repos", []), data.get("dir_mtimes", {}))
+
+    def _save(self):
+        if not self.index_path:
+            return
+        data = {
+            "version": INDEX_VERSION,
+            "workspace_roots": self.workspace_roots,
+            "repos": self._repos,
+            "dir_mtimes": self._dir_mtimes,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Error writing repository index: {e}")
+
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+
+def get_shared_repo_index() -> RepoIndex:
+    """Returns the process-wide RepoIndex over the default workspace roots."""
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None:
+            _shared_index = RepoIndex()
+        return _shared_index
@@ -4,20 +4,24 @@ import sys
 sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 sys.path.insert(0, sysPath)
 from src.ui.tools_list import TOOLS, get_tool_function
-from src.ui.message_handler import prepare_message
+from src.ui.message_handler import prepare_message, add_to_history, is_timings_message
 
 # Gradio ChatInterface handler
-def syl_chat_fn(message, history, tool):
+def syl_chat_fn(message, history, tool, show_timings=False, force_refresh=False):
     tools_method = get_tool_function(tool)
     if tools_method is None:
         yield prepare_message("No tool selected or tool not found.")
         return
 
     response_history = []
-    tool_result = tools_method(message)
+    # Streamed messages are updated in place instead of appended for every token
+    stream_ids = {}
+    tool_result = tools_method(message, options={"force_refresh": force_refresh})
     if hasattr(tool_result, '__iter__') and not isinstance(tool_result, str):
         for msg in tool_result:
-            response_history.append(msg)
+            if is_timings_message(msg) and not show_timings:
+                continue
+            add_to_history(response_history, msg, stream_ids)
             yield response_history
     yield response_history
 
@@ -28,7 +32,9 @@ with gr.Blocks(title="SYL") as demo:
         type="messages",
         chatbot=gr.Chatbot(height="70vh"),
         additional_inputs=[
-            gr.Dropdown(choices=list(TOOLS.keys()), label="Select a Tool")
+            gr.Dropdown(choices=list(TOOLS.keys()), label="Select a Tool"),
+            gr.Checkbox(label="Show timings", value=False),
+            gr.Checkbox(label="Force refresh", value=False, info="Regenerate the summary even if nothing changed")
         ]
     )
 # #For Debugging and direct runs
@@ -4,6 +4,13 @@ message_handler.py
 Utility functions for preparing and handling chat messages in the SYL UI.
 """
 
+# Key marking messages that are updated in place while a tool streams its output
+STREAM_ID_KEY = "stream_id"
+# Key marking the per-stage timings message, which the chat only shows when asked to
+TIMINGS_KEY = "timings"
+# Keys used between tools and the chat handler, never passed to the chat component
+INTERNAL_KEYS = (STREAM_ID_KEY, TIMINGS_KEY)
+
 def prepare_message(message):
     """
     Create a user message dictionary for chat history.
@@ -16,3 +23,60 @@ def prepare_message(message):
     """
     return {"role": "user", "content": message}
 
+def prepare_stream_message(message, stream_id):
+    """
+    Create a message that replaces the previous message with the same stream_id in the chat
+    history instead of being appended, so a streamed answer grows in a single chat bubble.
+
+    Args:
+        message (str): The text streamed so far.
+        stream_id (str): Identifies the stream the message belongs to.
+
+    Returns:
+        dict: A message dictionary as returned by prepare_message, with the stream_id.
+    """
+    msg = prepare_message(message)
+    msg[STREAM_ID_KEY] = stream_id
+    return msg
+
+def prepare_timings_message(timings_table):
+    """
+    Create a collapsible message with the per-stage timings of a tool run.
+
+    Args:
+        timings_table (str): The timings, e.g. from Trace.format_table().
+
+    Returns:
+        dict: A message dictionary with a 'metadata' title, which Gradio shows collapsed.
+    """
+    msg = prepare_message(timings_table)
+    msg["metadata"] = {"title": "⏱️ Timings"}
+    msg[TIMINGS_KEY] = True
+    return msg
+
+def is_timings_message(msg):
+    """Return True if msg was created by prepare_timings_message."""
+    return bool(msg.get(TIMINGS_KEY))
+
+def add_to_history(history, msg, stream_ids):
+    """
+    Add a message yielded by a tool to the chat history.
+
+    Args:
+        history (list): The chat messages shown so far; updated in place.
+        msg (dict): The message from the tool.
+        stream_ids (dict): Maps stream ids to their message's position in history; updated in place.
+
+    Returns:
+        list: The updated history.
+    """
+    stream_id = msg.get(STREAM_ID_KEY)
+    # The internal keys are only used here, the chat component receives plain messages
+    msg = {key: value for key, value in msg.items() if key not in INTERNAL_KEYS}
+    if stream_id is not None and stream_id in stream_ids:
+        history[stream_ids[stream_id]] = msg
+    else:
+        if stream_id is not None:
+            stream_ids[stream_id] = len(history)
+        history.append(msg)
+    return history
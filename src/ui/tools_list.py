@@ -1,16 +1,60 @@
-from src.ui.uitools.daily_summary_tool import tool_daily_summary
-from src.ui.uitools.hello_world_tool import tool_hello_world
+"""
+tools_list.py
+
+Registry of the tools offered in the chat UI. Tools are registered as "module:function" strings
+and imported on first use, so starting the UI does not import the tool modules and their heavy
+dependencies (GitPython, requests, the activities) until a tool actually runs.
+"""
+
+import importlib
+import threading
 
 TOOLS = {
     "None": None,
-    "Daily Summary": tool_daily_summary,    
+    "Daily Summary": "src.ui.uitools.daily_summary_tool:tool_daily_summary",
 }
 
+# Modules of the registered tools; the PyInstaller spec lists them as hidden imports because
+# a lazy import is invisible to its analysis
+TOOL_MODULES = sorted({target.split(":", 1)[0] for target in TOOLS.values() if target})
+
+_resolved_tools = {}
+_resolve_lock = threading.Lock()
+
+def resolve_tool(target):
+    """
+    Import a tool given as "module:function".
+
+    Args:
+        target (str): The module path and function name, separated by a colon.
+
+    Returns:
+        callable: The tool function, or None if it cannot be imported.
+    """
+    module_name, _, function_name = target.partition(":")
+    try:
+        module = importlib.import_module(module_name)
+        return getattr(module, function_name)
+    except (ImportError, AttributeError) as e:
+        print(f"Error loading tool {target}: {e}")
+        return None
+
 def get_tool_function(tool_name):
     """
     Returns the function for the given tool name, or None if not found.
+    The tool's module is imported on the first call and the function is cached.
     """
-    return TOOLS.get(tool_name)
+    target = TOOLS.get(tool_name)
+    if target is None or callable(target):
+        return target
+    with _resolve_lock:
+        if tool_name not in _resolved_tools:
+            tool_function = resolve_tool(target)
+            if tool_function is None:
+                # Not cached, so a tool that failed to import is retried on the next call
+                return None
+            _resolved_tools[tool_name] = tool_function
+        return _resolved_tools[tool_name]
 
 # Optionally, you can add a function to get the list of tool names
 def get_tool_names():
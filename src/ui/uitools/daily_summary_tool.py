@@ -1,17 +1,19 @@
-from src.ui.message_handler import prepare_message
+from src.ui.message_handler import prepare_message, prepare_stream_message, prepare_timings_message
 from datetime import datetime, timedelta
 from src.tools.extract_paths import ExtractPathsTool
+from src.tools.repo_index import get_shared_repo_index
 from src.activities.daily_update_activity import DaillyUpdateActivity
+from src.utils.stream_bridge import StreamBridge
+from src.utils.tracing import Trace, span
 
-def callback(message, is_done):
+SUMMARY_STREAM_ID = "daily-summary"
+
+def tool_daily_summary(message=None, options=None):
     """
-    Callback function to handle messages.
-    This is a placeholder for any additional processing needed.
+    Daily Summary tool. options: settings from the chat UI; 'force_refresh' regenerates the
+    summary even if the repositories did not change since the last one.
     """
-    # For now, just return the message as is
-    yield prepare_message(message)
-
-def tool_daily_summary(message=None):
+    options = options or {}
     yield prepare_message("Starting Daily Summary tool...")
     
     # check if message is provided
@@ -19,8 +21,12 @@ def tool_daily_summary(message=None):
         yield prepare_message("No input message provided.")
         return
     
-    extractPathsTool = ExtractPathsTool()
-    result = extractPathsTool.extract_paths_and_summary_with_llm(message)
+    # Timing spans of every stage; written to the trace log and shown in a collapsible message
+    trace = Trace("daily_summary")
+    with trace.activate():
+        extractPathsTool = ExtractPathsTool()
+        # Regex and repository index lookups first; the LLM only runs for what they leave unresolved
+        result = extractPathsTool.extract_paths_and_summary(message)
     
     # Extract project paths from the result dictionary
     project_paths = result.get("project_paths", [])
@@ -36,14 +42,31 @@ def tool_daily_summary(message=None):
         yield prepare_message(f"Debug info: {result}")
         return
     
+    # Resolve project names and paths inside repositories to repository roots
+    with trace.activate(), span("repo_index.resolve", references=len(project_paths)):
+        repo_paths, unresolved = get_shared_repo_index().resolve_all(project_paths)
+    if unresolved:
+        yield prepare_message(f"Could not find a git repository for: {', '.join(unresolved)}")
+    if not repo_paths:
+        yield prepare_message("No git repositories found for the project paths in the input message.")
+        return
+
     # Now read each path and print it back to front end
-    daily_activity = DaillyUpdateActivity(project_paths, work_summary_message)
+    with trace.activate(), span("activity.setup", repos=len(repo_paths)):
+        daily_activity = DaillyUpdateActivity(repo_paths, work_summary_message)
 
     # Get yesterday's date
     since_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-    response = daily_activity.run(since_date=since_date, stream=True, check_for_current_changes=True, callback=callback)
+    # The activity runs on a worker thread; the summary is shown token by token as the model writes it
+    bridge = StreamBridge()
+    for streamed_text in bridge.run(trace.bind(daily_activity.run), since_date=since_date, stream=True, check_for_current_changes=True,
+                                    force_refresh=options.get("force_refresh", False)):
+        yield prepare_stream_message(streamed_text, SUMMARY_STREAM_ID)
+    response = bridge.result
     if response:
-        yield prepare_message(f"{response}")
+        yield prepare_stream_message(f"{response}", SUMMARY_STREAM_ID)
     else:
-        yield prepare_message(f"No updates found for the specified project paths.")
-    #end for
\ No newline at end of file
+        yield prepare_stream_message(f"No updates found for the specified project paths.", SUMMARY_STREAM_ID)
+    trace.finish()
+    trace.write_log()
+    yield prepare_timings_message(trace.format_table())
@@ -1,6 +1,6 @@
 from src.ui.message_handler import prepare_message
 
-def tool_auto(message=None):
+def tool_auto(message=None, options=None):
     yield prepare_message("Starting Hello World tool...")
     import time
     time.sleep(2)
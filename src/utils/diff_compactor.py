@@ -0,0 +1,225 @@
+"""
+Diff Compactor Utility
+----------------------
+
+Shrinks unified diffs before they are summarized, keeping what the model needs to say what
+changed and dropping what only costs tokens:
+
+- The index, '---' and '+++' lines of each file are dropped; the 'diff --git' line already names the file.
+- Line numbers are dropped from hunk headers, but the function or class git found for the hunk is kept.
+- Context is trimmed to context_lines lines around each change.
+- Whitespace-only edits are dropped: a removed line that is added back at the same place with only
+  whitespace changed, where the leading indentation and the text inside string literals are the same.
+  In indentation-sensitive files (INDENTATION_SENSITIVE_SUFFIXES, e.g. Python and YAML) only
+  trailing whitespace is ignored.
+- Moved blocks are dropped: at least MIN_MOVED_LINES consecutive removed lines that are added back
+  as a block elsewhere in the file (e.g. a function moved further down). Single moved lines are kept,
+  since moving a statement to another function or branch changes what the code does.
+  The added copy of both stays as context so the surrounding code still reads.
+- Blank lines, trailing whitespace and "\\ No newline at end of file" markers are dropped.
+
+Other lines, such as the notes GitTools writes for binary, generated and truncated files, are kept
+as they are. A file whose hunks only had whitespace or moved lines keeps its header and NO_CHANGES_NOTE.
+
+Example Usage:
+    compacted, stats = compact_diffs(result['diffs'])
+    print(stats['tokens_before'], '->', stats['tokens_after'])
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+from src.utils.token_estimator import estimate_tokens
+
+DEFAULT_CONTEXT_LINES = 1
+
+HUNK_HEADER_RE = re.compile(r'^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@ ?(.*)$')
+
+# Per-file header lines that repeat what the 'diff --git' line says
+REDUNDANT_HEADER_PREFIXES = ('index ', '--- ', '+++ ')
+
+NO_CHANGES_NOTE = '[only whitespace or moved lines changed]'
+
+# Fewest consecutive removed lines that count as a moved block when they are added back elsewhere
+MIN_MOVED_LINES = 3
+
+# Files where whitespace is part of the code; matched case-insensitively against the file name
+INDENTATION_SENSITIVE_SUFFIXES = ('.py', '.pyi', '.pyw', '.pyx', '.yaml', '.yml', '.coffee', '.sass', '.styl',
+                                  '.pug', '.jade', '.haml', '.slim', '.nim', '.mk', 'makefile')
+
+# String literals, whitespace runs and everything in between; an unterminated quote runs to the end of the line
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"?|\'(?:[^\'\\]|\\.)*\'?|`[^`]*`?|\s+|[^\s"\'`]+')
+
+# Kinds of hunk lines
+_CONTEXT = ' '
+_REMOVED = '-'
+_ADDED = '+'
+_NOTE = '['
+
+
+def _normalize(line: str) -> str:
+    """Key of a line for whitespace-only edits: indentation and string literals as they are, other whitespace
+    only where it separates two words."""
+    body = line.lstrip()
+    tokens = _TOKEN_RE.findall(body)
+    key = [line[:len(line) - len(body)]]
+    for i, token in enumerate(tokens):
+        if not token.isspace():
+            key.append(token)
+        elif 0 < i < len(tokens) - 1 and re.match(r'\w', tokens[i + 1]) and re.search(r'\w$', tokens[i - 1]):
+            key.append(' ')
+    return ''.join(key)
+
+
+def _is_indentation_sensitive(header: List[str]) -> bool:
+    name = header[0].rstrip('"').rsplit('/', 1)[-1].lower() if header else ''
+    return name.endswith(INDENTATION_SENSITIVE_SUFFIXES)
+
+
+def compact_patch(patch: str, context_lines: int = DEFAULT_CONTEXT_LINES) -> str:
+    """
+    Compact a unified diff (see the module docstring).
+
+    Args:
+        patch (str): Patch of one or more files, as produced by `git diff`.
+        context_lines (int): Unchanged lines kept before and after each change.
+    Returns:
+        str: The compacted patch. Text that is not a diff is returned unchanged.
+    """
+    if not patch or '\n@@' not in patch:
+        return patch
+    sections = []
+    current = None
+    for line in patch.split('\n'):
+        if line.startswith('diff --git ') or current is None:
+            current = ([], [])
+            sections.append(current)
+        header, hunks = current
+        match = HUNK_HEADER_RE.match(line) if line.startswith('@@') else None
+        if match:
+            hunks.append((match.group(1).strip(), []))
+        elif not hunks:
+            if not line.startswith(REDUNDANT_HEADER_PREFIXES):
+                header.append(line.rstrip())
+        elif line.startswith((_CONTEXT, _REMOVED, _ADDED)):
+            hunks[-1][1].append((line[0], line[1:].rstrip()))
+        elif line and not line.startswith('\\'):
+            hunks[-1][1].append((_NOTE, line))
+    output = []
+    for header, hunks in sections:
+        output.extend(line for line in header if line)
+        if hunks:
+            key = (lambda text: text) if _is_indentation_sensitive(header) else _normalize
+            kept = _compact_hunks(hunks, max(context_lines, 0), key)
+            output.extend(kept if kept else [NO_CHANGES_NOTE])
+    return '\n'.join(output)
+
+
+def _compact_hunks(hunks, context_lines, key) -> List[str]:
+    # [kind, text] per line without blank lines; the kind of dropped lines becomes None
+    hunks = [(section, [[kind, text] for kind, text in lines if kind == _NOTE or text.strip()])
+             for section, lines in hunks]
+
+    # Within each run of changed lines, removed lines added back in the same order are whitespace-only edits.
+    # What is left of the run is split into blocks of consecutive removed and consecutive added lines.
+    removed_blocks, added_blocks = [], []
+    for run_id, run in enumerate(_change_runs(hunks)):
+        removed = [line for line in run if line[0] == _REMOVED]
+        added = [line for line in run if line[0] == _ADDED]
+        matcher = SequenceMatcher(None, [key(line[1]) for line in removed], [key(line[1]) for line in added],
+                                  autojunk=False)
+        for i, j, size in matcher.get_matching_blocks():
+            for line in removed[i:i + size]:
+                line[0] = None
+            for line in added[j:j + size]:
+                line[0] = _CONTEXT
+        removed_blocks.extend((run_id, block) for block in _blocks(removed, _REMOVED))
+        added_blocks.extend((run_id, block) for block in _blocks(added, _ADDED))
+
+    # Removed blocks added back as a block in another run are moves
+    for run_id, block in removed_blocks:
+        if len(block) < MIN_MOVED_LINES:
+            continue
+        keys = [key(text) for _, text in block]
+        for added_run_id, added in added_blocks:
+            start = _find_block(keys, added, key) if added_run_id != run_id else -1
+            if start >= 0:
+                for line in block:
+                    line[0] = None
+                for line in added[start:start + len(block)]:
+                    line[0] = _CONTEXT
+                break
+
+    output = []
+    for section, lines in hunks:
+        kept_lines = [(kind, text) for kind, text in lines if kind is not None]
+        changes = [i for i, (kind, _) in enumerate(kept_lines) if kind != _CONTEXT]
+        if not changes:
+            continue
+        keep = set()
+        for i in changes:
+            keep.update(range(max(i - context_lines, 0), min(i + context_lines + 1, len(kept_lines))))
+        previous = None
+        for i in sorted(keep):
+            if previous is None or i != previous + 1:
+                output.append(f"@@ {section}".rstrip())
+            kind, text = kept_lines[i]
+            output.append(text if kind == _NOTE else kind + text)
+            previous = i
+    return output
+
+
+def _change_runs(hunks) -> List[list]:
+    """The runs of consecutive removed and added lines of all hunks."""
+    runs = []
+    for _, lines in hunks:
+        run = []
+        for line in lines:
+            if line[0] in (_REMOVED, _ADDED):
+                run.append(line)
+            elif run:
+                runs.append(run)
+                run = []
+        if run:
+            runs.append(run)
+    return runs
+
+
+def _blocks(lines, kind) -> List[list]:
+    """Splits lines into the blocks of consecutive lines that are still of the given kind."""
+    blocks = [[]]
+    for line in lines:
+        if line[0] == kind:
+            blocks[-1].append(line)
+        elif blocks[-1]:
+            blocks.append([])
+    return [block for block in blocks if block]
+
+
+def _find_block(keys, lines, key) -> int:
+    """Index in lines where the keys appear as consecutive added lines not yet matched, or -1."""
+    for start in range(len(lines) - len(keys) + 1):
+        window = lines[start:start + len(keys)]
+        if all(line[0] == _ADDED and key(line[1]) == k for line, k in zip(window, keys)):
+            return start
+    return -1
+
+
+def compact_diffs(diffs: Dict[str, str], context_lines: int = DEFAULT_CONTEXT_LINES) -> Tuple[Dict[str, str], dict]:
+    """
+    Compact every patch of a GitTools 'diffs' dict.
+
+    Args:
+        diffs (Dict[str, str]): {file: patch}.
+        context_lines (int): Unchanged lines kept before and after each change.
+    Returns:
+        Tuple[Dict[str, str], dict]: The compacted {file: patch} and the estimated tokens of all
+        patches before and after compaction ('files', 'tokens_before', 'tokens_after').
+    """
+    compacted = {}
+    tokens_before = tokens_after = 0
+    for path, patch in diffs.items():
+        compacted[path] = compact_patch(patch, context_lines)
+        tokens_before += estimate_tokens(patch)
+        tokens_after += estimate_tokens(compacted[path])
+    return compacted, {"files": len(diffs), "tokens_before": tokens_before, "tokens_after": tokens_after}
@@ -0,0 +1,156 @@
+"""
+MapReduceSummarizer Utility
+---------------------------
+
+Summarizes change sets that are too large for a single prompt. Each item (for example one file's
+diff) is measured in estimated tokens; small items are packed together and large ones are split,
+so every chunk fits the model context (num_ctx) next to the prompt template and the answer.
+Chunks are summarized concurrently (map) and the partial summaries are merged in rounds until
+a single summary remains (reduce). The number of model calls grows with the size of the change
+set instead of one prompt growing until the model truncates it.
+
+Example Usage:
+    summarizer = QwenSummarizer(num_ctx=8192)
+    pipeline = MapReduceSummarizer(summarizer, num_ctx=8192)
+    summary = pipeline.summarize(file_diff_contexts)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from src.utils.prompt_registry import get_prompt_registry
+from src.utils.token_estimator import estimate_tokens, tokens_to_chars
+from src.utils.tracing import span, propagate
+
+MAP_PROMPT_FILE = 'summarize_file_changes.txt'
+MAP_PLACEHOLDER = '{file_changes_context}'
+REDUCE_PROMPT_FILE = 'merge_summaries.txt'
+REDUCE_PLACEHOLDER = '{partial_summaries}'
+
+DEFAULT_NUM_CTX = 8192
+# Tokens left free in every request for the model's answer (and its <think> section)
+DEFAULT_RESPONSE_TOKENS = 2048
+DEFAULT_MAX_WORKERS = 4
+
+ITEM_SEPARATOR = "\n\n"
+
+
+class MapReduceSummarizer:
+    def __init__(self, summarizer, num_ctx: int = DEFAULT_NUM_CTX, response_tokens: int = DEFAULT_RESPONSE_TOKENS,
+                 max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Initialize the MapReduceSummarizer.
+
+        Args:
+            summarizer (QwenSummarizer): Summarizer used for every model call.
+            num_ctx (int): Model context size in tokens that each request must fit in.
+            response_tokens (int): Tokens reserved for the model's answer.
+            max_workers (int): Number of chunk summaries generated at the same time.
+        """
+        self.summarizer = summarizer
+        self.num_ctx = num_ctx
+        self.response_tokens = response_tokens
+        self.max_workers = max_workers
+
+    def summarize(self, items: List[str], force_refresh: bool = False) -> str:
+        """
+        Summarize a list of change descriptions (e.g. "Project: ...\\nFile: ...\\nDiff:\\n...").
+
+        Args:
+            items (List[str]): The changes to summarize.
+            force_refresh (bool): Call the model for every chunk even if the summary cache has an answer.
+        Returns:
+            str: One summary covering all items ('' when there are none).
+        """
+        if not items:
+            return ''
+        chunks = self.pack(items, self._budget(MAP_PROMPT_FILE))
+        with span("summarize.map", items=len(items), chunks=len(chunks)):
+            summaries = self._map(MAP_PROMPT_FILE, MAP_PLACEHOLDER, chunks, force_refresh)
+        with span("summarize.reduce", summaries=len(summaries)):
+            return self._reduce(summaries, force_refresh)
+
+    def pack(self, items: List[str], budget: int) -> List[str]:
+        """
+        Group items into chunks of at most budget estimated tokens. Items are kept in order and
+        packed greedily; an item larger than the budget is split into parts of its own.
+
+        Args:
+            items (List[str]): Texts to group.
+            budget (int): Token budget per chunk.
+        Returns:
+            List[str]: The chunks, items joined with a blank line.
+        """
+        chunks = []
+        current, current_tokens = [], 0
+        separator_tokens = estimate_tokens(ITEM_SEPARATOR)
+        for item in items:
+            for piece in self._split(item, budget):
+                piece_tokens = estimate_tokens(piece)
+                if current and current_tokens + separator_tokens + piece_tokens > budget:
+                    chunks.append(ITEM_SEPARATOR.join(current))
+                    current, current_tokens = [], 0
+                current.append(piece)
+                current_tokens += piece_tokens + (separator_tokens if len(current) > 1 else 0)
+        if current:
+            chunks.append(ITEM_SEPARATOR.join(current))
+        return chunks
+
+    def _split(self, item: str, budget: int) -> List[str]:
+        """
+        Split one item into parts that fit the budget, cutting at line boundaries.
+        Every part repeats the item's header (the lines before 'Diff:') so the model knows which file it belongs to.
+        """
+        if estimate_tokens(item) <= budget:
+            return [item]
+        header, marker, body = item.partition('Diff:\n')
+        if not marker:
+            header, body = '', item
+        header = header + marker
+        # Leave room for the header and the "(part i/n)" label on every part
+        max_chars = tokens_to_chars(budget) - len(header) - 32
+        if max_chars <= 0:
+            header, max_chars = '', tokens_to_chars(budget) - 32
+        bodies, current, current_len = [], [], 0
+        for line in body.splitlines(keepends=True):
+            # A single line longer than a whole part (minified code) is cut into pieces
+            while len(line) > max_chars:
+                if current:
+                    bodies.append(''.join(current))
+                    current, current_len = [], 0
+                bodies.append(line[:max_chars])
+                line = line[max_chars:]
+            if current_len + len(line) > max_chars:
+                bodies.append(''.join(current))
+                current, current_len = [], 0
+            current.append(line)
+            current_len += len(line)
+        if current:
+            bodies.append(''.join(current))
+        total = len(bodies)
+        return [f"{header}(part {i}/{total})\n{part}" for i, part in enumerate(bodies, start=1)]
+
+    def _budget(self, prompt_file: str) -> int:
+        template_tokens = estimate_tokens(get_prompt_registry().get(prompt_file).text)
+        return max(self.num_ctx - self.response_tokens - template_tokens, 256)
+
+    def _map(self, prompt_file: str, placeholder: str, chunks: List[str], force_refresh: bool = False) -> List[str]:
+        """Summarize every chunk with the given prompt, concurrently, keeping the chunk order."""
+        def summarize_chunk(chunk):
+            return self.summarizer.summarize(prompt_file, replacements=[(placeholder, chunk)], force_refresh=force_refresh)
+        if len(chunks) == 1:
+            return [summarize_chunk(chunks[0])]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks)), thread_name_prefix="summarize") as executor:
+            # Each chunk gets its own copy of the tracing context so its model span nests under this stage
+            futures = [executor.submit(propagate(summarize_chunk), chunk) for chunk in chunks]
+            return [future.result() for future in futures]
+
+    def _reduce(self, summaries: List[str], force_refresh: bool = False) -> str:
+        """Merge partial summaries in rounds until a single summary remains."""
+        budget = self._budget(REDUCE_PROMPT_FILE)
+        while len(summaries) > 1:
+            groups = self.pack(summaries, budget)
+            if len(groups) == len(summaries):
+                # Every summary fills a chunk by itself: merge pairs so each round still shrinks the list
+                groups = [ITEM_SEPARATOR.join(summaries[i:i + 2]) for i in range(0, len(summaries), 2)]
+            summaries = self._map(REDUCE_PROMPT_FILE, REDUCE_PLACEHOLDER, groups, force_refresh)
+        return summaries[0]
@@ -0,0 +1,151 @@
+"""
+ModelHealth Utility
+-------------------
+
+Keeps the Ollama health check and the model load off the request path. ModelHealth caches the
+result of QwenSummarizer.check_ollama_and_model() for a TTL: a fresh result is returned without a
+round trip, and a stale one is returned while a background thread refreshes it. Failed checks are
+not served from the cache, so starting Ollama takes effect on the next request. warm_up() checks
+the server and loads the model with a tiny request; the app starts it in the background at startup.
+
+The keep_alive sent with every request comes from the SYL_OLLAMA_KEEP_ALIVE environment variable
+(default "30m"), so the model stays loaded between summaries. create_summarizer() builds a
+QwenSummarizer with that keep_alive and the app's num_ctx; every request path uses it, because a
+request with other options makes Ollama reload the model.
+
+Example Usage:
+    health = get_model_health(summarizer.host, summarizer.model, num_ctx=summarizer.num_ctx)
+    health.start_warm_up()
+    status = health.get()
+    if not status['status']:
+        print(status['message'])
+"""
+
+import os
+import threading
+import time
+from src.utils.map_reduce_summarizer import DEFAULT_NUM_CTX
+from src.utils.qwen_summarizer import QwenSummarizer, get_default_host
+from src.utils.summary_cache import SummaryCache
+
+KEEP_ALIVE_ENV = "SYL_OLLAMA_KEEP_ALIVE"
+DEFAULT_KEEP_ALIVE = "30m"
+# Seconds a successful health check is served from the cache before it is refreshed
+DEFAULT_HEALTH_TTL = 60.0
+
+
+def get_default_keep_alive() -> str:
+    """Returns the keep_alive configured in SYL_OLLAMA_KEEP_ALIVE, or DEFAULT_KEEP_ALIVE."""
+    return os.environ.get(KEEP_ALIVE_ENV, "").strip() or DEFAULT_KEEP_ALIVE
+
+
+def create_summarizer(num_ctx: int = DEFAULT_NUM_CTX, summary_cache: SummaryCache = None, host: str = None,
+                      model: str = "qwen3") -> QwenSummarizer:
+    """
+    Return a QwenSummarizer that sends the same options as the warm-up and every other request
+    (num_ctx and get_default_keep_alive()), so it never makes Ollama reload or unload the model.
+
+    Args:
+        num_ctx (int): Model context size; DEFAULT_NUM_CTX unless the caller runs with another one.
+        summary_cache (SummaryCache, optional): Cache consulted before calling the model.
+        host (str, optional): The base URL of the Ollama API; get_default_host() if None.
+        model (str): The model name.
+    """
+    return QwenSummarizer(host=host, model=model, summary_cache=summary_cache, num_ctx=num_ctx,
+                          keep_alive=get_default_keep_alive())
+
+
+class ModelHealth:
+    def __init__(self, summarizer: QwenSummarizer, ttl: float = DEFAULT_HEALTH_TTL):
+        """
+        Initialize the ModelHealth.
+
+        Args:
+            summarizer (QwenSummarizer): Summarizer used for the health check and the warm-up request.
+            ttl (float): Seconds a successful check is considered fresh.
+        """
+        self.summarizer = summarizer
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._result = None
+        self._checked_at = 0.0
+        self._refreshing = False
+
+    def get(self) -> dict:
+        """
+        Return the health of Ollama and the model as a dict with 'status' (bool) and 'message' (str).
+        Only the first call, and calls after a failed check, wait for a round trip.
+        """
+        with self._lock:
+            result = self._result
+            age = time.monotonic() - self._checked_at
+        if result is None or not result['status']:
+            return self.refresh()
+        if age > self.ttl:
+            self._refresh_in_background()
+        return result
+
+    def refresh(self) -> dict:
+        """Run the health check now and cache its result."""
+        result = self.summarizer.check_ollama_and_model()
+        with self._lock:
+            self._result = result
+            self._checked_at = time.monotonic()
+        return result
+
+    def warm_up(self) -> dict:
+        """
+        Check the server and load the model into memory.
+        Returns the health check result, or the warm-up error if the model could not be loaded.
+        """
+        result = self.refresh()
+        if not result['status']:
+            return result
+        warm = self.summarizer.warm_up()
+        return result if warm['status'] else warm
+
+    def start_warm_up(self) -> threading.Thread:
+        """Run warm_up() on a background thread and return the thread."""
+        thread = threading.Thread(target=self._log_warm_up, name="model-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def _log_warm_up(self):
+        result = self.warm_up()
+        if not result['status']:
+            print(result['message'])
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, name="model-health", daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Error refreshing model health: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+_shared_health = {}
+_shared_health_lock = threading.Lock()
+
+
+def get_model_health(host: str = None, model: str = "qwen3", num_ctx: int = None) -> ModelHealth:
+    """
+    Return the process-wide ModelHealth for a host, model and context size, so the startup warm-up
+    and every request share one cached result.
+    """
+    host = host or get_default_host()
+    key = (host, model, num_ctx)
+    with _shared_health_lock:
+        health = _shared_health.get(key)
+        if health is None:
+            health = ModelHealth(create_summarizer(num_ctx, host=host, model=model))
+            _shared_health[key] = health
+        return health
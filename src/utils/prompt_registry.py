@@ -0,0 +1,148 @@
+"""
+PromptRegistry Utility
+----------------------
+
+Loads the prompt templates in src/prompts once and keeps them parsed. Each template is split into
+literal text and {placeholder} segments, so rendering is a single join instead of one str.replace
+pass over the whole prompt per replacement. A template is reloaded only when its file's
+modification time or size changes, and every template has a version hash (of its text) that
+caches can key on.
+
+Placeholders are names in braces, e.g. {daily_update_context}. Other braces, such as the JSON
+examples in extract_paths_and_activity.txt, are plain text.
+
+Example Usage:
+    registry = get_prompt_registry()
+    prompt, version = registry.render('summarize_file_changes.txt', [('{file_changes_context}', diff)])
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+PROMPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../prompts'))
+PLACEHOLDER_RE = re.compile(r'\{[A-Za-z_][A-Za-z0-9_]*\}')
+
+
+class PromptTemplate:
+    def __init__(self, path: str, text: str, stamp: Tuple[int, int]):
+        """
+        A parsed prompt template.
+
+        Args:
+            path (str): Absolute path of the template file.
+            text (str): The template text.
+            stamp (Tuple[int, int]): (mtime_ns, size) of the file when it was read.
+        """
+        self.path = path
+        self.text = text
+        self.stamp = stamp
+        self.version = hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+        # Even indexes hold literal text, odd indexes hold placeholders such as '{name}'
+        self.segments = []
+        last = 0
+        for match in PLACEHOLDER_RE.finditer(text):
+            self.segments.append(text[last:match.start()])
+            self.segments.append(match.group(0))
+            last = match.end()
+        self.segments.append(text[last:])
+        self.placeholders = set(self.segments[1::2])
+
+    def render(self, replacements: List[Tuple[str, str]] = None) -> str:
+        """
+        Render the template.
+
+        Args:
+            replacements (List[Tuple[str, str]], optional): (placeholder, value) pairs, e.g. ('{name}', 'value').
+                Placeholders without a value are kept as they are.
+        Returns:
+            str: The rendered prompt.
+        """
+        if not replacements:
+            return self.text
+        values = {}
+        others = []
+        for old, new in replacements:
+            if old in self.placeholders:
+                values.setdefault(old, new)
+            else:
+                others.append((old, new))
+        parts = list(self.segments)
+        for i in range(1, len(parts), 2):
+            parts[i] = values.get(parts[i], parts[i])
+        prompt = ''.join(parts)
+        # Replacements of text that is not a placeholder keep the old str.replace behaviour
+        for old, new in others:
+            prompt = prompt.replace(old, new)
+        return prompt
+
+
+class PromptRegistry:
+    def __init__(self, prompts_dir: str = PROMPTS_DIR):
+        """
+        Initialize the PromptRegistry.
+
+        Args:
+            prompts_dir (str): Directory that template names are resolved against.
+        """
+        self.prompts_dir = prompts_dir
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, name: str) -> str:
+        """Return the absolute path for a template name ('merge_summaries.txt') or path."""
+        if os.path.isabs(name) or os.path.dirname(name):
+            return os.path.abspath(name)
+        return os.path.join(self.prompts_dir, name)
+
+    def get(self, name: str) -> PromptTemplate:
+        """
+        Return the parsed template, reading the file only if it changed since it was last loaded.
+
+        Args:
+            name (str): Template file name in prompts_dir, or a path to a template file.
+        Returns:
+            PromptTemplate: The template.
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        path = self.resolve(name)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            template = self._templates.get(path)
+        if template is not None and template.stamp == stamp:
+            return template
+        with open(path, 'r', encoding='utf-8') as f:
+            template = PromptTemplate(path, f.read(), stamp)
+        with self._lock:
+            self._templates[path] = template
+        return template
+
+    def render(self, name: str, replacements: List[Tuple[str, str]] = None) -> Tuple[str, str]:
+        """
+        Render a template.
+
+        Args:
+            name (str): Template file name or path.
+            replacements (List[Tuple[str, str]], optional): (placeholder, value) pairs.
+        Returns:
+            Tuple[str, str]: The rendered prompt and the template version.
+        """
+        template = self.get(name)
+        return template.render(replacements), template.version
+
+
+_shared_registry: Optional[PromptRegistry] = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Return the process-wide PromptRegistry for src/prompts."""
+    global _shared_registry
+    with _shared_registry_lock:
+        if _shared_registry is None:
+            _shared_registry = PromptRegistry()
+        return _shared_registry
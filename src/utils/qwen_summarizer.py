@@ -8,7 +8,11 @@ Key Features:
 - Summarize content from prompt files or direct text input.
 - Supports streaming output with callback for chunk-wise processing.
 - Cleans up model output by removing <think>...</think> sections.
-- Designed for integration with local Qwen model API (default: http://localhost:11434).
+- Designed for integration with local Qwen model API (default: http://localhost:11434, or the SYL_OLLAMA_HOST environment variable).
+- Optional SummaryCache: repeated prompts are answered from the cache without calling the model.
+- One connection-pooled HTTP session shared by all instances, with connect/read timeouts and retries with backoff.
+- Asyncio API (asummarize, asummarize_from_text, astream) with a limit on concurrent in-flight generations.
+- warm_up() loads the model into memory ahead of the first request, with a configurable keep_alive.
 
 Classes:
     QwenSummarizer: Main class for summarization tasks.
@@ -21,25 +25,129 @@ Example Usage:
     def my_callback(chunk, is_done):
         print(chunk, end='')
     summarizer.summarize_from_text("Summarize this text.", stream=True, callback=my_callback)
+
+    # From asyncio code, several generations at once
+    summaries = await asyncio.gather(*(summarizer.asummarize_from_text(p) for p in prompts))
+    async for chunk in summarizer.astream("Summarize this text."):
+        print(chunk, end='')
 """
 
+import asyncio
 import requests
+import weakref
 import json
+import os
 import re
-from typing import List, Tuple
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from typing import AsyncIterator, List, Tuple
+from src.utils.prompt_registry import get_prompt_registry
+from src.utils.summary_cache import SummaryCache
+from src.utils.think_filter import ThinkTagFilter
+from src.utils.tracing import span
+
+HOST_ENV = "SYL_OLLAMA_HOST"
+DEFAULT_HOST = "http://localhost:11434"
+# Seconds to wait for a connection, and for the next bytes of a response (a streamed token or the full answer)
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 300
+HEALTH_CHECK_TIMEOUT = 2
+# Retries for connection errors and these HTTP statuses, waiting backoff * 2**attempt seconds in between
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Keep-alive connections kept open per host; enough for concurrent generations and health checks
+POOL_MAXSIZE = 16
+# Generations one summarizer keeps in flight at once through the async API
+DEFAULT_MAX_CONCURRENCY = 4
+
+THINK_SECTION_RE = re.compile(r'<think>.*?</think>\s*', re.DOTALL)
+# Counters Ollama reports with the final response; durations are in nanoseconds
+MODEL_METRIC_KEYS = ("total_duration", "load_duration", "prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class _StreamAbandoned(Exception):
+    """Raised from a streaming callback to stop a generation whose consumer went away."""
+
+
+def get_model_metrics(data: dict) -> dict:
+    """
+    Return Ollama's timing counters from a final response: token counts, durations converted to
+    seconds, and the generation and prompt evaluation rates in tokens per second.
+    """
+    metrics = {}
+    for key in MODEL_METRIC_KEYS:
+        if key in data:
+            value = data[key]
+            metrics[key] = round(value / 1e9, 4) if key.endswith("_duration") else value
+    if metrics.get("eval_count") and metrics.get("eval_duration"):
+        metrics["tokens_per_second"] = round(metrics["eval_count"] / metrics["eval_duration"], 1)
+    if metrics.get("prompt_eval_count") and metrics.get("prompt_eval_duration"):
+        metrics["prompt_tokens_per_second"] = round(metrics["prompt_eval_count"] / metrics["prompt_eval_duration"], 1)
+    return metrics
+
+
+def get_default_host() -> str:
+    """Return the Ollama base URL from the SYL_OLLAMA_HOST environment variable, or DEFAULT_HOST."""
+    return os.environ.get(HOST_ENV, "").strip().rstrip("/") or DEFAULT_HOST
+
+
+def get_shared_session() -> requests.Session:
+    """
+    Return the process-wide requests.Session used by every QwenSummarizer, so calls reuse
+    keep-alive connections from one pool instead of opening a new TCP connection each time.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
 
 class QwenSummarizer:
-    def __init__(self, host="http://localhost:11434", model="qwen3"):
+    def __init__(self, host: str = None, model="qwen3", summary_cache: SummaryCache = None, num_ctx: int = None,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT, read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES, retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, keep_alive: str = None):
         """
         Initialize the QwenSummarizer.
 
         Args:
-            host (str): The base URL of the Qwen model API.
+            host (str, optional): The base URL of the Qwen model API; get_default_host() if None.
             model (str): The model name to use for summarization.
+            summary_cache (SummaryCache, optional): Cache consulted before calling the model.
+            num_ctx (int, optional): Context window size requested from the model; the model default if None.
+            connect_timeout (float): Seconds to wait for a connection to the API.
+            read_timeout (float): Seconds to wait for response data before giving up on a hung request.
+            max_retries (int): Retries for connection errors and transient HTTP errors.
+            retry_backoff (float): Base delay in seconds between retries, doubled on every attempt.
+            max_concurrency (int): Generations in flight at once through the async API.
+            keep_alive (str, optional): How long Ollama keeps the model loaded after a request (e.g. "30m");
+                the server default if None.
         """
+        host = host or get_default_host()
+        self.host = host
         self.api_url = f"{host}/api/generate"
         self.api_tags = f"{host}/api/tags"
         self.model = model
+        self.summary_cache = summary_cache
+        self.num_ctx = num_ctx
+        self.keep_alive = keep_alive
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.session = get_shared_session()
+        self.max_concurrency = max_concurrency
+        # One semaphore per event loop, since asyncio primitives cannot be shared between loops
+        self._semaphores = weakref.WeakKeyDictionary()
 
     def remove_think_section(self, text):
         """
@@ -50,7 +158,7 @@ class QwenSummarizer:
         Returns:
             str: The cleaned text without <think> sections.
         """
-        return re.sub(r'<think>.*?</think>\s*', '', text, flags=re.DOTALL)
+        return THINK_SECTION_RE.sub('', text)
 
     def _post_to_model(self, prompt, stream=False, callback=None, remove_think=True):
         """
@@ -64,13 +172,9 @@ class QwenSummarizer:
         Returns:
             dict: The model's response.
         """
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": stream
-        }
+        payload = self._build_payload(prompt, stream)
         headers = {"Content-Type": "application/json"}
-        response = requests.post(self.api_url, data=json.dumps(payload), headers=headers, stream=stream)
+        response = self._post_with_retries(json.dumps(payload), headers, stream)
         response.raise_for_status()
         
         if stream and callback:
@@ -78,58 +182,99 @@ class QwenSummarizer:
         else:
             return response.json()
 
+    def _build_payload(self, prompt, stream):
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream
+        }
+        # Requests with a different num_ctx make Ollama reload the model, so every request
+        # (warm-up included) sends the same options
+        if self.num_ctx:
+            payload["options"] = {"num_ctx": self.num_ctx}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def warm_up(self):
+        """
+        Load the model into memory without generating anything (Ollama loads the model for an empty
+        prompt), so the first real request does not pay for a cold model load.
+        Returns a dict with 'status' (bool) and 'message' (str).
+        """
+        headers = {"Content-Type": "application/json"}
+        try:
+            response = self._post_with_retries(json.dumps(self._build_payload("", False)), headers, False)
+            response.raise_for_status()
+        except Exception as e:
+            return {"status": False, "message": f"Error warming up model '{self.model}': {e}"}
+        return {"status": True, "message": f"Model '{self.model}' is loaded."}
+
+    def _post_with_retries(self, data, headers, stream):
+        """
+        POST to the generate API through the shared session, retrying connection errors and
+        transient HTTP statuses with exponential backoff. Read timeouts are not retried: the model
+        may still be generating, and a retry would start the same generation again.
+
+        Returns:
+            requests.Response: The last response received.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(self.api_url, data=data, headers=headers, stream=stream, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                response.close()
+            except requests.exceptions.ConnectionError:
+                if attempt >= self.max_retries:
+                    raise
+            time.sleep(self.retry_backoff * (2 ** attempt))
+            attempt += 1
+
     def _handle_streaming_response(self, response, callback, remove_think=True):
         """
         Handle streaming response from the model, calling the callback with each chunk.
         Optionally removes <think>...</think> sections from the streamed output.
+        When the stream is done, the callback is called once more with the full (cleaned) text and True.
 
         Args:
             response: The streaming response object from requests.
             callback (callable): Function to call with each chunk and done flag.
             remove_think (bool): Whether to remove <think>...</think> sections from the output.
         Returns:
-            dict: The full response and done status.
-        """
-        if remove_think:
-            buffer = ['']
-            def process_chunk(chunk, is_done):
-                import re
-                buffer[0] += chunk
-                cleaned = ''
-                pattern = re.compile(r'<think>.*?</think>\s*', re.DOTALL)
-                while True:
-                    match = pattern.search(buffer[0])
-                    if not match:
-                        break
-                    cleaned += buffer[0][:match.start()]
-                    buffer[0] = buffer[0][match.end():]
-                incomplete_think = buffer[0].find('<think>')
-                if incomplete_think != -1:
-                    cleaned += buffer[0][:incomplete_think]
-                    buffer[0] = buffer[0][incomplete_think:]
-                else:
-                    cleaned += buffer[0]
-                    buffer[0] = ''
-                if cleaned:
-                    callback(cleaned, is_done)
-            cb = process_chunk
-        else:
-            cb = callback
-        full_response = ""
-        for line in response.iter_lines():
-            if line:
-                try:
-                    data = json.loads(line.decode('utf-8'))
+            dict: The full response and done status, with the timing counters of the final chunk.
+        """
+        think_filter = ThinkTagFilter() if remove_think else None
+        # Chunks are collected in lists and joined once, keeping assembly linear in the response length
+        parts, visible_parts = [], []
+        result = {}
+        try:
+            for line in response.iter_lines():
+                if line:
+                    try:
+                        data = json.loads(line.decode('utf-8'))
+                    except json.JSONDecodeError:
+                        continue
+                    is_done = data.get('done', False)
                     if 'response' in data:
                         chunk = data['response']
-                        full_response += chunk
-                        cb(chunk, data.get('done', False))
-                    if data.get('done', False):
-                        cb(full_response, True)
+                        parts.append(chunk)
+                        visible = think_filter.feed(chunk) if think_filter else chunk
+                        if is_done and think_filter:
+                            visible += think_filter.flush()
+                        if visible:
+                            visible_parts.append(visible)
+                            callback(visible, is_done)
+                    if is_done:
+                        result = {key: data[key] for key in MODEL_METRIC_KEYS if key in data}
+                        callback(''.join(visible_parts), True)
                         break
-                except json.JSONDecodeError:
-                    continue
-        return {"response": full_response, "done": True}
+        finally:
+            # Also when the callback raises: closing the connection makes Ollama stop generating
+            response.close()
+        result.update(response=''.join(parts), done=True)
+        return result
 
     def _extract_summary(self, data):
         """
@@ -155,31 +300,28 @@ class QwenSummarizer:
                 summary = str(data)
         return self.remove_think_section(summary)
 
-    def summarize(self, prompt_file, stream=False, replacements: List[Tuple[str, str]] = None, callback=None, remove_think=True):
+    def summarize(self, prompt_file, stream=False, replacements: List[Tuple[str, str]] = None, callback=None, remove_think=True,
+                  force_refresh=False):
         """
         Summarize the content of a prompt file using the locally hosted Qwen model.
         Optionally supports streaming and text replacements.
 
         Args:
-            prompt_file (str): Path to the prompt file.
+            prompt_file (str): Path to the prompt file, or the name of a template in src/prompts.
             stream (bool): Whether to use streaming response.
             replacements (List[Tuple[str, str]], optional): List of (old, new) tuples for text replacement.
             callback (callable, optional): Callback for streaming. Called with (chunk, is_done).
             remove_think (bool): Whether to remove <think>...</think> sections from the output.
+            force_refresh (bool): Call the model even if the summary cache has an answer (the new answer is still cached).
         Returns:
             str: The summary text.
         """
-        with open(prompt_file, 'r', encoding='utf-8') as f:
-            prompt = f.read()
-        if replacements:
-            for old, new in replacements:
-                prompt = prompt.replace(old, new)
-        data = self._post_to_model(prompt, stream=stream, callback=callback, remove_think=remove_think)
-        if not stream:
-            return self._extract_summary(data) if remove_think else data.get('response', str(data))
-        return self._extract_summary(data)
+        # Templates are parsed once and re-read only when the file changes
+        prompt, template_version = get_prompt_registry().render(prompt_file, replacements)
+        return self._generate(prompt, template_version, stream=stream, callback=callback, remove_think=remove_think,
+                              force_refresh=force_refresh)
 
-    def summarize_from_text(self, prompt_text, stream=False, callback=None, remove_think=True):
+    def summarize_from_text(self, prompt_text, stream=False, callback=None, remove_think=True, force_refresh=False):
         """
         Summarize the given prompt text using the locally hosted Qwen model.
         Optionally supports streaming and callback.
@@ -189,13 +331,159 @@ class QwenSummarizer:
             stream (bool): Whether to use streaming response.
             callback (callable, optional): Callback for streaming. Called with (chunk, is_done).
             remove_think (bool): Whether to remove <think>...</think> sections from the output.
+            force_refresh (bool): Call the model even if the summary cache has an answer (the new answer is still cached).
+        Returns:
+            str: The summary text.
+        """
+        return self._generate(prompt_text, "", stream=stream, callback=callback, remove_think=remove_think,
+                              force_refresh=force_refresh)
+
+    def _generate(self, prompt, template_version, stream=False, callback=None, remove_think=True, force_refresh=False):
+        """
+        Return the summary for a rendered prompt, from the summary cache when possible.
+
+        Args:
+            prompt (str): The rendered prompt.
+            template_version (str): Version of the template the prompt came from ('' for raw text).
+            stream (bool): Whether to use streaming response.
+            callback (callable, optional): Callback for streaming. Called with (chunk, is_done).
+            remove_think (bool): Whether to remove <think>...</think> sections from the output.
+            force_refresh (bool): Skip the cache lookup; the answer is still written to the cache.
+        Returns:
+            str: The summary text.
+        """
+        with span("model.generate", model=self.model, stream=stream, prompt_chars=len(prompt)) as model_span:
+            key = None
+            if self.summary_cache:
+                key = SummaryCache.make_key(self.model, template_version, prompt, remove_think=remove_think, num_ctx=self.num_ctx)
+                cached = None if force_refresh else self.summary_cache.get(key)
+                if cached is not None:
+                    model_span.set(cache_hit=True)
+                    if stream and callback:
+                        # Same final call a finished stream makes, so streaming callers still get the text
+                        callback(cached, True)
+                    return cached
+            if stream and callback:
+                callback = self._time_first_token(callback, model_span)
+            data = self._post_to_model(prompt, stream=stream, callback=callback, remove_think=remove_think)
+            model_span.set(**get_model_metrics(data))
+            if not stream:
+                summary = self._extract_summary(data) if remove_think else data.get('response', str(data))
+            else:
+                summary = self._extract_summary(data)
+            if key:
+                self.summary_cache.put(key, summary)
+            return summary
+
+    @staticmethod
+    def _time_first_token(callback, model_span):
+        """Wrap a streaming callback so the span records when the first visible text arrived."""
+        start = time.perf_counter()
+        first = []
+
+        def timed_callback(chunk, is_done):
+            if not first:
+                first.append(True)
+                model_span.set(first_token_seconds=round(time.perf_counter() - start, 4))
+            return callback(chunk, is_done)
+        return timed_callback
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def asummarize(self, prompt_file, replacements: List[Tuple[str, str]] = None, remove_think=True) -> str:
+        """
+        Async version of summarize. The request runs on a worker thread through the shared
+        connection pool; at most max_concurrency generations are in flight at once.
+
+        Args:
+            prompt_file (str): Path to the prompt file, or the name of a template in src/prompts.
+            replacements (List[Tuple[str, str]], optional): List of (old, new) tuples for text replacement.
+            remove_think (bool): Whether to remove <think>...</think> sections from the output.
         Returns:
             str: The summary text.
         """
-        data = self._post_to_model(prompt_text, stream=stream, callback=callback, remove_think=remove_think)
-        if not stream:
-            return self._extract_summary(data) if remove_think else data.get('response', str(data))
-        return self._extract_summary(data)
+        async with self._get_semaphore():
+            return await asyncio.to_thread(self.summarize, prompt_file, replacements=replacements, remove_think=remove_think)
+
+    async def asummarize_from_text(self, prompt_text, remove_think=True) -> str:
+        """
+        Async version of summarize_from_text, limited to max_concurrency generations in flight.
+
+        Args:
+            prompt_text (str): The text to summarize.
+            remove_think (bool): Whether to remove <think>...</think> sections from the output.
+        Returns:
+            str: The summary text.
+        """
+        async with self._get_semaphore():
+            return await asyncio.to_thread(self.summarize_from_text, prompt_text, remove_think=remove_think)
+
+    async def astream(self, prompt_text, remove_think=True) -> AsyncIterator[str]:
+        """
+        Stream a generation as an async generator of text chunks, limited to max_concurrency
+        generations in flight. A cached summary is yielded as a single chunk. When the consumer
+        stops early, the generation is stopped at its next chunk and its slot is freed only once
+        the worker thread has finished, so abandoned streams never exceed the limit.
+
+        Args:
+            prompt_text (str): The text to summarize.
+            remove_think (bool): Whether to remove <think>...</think> sections from the output.
+        Yields:
+            str: Chunks of the answer as they arrive.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        done = object()
+        yielded = [False]
+        abandoned = threading.Event()
+
+        def callback(chunk, is_done):
+            if abandoned.is_set():
+                raise _StreamAbandoned()
+            # A finished stream repeats the whole text with is_done=True; only forward it when
+            # nothing was streamed before (a cache hit)
+            if is_done and yielded[0]:
+                return
+            if chunk:
+                yielded[0] = True
+                loop.call_soon_threadsafe(queue.put_nowait, chunk)
+
+        def run():
+            try:
+                self.summarize_from_text(prompt_text, stream=True, callback=callback, remove_think=remove_think)
+            except _StreamAbandoned:
+                pass
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        def release(task):
+            semaphore.release()
+            if not task.cancelled():
+                # Retrieve the error of an abandoned generation so it is not reported as unhandled
+                task.exception()
+
+        semaphore = self._get_semaphore()
+        await semaphore.acquire()
+        task = asyncio.ensure_future(asyncio.to_thread(run))
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is done:
+                    break
+                yield chunk
+            # Re-raises any error from the generation
+            await task
+        finally:
+            if not task.done():
+                # The consumer stopped early: stop the generation and keep the slot until its thread exits
+                abandoned.set()
+            task.add_done_callback(release)
 
     def check_ollama_and_model(self):
         """
@@ -204,7 +492,7 @@ class QwenSummarizer:
         """
         # Check if Ollama is running
         try:
-            response = requests.get(self.api_tags, timeout=2)
+            response = self.session.get(self.api_tags, timeout=HEALTH_CHECK_TIMEOUT)
             response.raise_for_status()
         except requests.exceptions.ConnectionError:
             msg = (f"Ollama is not running or not reachable at {self.api_url.replace('/api/generate', '')}. "
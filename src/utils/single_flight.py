@@ -0,0 +1,108 @@
+"""
+SingleFlight Utility
+--------------------
+
+Coalesces identical concurrent requests. The first caller for a key (the leader) runs the work;
+callers that arrive with the same key while it is running wait for the leader's result instead
+of starting the work again. Streamed output is broadcast: every chunk the work reports through
+its callback is recorded and delivered to all callers, and callers that join late first get
+the chunks they missed. Once the work finishes the key is released, so later requests run it
+again (and can be answered by the caches underneath).
+
+Example Usage:
+    flights = SingleFlight()
+    summary = flights.run(("repo", "2024-01-01"), lambda callback: summarize(callback=callback), callback=print_chunk)
+"""
+
+import threading
+from typing import Callable, Hashable, Optional
+from src.utils.tracing import span
+
+
+class _Flight:
+    def __init__(self):
+        self.events = []
+        self.condition = threading.Condition()
+        self.done = False
+        self.result = None
+        self.error = None
+
+    def publish(self, chunk, is_done):
+        with self.condition:
+            self.events.append((chunk, is_done))
+            self.condition.notify_all()
+
+    def finish(self, result=None, error=None):
+        with self.condition:
+            self.result = result
+            self.error = error
+            self.done = True
+            self.condition.notify_all()
+
+    def follow(self, callback: Optional[Callable]):
+        """Deliver every event, past and future, to callback and wait until the flight is done."""
+        index = 0
+        while True:
+            with self.condition:
+                while index >= len(self.events) and not self.done:
+                    self.condition.wait()
+                batch = self.events[index:]
+                index += len(batch)
+                finished = self.done and index == len(self.events)
+            # The callback runs outside the lock so a slow consumer never blocks the leader
+            if callback:
+                for chunk, is_done in batch:
+                    callback(chunk, is_done)
+            if finished:
+                break
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: Hashable, fn: Callable, callback: Callable = None):
+        """
+        Run fn(callback) once for all concurrent callers with the same key.
+
+        Args:
+            key (Hashable): Identifies identical requests.
+            fn (callable): The work; called with a callback(chunk, is_done) for streamed output.
+            callback (callable, optional): Receives every streamed chunk, including those sent
+                before this caller joined.
+        Returns:
+            The value returned by fn. An exception raised by fn is raised in every caller.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+        with span("single_flight", shared=not leader):
+            if not leader:
+                return flight.follow(callback)
+            def publish(chunk, is_done):
+                flight.publish(chunk, is_done)
+                if callback:
+                    callback(chunk, is_done)
+            try:
+                result = fn(publish)
+            except Exception as e:
+                flight.finish(error=e)
+                raise
+            else:
+                flight.finish(result=result)
+                return result
+            finally:
+                with self._lock:
+                    self._flights.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._flights)
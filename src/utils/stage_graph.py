@@ -0,0 +1,107 @@
+"""
+StageGraph Utility
+------------------
+
+Runs the stages of an activity or tool as a small dependency graph. A stage is a function that
+receives the results of the stages it depends on as keyword arguments. It starts on a thread pool
+as soon as those stages have finished, so independent stages overlap (e.g. a git scan runs while a
+model call is waiting for tokens). Stages listed in `after` must finish first but their results
+are not passed in, for checks such as the model health check.
+
+Stages are added after the stages they depend on, so the graph cannot have cycles. When a stage
+raises, no further stages are started and run() raises the exception. A stage can end the run
+early on purpose by raising StopStages with the value the caller should return.
+
+Example Usage:
+    stages = StageGraph()
+    stages.add("health_check", check_model)
+    stages.add("commits", read_commits)
+    stages.add("changes", read_changes)
+    stages.add("summary", summarize, depends_on=("commits", "changes"), after=("health_check",))
+    try:
+        summary = stages.run()["summary"]
+    except StopStages as stop:
+        summary = stop.value
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable
+from src.utils.tracing import propagate
+
+
+class StopStages(Exception):
+    """Raised by a stage to end the run early; the caller gets it from StageGraph.run with the value to return."""
+
+    def __init__(self, value=None):
+        super().__init__(value)
+        self.value = value
+
+
+class StageGraph:
+    def __init__(self, max_workers: int = None):
+        """
+        Initialize the StageGraph.
+
+        Args:
+            max_workers (int, optional): Stages running at the same time. Defaults to the number of stages.
+        """
+        self.max_workers = max_workers
+        # name -> (fn, depends_on, after), in the order the stages were added
+        self._stages = {}
+
+    def add(self, name: str, fn: Callable, depends_on: Iterable[str] = (), after: Iterable[str] = ()):
+        """
+        Add a stage.
+
+        Args:
+            name (str): Name of the stage; its result is passed to dependent stages under this keyword.
+            fn (callable): The work of the stage, called with the results of depends_on as keyword arguments.
+            depends_on (Iterable[str]): Stages whose results fn needs.
+            after (Iterable[str]): Stages that must finish first, without passing their results.
+        Raises:
+            ValueError: If the name is taken or a dependency has not been added yet.
+        """
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage {name!r}")
+        depends_on, after = tuple(depends_on), tuple(after)
+        for dependency in depends_on + after:
+            if dependency not in self._stages:
+                raise ValueError(f"Stage {name!r} depends on unknown stage {dependency!r}")
+        self._stages[name] = (fn, depends_on, after)
+
+    def run(self) -> Dict[str, object]:
+        """
+        Run all stages, each as soon as its dependencies have finished.
+
+        Returns:
+            Dict[str, object]: The result of every stage by name.
+        Raises:
+            StopStages: If a stage ended the run early.
+            Exception: The first exception raised by a stage.
+        """
+        results = {}
+        pending = dict(self._stages)
+        running = {}
+        error = None
+        executor = ThreadPoolExecutor(max_workers=self.max_workers or max(len(self._stages), 1),
+                                      thread_name_prefix="stage")
+        try:
+            while error is None and (pending or running):
+                for name, (fn, depends_on, after) in list(pending.items()):
+                    if all(dependency in results for dependency in depends_on + after):
+                        del pending[name]
+                        kwargs = {dependency: results[dependency] for dependency in depends_on}
+                        running[executor.submit(propagate(fn), **kwargs)] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        error = error or e
+        finally:
+            # After an error, stages still running finish in the background; their results are dropped
+            executor.shutdown(wait=error is None, cancel_futures=True)
+        if error is not None:
+            raise error
+        return results
@@ -0,0 +1,89 @@
+"""
+StreamBridge Utility
+--------------------
+
+Connects a blocking function that reports progress through a callback(chunk, is_done) (such as
+QwenSummarizer streaming or DaillyUpdateActivity.run(stream=True)) to a generator. The function
+runs on a worker thread and pushes every chunk into a queue; the generator drains the queue and
+yields the text received so far, so a UI can show tokens as soon as the model produces them.
+Chunks that arrive while the consumer is busy are coalesced into one update.
+
+Example Usage:
+    bridge = StreamBridge()
+    for text in bridge.run(activity.run, since_date=since_date, stream=True):
+        yield prepare_stream_message(text, "daily-summary")
+    final_summary = bridge.result
+"""
+
+import queue
+import threading
+from typing import Iterator
+
+_DONE = object()
+
+
+class StreamBridge:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._parts = []
+        self.result = None
+        self.error = None
+
+    @property
+    def text(self) -> str:
+        """The text streamed so far."""
+        return ''.join(self._parts)
+
+    def callback(self, chunk: str, is_done: bool):
+        """
+        Callback for the worker. Safe to call from any thread.
+
+        Args:
+            chunk (str): Text produced since the previous call.
+            is_done (bool): True for the final call, which repeats the full text and is ignored;
+                the function's return value is available as result instead.
+        """
+        if not is_done and chunk:
+            self._queue.put(chunk)
+
+    def run(self, target, *args, **kwargs) -> Iterator[str]:
+        """
+        Run target(*args, callback=self.callback, **kwargs) on a worker thread.
+
+        Args:
+            target (callable): The blocking function to run.
+        Returns:
+            Iterator[str]: The text streamed so far, each time new chunks have arrived.
+            After the iterator is exhausted, result holds target's return value.
+            An exception raised by target is re-raised here.
+        """
+        def worker():
+            try:
+                self.result = target(*args, callback=self.callback, **kwargs)
+            except Exception as e:
+                self.error = e
+            finally:
+                self._queue.put(_DONE)
+
+        thread = threading.Thread(target=worker, name="stream-bridge", daemon=True)
+        thread.start()
+        done = False
+        while not done:
+            item = self._queue.get()
+            received = False
+            # Take everything already queued so a slow consumer gets one update per drain, not per token
+            while True:
+                if item is _DONE:
+                    done = True
+                    break
+                self._parts.append(item)
+                received = True
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if received:
+                yield self.text
+        thread.join()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,170 @@
+"""
+SummaryCache Utility
+--------------------
+
+Content-addressed cache for model summaries. A summary is stored under a hash of the model name,
+the prompt template version and the fully rendered prompt, so the same prompt sent to the same
+model is only generated once. Entries are kept in memory with LRU eviction and written to disk
+(one JSON file per key) so they survive restarts.
+
+Example Usage:
+    cache = get_shared_summary_cache()
+    summarizer = QwenSummarizer(summary_cache=cache)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".syl", "cache", "summaries")
+DEFAULT_REPORT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".syl", "cache", "reports")
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_DISK_ENTRIES = 2048
+
+
+class SummaryCache:
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES):
+        """
+        Initialize the SummaryCache.
+
+        Args:
+            cache_dir (str, optional): Directory for the persisted entries. None keeps the cache in memory only.
+            max_entries (int): Number of summaries kept in memory.
+            max_disk_entries (int): Number of summaries kept on disk; the oldest files are removed beyond it.
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(model: str, template_version: str, prompt: str, **options) -> str:
+        """
+        Build the cache key for a generation.
+
+        Args:
+            model (str): Model name.
+            template_version (str): Version of the prompt template the prompt was rendered from ('' for raw text).
+            prompt (str): The rendered prompt sent to the model.
+            options: Other settings that change the returned text (e.g. remove_think).
+        Returns:
+            str: Hex digest identifying the generation.
+        """
+        digest = hashlib.sha256()
+        for part in (model, template_version, json.dumps(options, sort_keys=True), prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached summary for key, or None. Disk hits are promoted into memory.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        summary = self._read_disk(key)
+        if summary is not None:
+            self._remember(key, summary)
+        return summary
+
+    def put(self, key: str, summary: str):
+        """
+        Store a summary in memory and on disk.
+        """
+        self._remember(key, summary)
+        self._write_disk(key, summary)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def _remember(self, key, summary):
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f).get("summary")
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, summary):
+        if not self.cache_dir:
+            return
+        try:
+            # Write to a temporary file first so a crash never leaves a half-written entry behind
+            tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"summary": summary}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Error writing summary cache entry: {e}")
+            return
+        with self._lock:
+            self._disk_writes += 1
+            check_disk = self._disk_writes % 64 == 1
+        if check_disk:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Remove the least recently written files beyond max_disk_entries."""
+        try:
+            paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".json")]
+            if len(paths) <= self.max_disk_entries:
+                return
+            paths.sort(key=os.path.getmtime)
+            for path in paths[:len(paths) - self.max_disk_entries]:
+                os.remove(path)
+        except OSError as e:
+            print(f"Error evicting summary cache entries: {e}")
+
+
+_shared_cache = None
+_shared_report_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_summary_cache() -> SummaryCache:
+    """
+    Return the process-wide SummaryCache, so summarizers created per request share one memory cache.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SummaryCache()
+        return _shared_cache
+
+
+def get_shared_report_cache() -> SummaryCache:
+    """
+    Return the process-wide cache of whole reports (e.g. daily updates), kept apart from the
+    per-prompt summaries under ~/.syl/cache/reports.
+    """
+    global _shared_report_cache
+    with _shared_cache_lock:
+        if _shared_report_cache is None:
+            _shared_report_cache = SummaryCache(cache_dir=DEFAULT_REPORT_CACHE_DIR)
+        return _shared_report_cache
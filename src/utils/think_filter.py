@@ -0,0 +1,91 @@
+"""
+ThinkTagFilter Utility
+----------------------
+
+Incremental removal of <think>...</think> sections from streamed model output. The filter is a
+small state machine: every character is looked at once, and only a possible partial tag at the
+end of a chunk (at most len('</think>') - 1 characters) is carried over to the next chunk, so
+filtering a whole response is O(total characters) however the tags are split across chunks.
+
+It removes the same text as re.sub(r'<think>.*?</think>\\s*', '', text, flags=re.DOTALL), except
+that the content of a <think> section that is never closed is dropped instead of kept.
+
+Example Usage:
+    think_filter = ThinkTagFilter()
+    for chunk in chunks:
+        visible = think_filter.feed(chunk)
+        if visible:
+            print(visible, end='')
+    print(think_filter.flush())
+"""
+
+OPEN_TAG = '<think>'
+CLOSE_TAG = '</think>'
+
+_OUTSIDE = 0
+_INSIDE = 1
+_AFTER_CLOSE = 2
+
+
+def _partial_tag_length(text: str, tag: str, start: int) -> int:
+    """Length of the longest suffix of text[start:] that is a proper prefix of tag."""
+    for length in range(min(len(tag) - 1, len(text) - start), 0, -1):
+        if text.endswith(tag[:length]):
+            return length
+    return 0
+
+
+class ThinkTagFilter:
+    def __init__(self):
+        self._state = _OUTSIDE
+        # Possible start of a tag held back from the end of the previous chunk
+        self._pending = ''
+
+    def feed(self, chunk: str) -> str:
+        """
+        Filter the next chunk of the stream.
+
+        Args:
+            chunk (str): Text as received from the model.
+        Returns:
+            str: The visible text that can be emitted now ('' if none).
+        """
+        text = self._pending + chunk if self._pending else chunk
+        self._pending = ''
+        out = []
+        i, length = 0, len(text)
+        while i < length:
+            if self._state == _OUTSIDE:
+                j = text.find(OPEN_TAG, i)
+                if j == -1:
+                    held = _partial_tag_length(text, OPEN_TAG, i)
+                    out.append(text[i:length - held])
+                    self._pending = text[length - held:]
+                    break
+                out.append(text[i:j])
+                i = j + len(OPEN_TAG)
+                self._state = _INSIDE
+            elif self._state == _INSIDE:
+                j = text.find(CLOSE_TAG, i)
+                if j == -1:
+                    held = _partial_tag_length(text, CLOSE_TAG, i)
+                    self._pending = text[length - held:]
+                    break
+                i = j + len(CLOSE_TAG)
+                self._state = _AFTER_CLOSE
+            else:
+                # Whitespace right after </think> is dropped too, even across chunks
+                while i < length and text[i].isspace():
+                    i += 1
+                if i < length:
+                    self._state = _OUTSIDE
+        return ''.join(out)
+
+    def flush(self) -> str:
+        """
+        Finish the stream and return any text still held back: a partial '<think>' prefix
+        that turned out not to be a tag. An unclosed <think> section is dropped.
+        """
+        pending, self._pending = self._pending, ''
+        state, self._state = self._state, _OUTSIDE
+        return pending if state == _OUTSIDE else ''
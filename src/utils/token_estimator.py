@@ -0,0 +1,33 @@
+"""
+Token Estimator Utility
+-----------------------
+
+Cheap token count estimates for prompt budgeting. Qwen's tokenizer averages roughly four
+characters per token on English text and source code, which is close enough to size prompt
+chunks without loading a tokenizer.
+"""
+
+import math
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of model tokens in text.
+
+    Args:
+        text (str): The text to measure.
+    Returns:
+        int: Estimated token count.
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def tokens_to_chars(tokens: int) -> int:
+    """
+    Return the number of characters that fit in the given token budget.
+    """
+    return max(tokens, 0) * CHARS_PER_TOKEN
@@ -0,0 +1,207 @@
+"""
+Tracing Utility
+---------------
+
+Lightweight timing spans for finding where a run spends its time. A Trace collects spans
+(name, start, duration, parent and attributes such as token counts); span() records one around a
+block of code. Spans are only recorded while a trace is active, so the instrumented code costs
+almost nothing when nobody is tracing. The active trace and span live in context variables:
+code that hands work to other threads wraps it with propagate() so those spans nest correctly.
+
+Finished traces are appended as one JSON object per line to ~/.syl/logs/traces.jsonl
+(or the file named by the SYL_TRACE_LOG environment variable).
+
+Example Usage:
+    trace = Trace("daily_summary")
+    with trace.activate():
+        with span("git.scan", repos=3):
+            ...
+    trace.finish()
+    trace.write_log()
+    print(trace.format_table())
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+TRACE_LOG_ENV = "SYL_TRACE_LOG"
+DEFAULT_TRACE_LOG = os.path.join(os.path.expanduser("~"), ".syl", "logs", "traces.jsonl")
+
+_current_trace = contextvars.ContextVar("syl_trace", default=None)
+_current_span = contextvars.ContextVar("syl_span", default=None)
+_log_lock = threading.Lock()
+
+
+def get_trace_log_path() -> str:
+    """Returns the trace log file from SYL_TRACE_LOG, or DEFAULT_TRACE_LOG."""
+    return os.environ.get(TRACE_LOG_ENV, "").strip() or DEFAULT_TRACE_LOG
+
+
+class Span:
+    def __init__(self, trace, name: str, parent: Optional[int], attributes: dict):
+        self.trace = trace
+        self.id = None
+        self.name = name
+        self.parent = parent
+        self.attributes = dict(attributes)
+        self.thread = threading.current_thread().name
+        self.start = time.perf_counter()
+        self.duration = None
+
+    def set(self, **attributes):
+        """Add attributes (e.g. token counts) to the span."""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "parent": self.parent,
+            "name": self.name,
+            "start": round(self.start - self.trace.start, 6),
+            "duration": round(self.duration, 6) if self.duration is not None else None,
+            "thread": self.thread,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    def __init__(self, name: str, **attributes):
+        """
+        Initialize the Trace.
+
+        Args:
+            name (str): Name of the traced operation, e.g. "daily_summary".
+            attributes: Extra fields stored with the trace.
+        """
+        self.name = name
+        self.attributes = attributes
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        """Make this the active trace for the current context; spans recorded inside belong to it."""
+        trace_token = _current_trace.set(self)
+        span_token = _current_span.set(None)
+        try:
+            yield self
+        finally:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+
+    def bind(self, fn):
+        """Return a function that runs fn with this trace active, e.g. on a worker thread."""
+        def bound(*args, **kwargs):
+            with self.activate():
+                return fn(*args, **kwargs)
+        return bound
+
+    def finish(self):
+        """Record the total duration of the trace."""
+        if self.duration is None:
+            self.duration = time.perf_counter() - self.start
+
+    def _add(self, span: Span):
+        with self._lock:
+            span.id = len(self.spans)
+            self.spans.append(span)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration": round(self.duration, 6) if self.duration is not None else None,
+            "attributes": self.attributes,
+            "spans": spans,
+        }
+
+    def write_log(self, path: str = None):
+        """Append the trace as one JSON line to the trace log."""
+        path = path or get_trace_log_path()
+        line = json.dumps(self.to_dict(), default=str)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with _log_lock, open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"Error writing trace log: {e}")
+
+    def format_table(self) -> str:
+        """
+        Format the spans as a markdown table, children indented under their parents.
+        Model spans show their token counts and throughput.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        children = {}
+        for span in spans:
+            children.setdefault(span.parent, []).append(span)
+        rows = ["| Stage | Seconds | Details |", "|---|---:|---|"]
+
+        def add_rows(parent, depth):
+            for span in sorted(children.get(parent, []), key=lambda s: s.start):
+                seconds = f"{span.duration:.3f}" if span.duration is not None else "-"
+                details = ", ".join(f"{key}={value}" for key, value in span.attributes.items())
+                rows.append(f"| {'&nbsp;&nbsp;' * depth}{span.name} | {seconds} | {details} |")
+                add_rows(span.id, depth + 1)
+        add_rows(None, 0)
+        if self.duration is not None:
+            rows.append(f"| **total** | {self.duration:.3f} | |")
+        return "\n".join(rows)
+
+
+def get_current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Record a span around the block when a trace is active.
+
+    Args:
+        name (str): Stage name, e.g. "git.current_changes".
+        attributes: Initial attributes; more can be added with the yielded span's set().
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+    current = Span(trace, name, _current_span.get(), attributes)
+    trace._add(current)
+    token = _current_span.set(current.id)
+    try:
+        yield current
+    finally:
+        current.duration = time.perf_counter() - current.start
+        _current_span.reset(token)
+
+
+def propagate(fn):
+    """
+    Return fn bound to a copy of the current context, so spans it records on another thread belong
+    to the current trace and span. Wrap each task separately: one copy cannot run on two threads at once.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+    return run
@@ -1,11 +1,20 @@
 import unittest
 import os
+import shutil
 import sys
+import tempfile
+import threading
 from datetime import datetime, timedelta
+from unittest import mock
 
 sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 sys.path.insert(0, sysPath)
+from benchmarks.fake_ollama import FakeOllamaServer
 from src.activities.daily_update_activity import DaillyUpdateActivity
+from src.tools.commit_cache import CommitCache
+from src.utils.qwen_summarizer import HOST_ENV
+from src.utils.summary_cache import SummaryCache
+from tests.tools.git_repo_helpers import make_repo, commit_file
 
 class TestDaillyUpdateActivity(unittest.TestCase):
     @classmethod
@@ -28,5 +37,116 @@ class TestDaillyUpdateActivity(unittest.TestCase):
         except Exception as e:
             self.skipTest(f"Test skipped due to error: {e}")
 
+class TestDaillyUpdateActivityReportCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOllamaServer(tokens_per_second=0, first_token_latency=0).start()
+        cls.env = mock.patch.dict(os.environ, {HOST_ENV: cls.server.url})
+        cls.env.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.env.stop()
+        cls.server.stop()
+
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.repo_dir = make_repo(self.workspace)
+        commit_file(self.repo_dir, "main.py", "print('hi')\n", "Add main")
+        self.report_cache = SummaryCache(cache_dir=None)
+        self.since = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+    def tearDown(self):
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def make_activity(self):
+        # Keep the tests away from the shared cache under ~/.syl
+        activity = DaillyUpdateActivity([self.repo_dir], commit_cache=CommitCache(os.path.join(self.workspace, "cache")))
+        activity.summarizer.summary_cache = None
+        activity.report_cache = self.report_cache
+        return activity
+
+    def run_activity(self, **kwargs):
+        activity = self.make_activity()
+        try:
+            return activity.run(since_date=self.since, check_for_current_changes=True, **kwargs)
+        finally:
+            activity.git_tools.commit_cache.close()
+
+    def test_unchanged_repositories_are_answered_from_cache(self):
+        first = self.run_activity()
+        generated = self.server.requests["generate"]
+        chunks = []
+        self.assertEqual(self.run_activity(stream=True, callback=lambda chunk, done: chunks.append((chunk, done))), first)
+        self.assertEqual(self.server.requests["generate"], generated)
+        self.assertEqual(chunks, [(first, True)])
+
+        self.run_activity(force_refresh=True)
+        self.assertGreater(self.server.requests["generate"], generated)
+
+        generated = self.server.requests["generate"]
+        with open(os.path.join(self.repo_dir, "main.py"), "a", encoding="utf-8") as f:
+            f.write("print('changed')\n")
+        self.run_activity()
+        self.assertGreater(self.server.requests["generate"], generated)
+
+    def test_force_refresh_skips_the_summary_cache(self):
+        with open(os.path.join(self.repo_dir, "main.py"), "a", encoding="utf-8") as f:
+            f.write("print('changed')\n")
+        summary_cache = SummaryCache(cache_dir=None)
+
+        def run(**kwargs):
+            activity = self.make_activity()
+            activity.summarizer.summary_cache = summary_cache
+            # Without the report cache, only the summary cache can answer
+            activity.report_cache = SummaryCache(cache_dir=None)
+            try:
+                activity.run(since_date=self.since, check_for_current_changes=True, **kwargs)
+            finally:
+                activity.git_tools.commit_cache.close()
+        run()
+        generated = self.server.requests["generate"]
+        run()
+        self.assertEqual(self.server.requests["generate"], generated)
+        run(force_refresh=True)
+        # The file summary and the final summary are generated again
+        self.assertEqual(self.server.requests["generate"], generated + 2)
+
+    def test_commit_scan_overlaps_file_summaries(self):
+        with open(os.path.join(self.repo_dir, "main.py"), "a", encoding="utf-8") as f:
+            f.write("print('changed')\n")
+        activity = self.make_activity()
+        scanned = threading.Event()
+        get_changes_since_date = activity.git_tools.get_changes_since_date
+        summarize = activity.change_summarizer.summarize
+
+        def scan(*args, **kwargs):
+            result = get_changes_since_date(*args, **kwargs)
+            scanned.set()
+            return result
+
+        def slow_summarize(items, **kwargs):
+            # Run in order, the commit scan would only start after this returns
+            self.assertTrue(scanned.wait(5))
+            return summarize(items, **kwargs)
+        with mock.patch.object(activity.git_tools, "get_changes_since_date", side_effect=scan), \
+                mock.patch.object(activity.change_summarizer, "summarize", side_effect=slow_summarize):
+            try:
+                summary = activity.run(since_date=self.since, check_for_current_changes=True)
+            finally:
+                activity.git_tools.commit_cache.close()
+        self.assertTrue(summary)
+
+    def test_unavailable_model_stops_before_model_calls(self):
+        activity = self.make_activity()
+        generated = self.server.requests["generate"]
+        with mock.patch.object(activity.model_health, "get", return_value={"status": False, "message": "Ollama is not running"}):
+            try:
+                summary = activity.run(since_date=self.since, check_for_current_changes=True)
+            finally:
+                activity.git_tools.commit_cache.close()
+        self.assertEqual(summary, "Ollama is not running")
+        self.assertEqual(self.server.requests["generate"], generated)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,186 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+from benchmarks.fake_ollama import FakeOllamaServer
+from src.activities.team_update_activity import TeamUpdateActivity, parse_manifest, read_finished_ids
+from src.tools.commit_cache import CommitCache
+from src.tools.git_tools import GitTools, DEFAULT_MAX_WORKERS, DEFAULT_REPO_TIMEOUT
+from src.utils.qwen_summarizer import HOST_ENV
+from tests.tools.git_repo_helpers import make_repo, commit_file
+
+ALICE = "Alice Smith <alice@example.com>"
+BOB = "Bob Jones <bob@example.com>"
+
+class TestParseManifest(unittest.TestCase):
+    def test_items_per_author_and_window(self):
+        items = parse_manifest({
+            "repos": ["/src/api", "/src/web"],
+            "windows": [{"since": "2024-06-03", "until": "2024-06-03"}, {"since": "2024-06-04"}],
+            "authors": ["Bob", {"name": "Alice", "emails": ["Alice@Example.com"], "repos": ["/src/api"],
+                                "windows": [{"since": "2024-06-01"}]}],
+        })
+        self.assertEqual([item["id"] for item in items],
+                         ["Bob|2024-06-03|2024-06-03", "Bob|2024-06-04|", "Alice|2024-06-01|"])
+        self.assertEqual(items[0]["repos"], ["/src/api", "/src/web"])
+        self.assertEqual(items[2]["repos"], ["/src/api"])
+        self.assertEqual(items[2]["identities"], ["alice", "alice@example.com"])
+        self.assertIsNone(items[1]["until"])
+
+    def test_invalid_manifests(self):
+        window = [{"since": "2024-06-03"}]
+        for manifest in ({"repos": ["/src"], "windows": window},
+                         {"repos": ["/src"], "windows": [{"since": "06/03/2024"}], "authors": ["Bob"]},
+                         {"repos": ["/src"], "windows": [{"since": "2024-06-03", "until": "2024-06-01"}], "authors": ["Bob"]},
+                         {"windows": window, "authors": ["Bob"]},
+                         {"repos": ["/src"], "windows": window, "authors": ["Bob", "Bob"]}):
+            with self.assertRaises(ValueError):
+                parse_manifest(manifest)
+
+    def test_finished_ids_skip_failures_and_partial_lines(self):
+        workspace = tempfile.mkdtemp()
+        try:
+            path = os.path.join(workspace, "results.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"id": "a", "status": "ok"}) + "\n")
+                f.write(json.dumps({"id": "b", "status": "error"}) + "\n")
+                f.write('{"id": "c", "sta')
+            self.assertEqual(read_finished_ids(path), {"a"})
+        finally:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+class TestTeamUpdateActivity(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOllamaServer(tokens_per_second=0, first_token_latency=0).start()
+        cls.env = mock.patch.dict(os.environ, {HOST_ENV: cls.server.url})
+        cls.env.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.env.stop()
+        cls.server.stop()
+
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.api = make_repo(self.workspace, "api")
+        self.web = make_repo(self.workspace, "web")
+        commit_file(self.api, "old.py", "x = 0\n", "Old work", author=ALICE, date="2020-01-01T12:00:00")
+        commit_file(self.api, "api.py", "x = 1\n", "Add endpoint", author=ALICE)
+        commit_file(self.api, "db.py", "x = 2\n", "Add migration", author=BOB)
+        commit_file(self.web, "web.py", "x = 3\n", "Add page", author=ALICE)
+        self.since = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        self.output = os.path.join(self.workspace, "out", "results.jsonl")
+        self.items = parse_manifest({
+            "repos": [self.api, self.web],
+            "windows": [{"since": self.since}],
+            "authors": [
+                {"name": "Alice", "emails": ["alice@example.com"],
+                 "windows": [{"since": self.since}, {"since": "2020-01-01", "until": "2020-01-01"}]},
+                "Bob Jones",
+                "Dave",
+            ],
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def run_batch(self, git_workers=DEFAULT_MAX_WORKERS, repo_timeout=DEFAULT_REPO_TIMEOUT, **kwargs):
+        activity = TeamUpdateActivity(self.items, commit_cache=CommitCache(os.path.join(self.workspace, "cache")),
+                                      git_workers=git_workers, repo_timeout=repo_timeout)
+        activity.summarizer.summary_cache = None
+        try:
+            return activity.run(self.output, **kwargs)
+        finally:
+            activity.commit_cache.close()
+
+    def read_results(self):
+        with open(self.output, "r", encoding="utf-8") as f:
+            return {record["id"]: record for record in map(json.loads, f)}
+
+    def read_results_lenient(self):
+        ids = set()
+        with open(self.output, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    ids.add(json.loads(line)["id"])
+                except json.JSONDecodeError:
+                    pass
+        return ids
+
+    def test_repos_are_read_once_and_commits_fanned_out(self):
+        generated = self.server.requests["generate"]
+        with mock.patch.object(GitTools, "_read_history", autospec=True, side_effect=GitTools._read_history) as read_history:
+            counts = self.run_batch()
+        self.assertEqual(read_history.call_count, 2)
+        self.assertEqual(counts, {"ok": 4, "error": 0, "skipped": 0})
+
+        results = self.read_results()
+        recent = results[f"Alice|{self.since}|"]
+        self.assertEqual((recent["commits"], recent["repos"]), (2, sorted([self.api, self.web])))
+        self.assertEqual(results["Alice|2020-01-01|2020-01-01"]["commits"], 1)
+        self.assertEqual(results[f"Bob Jones|{self.since}|"]["commits"], 1)
+        dave = results[f"Dave|{self.since}|"]
+        self.assertEqual((dave["commits"], dave["summary"]), (0, None))
+        self.assertTrue(recent["summary"])
+        # Dave has no commits, so only three model calls
+        self.assertEqual(self.server.requests["generate"] - generated, 3)
+
+    def test_resume_skips_finished_items(self):
+        self.run_batch()
+        with open(self.output, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        # Drop Bob's result and cut the last line, as an interrupted batch would leave them
+        kept = [line for line in lines if not line.startswith('{"id": "Bob')]
+        with open(self.output, "w", encoding="utf-8") as f:
+            f.writelines(kept[:-1])
+            f.write(kept[-1][:20])
+        generated = self.server.requests["generate"]
+        counts = self.run_batch()
+        self.assertEqual(counts["skipped"], 2)
+        self.assertEqual(counts["ok"], 2)
+        self.assertLessEqual(self.server.requests["generate"] - generated, 2)
+        self.assertEqual(len(self.read_results_lenient()), 4)
+
+    def test_unreadable_repo_fails_the_item_until_it_can_be_read(self):
+        missing = os.path.join(self.workspace, "missing")
+        self.items = parse_manifest({"repos": [self.api, missing], "windows": [{"since": self.since}],
+                                     "authors": [{"name": "Alice", "emails": ["alice@example.com"]}]})
+        generated = self.server.requests["generate"]
+        self.assertEqual(self.run_batch(), {"ok": 0, "error": 1, "skipped": 0})
+        result = self.read_results()[f"Alice|{self.since}|"]
+        self.assertEqual(result["unreadable_repos"], [missing])
+        self.assertIn(missing, result["error"])
+        # No partial report is generated
+        self.assertEqual(self.server.requests["generate"], generated)
+
+        make_repo(self.workspace, "missing")
+        commit_file(missing, "cli.py", "x = 4\n", "Add command", author=ALICE)
+        self.assertEqual(self.run_batch(), {"ok": 1, "error": 0, "skipped": 0})
+        with open(self.output, "r", encoding="utf-8") as f:
+            results = [json.loads(line) for line in f]
+        self.assertEqual([(r["status"], r["commits"]) for r in results], [("error", 1), ("ok", 2)])
+
+    def test_repo_timeout_applies_per_repo(self):
+        read_history = GitTools._read_history
+
+        def slow_read_history(*args, **kwargs):
+            time.sleep(0.4)
+            return read_history(*args, **kwargs)
+        with mock.patch.object(GitTools, "_read_history", autospec=True, side_effect=slow_read_history):
+            # Two repos read one after another take longer than the timeout, each one does not
+            self.assertEqual(self.run_batch(git_workers=1, repo_timeout=0.6), {"ok": 4, "error": 0, "skipped": 0})
+            shutil.rmtree(os.path.join(self.workspace, "cache"))
+            self.assertEqual(self.run_batch(git_workers=1, repo_timeout=0.1, resume=False),
+                             {"ok": 0, "error": 4, "skipped": 0})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Helpers for building throwaway git repositories in tests.
+"""
+import os
+import subprocess
+import tempfile
+
+
+def git(repo_dir, *args, env=None):
+    """Runs a git command in repo_dir and returns its stdout."""
+    full_env = dict(os.environ)
+    if env:
+        full_env.update(env)
+    return subprocess.run(["git", *args], cwd=repo_dir, env=full_env, check=True,
+                          capture_output=True, text=True).stdout
+
+
+def make_repo(parent_dir=None, name="repo", user_name="Test User", user_email="test@example.com"):
+    """Creates an empty git repository with a local identity and returns its path."""
+    parent_dir = parent_dir or tempfile.mkdtemp()
+    repo_dir = os.path.join(parent_dir, name)
+    os.makedirs(repo_dir, exist_ok=True)
+    git(repo_dir, "init", "-q", "-b", "main")
+    git(repo_dir, "config", "user.name", user_name)
+    git(repo_dir, "config", "user.email", user_email)
+    git(repo_dir, "config", "commit.gpgsign", "false")
+    return repo_dir
+
+
+def commit_file(repo_dir, path, content, message, author=None, date=None):
+    """
+    Writes content to path inside repo_dir and commits it.
+    author: optional "Name <email>" string; date: optional git date string used for author and committer.
+    """
+    full_path = os.path.join(repo_dir, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    git(repo_dir, "add", path)
+    args = ["commit", "-q", "-m", message]
+    if author:
+        args.append(f"--author={author}")
+    env = {"GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date} if date else None
+    git(repo_dir, *args, env=env)
+    return git(repo_dir, "rev-parse", "HEAD").strip()
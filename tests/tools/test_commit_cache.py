@@ -0,0 +1,110 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+from src.tools import git_tools as git_tools_module
+from src.tools import commit_cache as commit_cache_module
+from src.tools.commit_cache import CommitCache, get_shared_commit_cache
+from src.tools.git_tools import GitTools, DIFF_MODE_RANGE
+from tests.tools.git_repo_helpers import make_repo, commit_file
+
+class TestCommitCache(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.cache = CommitCache(cache_dir=os.path.join(self.workspace, "cache"))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def _record(self, sha, message="msg"):
+        return {"commit": sha, "author": "A", "author_email": "a@x", "committed_date": 0,
+                "message": message, "files": ["a.txt"]}
+
+    def test_shared_cache_is_one_instance(self):
+        cache_dir = os.path.join(self.workspace, "shared")
+        with mock.patch.object(commit_cache_module, "DEFAULT_CACHE_DIR", cache_dir), \
+                mock.patch.object(commit_cache_module, "_shared_cache", None):
+            from src.activities.daily_update_activity import DaillyUpdateActivity
+            shared = get_shared_commit_cache()
+            try:
+                self.assertIs(get_shared_commit_cache(), shared)
+                self.assertIs(DaillyUpdateActivity([]).git_tools.commit_cache, shared)
+                self.assertIs(DaillyUpdateActivity([]).git_tools.commit_cache, shared)
+                self.assertEqual(shared.cache_dir, cache_dir)
+            finally:
+                shared.close()
+
+    def test_round_trip(self):
+        self.cache.put_commits("repo", [self._record("abc")])
+        self.cache.put_patches("repo", "abc", {"a.txt": "+a"})
+        self.assertEqual(self.cache.get_commits("repo", ["abc", "def"]), {"abc": self._record("abc")})
+        self.assertEqual(self.cache.get_patches("repo", "abc"), {"a.txt": "+a"})
+        self.assertIsNone(self.cache.get_patches("other-repo", "abc"))
+
+    def test_persists_across_instances(self):
+        self.cache.put_commits("repo", [self._record("abc")])
+        reopened = CommitCache(cache_dir=self.cache.cache_dir)
+        try:
+            self.assertIn("abc", reopened.get_commits("repo", ["abc"]))
+        finally:
+            reopened.close()
+
+    def test_evicts_least_recently_used(self):
+        small = CommitCache(cache_dir=os.path.join(self.workspace, "small"), max_bytes=700)
+        try:
+            small.put_commits("repo", [self._record("old", "x" * 100)])
+            small.put_commits("repo", [self._record("kept", "y" * 100)])
+            # Touch "old" so "kept" becomes the least recently used entry
+            small.get_commits("repo", ["old"])
+            small.put_commits("repo", [self._record("new", "z" * 300)])
+            self.assertLessEqual(small.total_bytes(), 700)
+            self.assertEqual(set(small.get_commits("repo", ["old", "kept", "new"])), {"old", "new"})
+        finally:
+            small.close()
+
+class TestGitToolsWithCommitCache(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.repo_dir = make_repo(self.workspace)
+        commit_file(self.repo_dir, "a.txt", "a\n", "Add a")
+        commit_file(self.repo_dir, "b.txt", "b\n", "Add b")
+        self.cache = CommitCache(cache_dir=os.path.join(self.workspace, "cache"))
+        self.since = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def test_only_unseen_commits_are_read(self):
+        cached_tools = GitTools([self.repo_dir], commit_cache=self.cache)
+        first = cached_tools.get_changes_since_date(self.since, with_diffs=True, with_commit_messages=True)
+        uncached = GitTools([self.repo_dir]).get_changes_since_date(self.since, with_diffs=True, with_commit_messages=True)
+        self.assertEqual(sorted(first[0]["changed_files"]), sorted(uncached[0]["changed_files"]))
+        self.assertEqual(first[0]["commit_messages"], uncached[0]["commit_messages"])
+        self.assertEqual(first[0]["diffs"], uncached[0]["diffs"])
+
+        new_sha = commit_file(self.repo_dir, "c.txt", "c\n", "Add c")
+        with mock.patch.object(git_tools_module, "iter_commit_history", wraps=git_tools_module.iter_commit_history) as history:
+            second = cached_tools.get_changes_since_date(self.since, with_diffs=True, with_commit_messages=True)
+        history.assert_called_once()
+        self.assertEqual(history.call_args.kwargs["revisions"], [new_sha])
+        self.assertEqual(len(second[0]["commit_messages"]), 3)
+        self.assertIn("c.txt", second[0]["diffs"])
+
+    def test_range_diff_cached(self):
+        cached_tools = GitTools([self.repo_dir], commit_cache=self.cache)
+        first = cached_tools.get_changes_since_date(self.since, with_diffs=True, diff_mode=DIFF_MODE_RANGE)
+        with mock.patch.object(git_tools_module, "iter_file_patches") as patches:
+            second = cached_tools.get_changes_since_date(self.since, with_diffs=True, diff_mode=DIFF_MODE_RANGE)
+        patches.assert_not_called()
+        self.assertEqual(first[0]["diffs"], second[0]["diffs"])
+
+if __name__ == '__main__':
+    unittest.main()
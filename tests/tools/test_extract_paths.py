@@ -1,9 +1,16 @@
 import unittest
 import os
+import shutil
 import sys
+import tempfile
+from unittest import mock
 sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 sys.path.insert(0, sysPath)
-from src.tools.extract_paths import ExtractPathsTool
+from src.tools.extract_paths import ExtractPathsTool, TIER_REGEX, TIER_REPO_INDEX, TIER_LLM
+from src.tools.repo_index import RepoIndex
+from src.utils.map_reduce_summarizer import DEFAULT_NUM_CTX
+from src.utils.model_health import get_model_health, get_default_keep_alive
+from tests.tools.git_repo_helpers import make_repo
 
 class TestExtractPaths(unittest.TestCase):
 
@@ -24,5 +31,90 @@ class TestExtractPaths(unittest.TestCase):
         self.assertIn("/home/user/project", paths)
         self.assertEqual(len(paths), 2)
 
+class TestTieredExtraction(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.backend = make_repo(self.workspace, name="backend-api")
+        self.tool = ExtractPathsTool(repo_index=RepoIndex([self.workspace], index_path=None))
+
+    def tearDown(self):
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def test_existing_path_skips_llm(self):
+        with mock.patch.object(self.tool, "extract_paths_and_summary_with_llm") as llm:
+            result = self.tool.extract_paths_and_summary(f"Fixed the login bug in {self.backend}.")
+        llm.assert_not_called()
+        self.assertEqual(result["tier"], TIER_REGEX)
+        self.assertEqual(result["project_paths"], [self.backend])
+        self.assertEqual(result["work_summary"], "Fixed the login bug in.")
+
+    def test_repo_name_skips_llm(self):
+        with mock.patch.object(self.tool, "extract_paths_and_summary_with_llm") as llm:
+            result = self.tool.extract_paths_and_summary("Met with the team, then worked on backend-api caching.")
+        llm.assert_not_called()
+        self.assertEqual(result["tier"], TIER_REPO_INDEX)
+        self.assertEqual(result["project_paths"], [self.backend])
+        self.assertEqual(result["work_summary"], "Met with the team, then worked on caching.")
+
+    def test_falls_back_to_llm(self):
+        llm_result = {"project_paths": ["billing"], "work_summary": "Worked on billing."}
+        with mock.patch.object(self.tool, "extract_paths_and_summary_with_llm", return_value=llm_result) as llm:
+            result = self.tool.extract_paths_and_summary("Worked on the billing service today.")
+        llm.assert_called_once()
+        self.assertEqual(result["tier"], TIER_LLM)
+        self.assertEqual(result["project_paths"], ["billing"])
+
+    def test_existing_path_outside_a_repository_is_not_a_hit(self):
+        plain = os.path.join(self.workspace, "notes")
+        os.makedirs(plain)
+        inner = os.path.join(self.backend, "src")
+        os.makedirs(inner)
+        llm_result = {"project_paths": [], "work_summary": "Read notes."}
+        with mock.patch.object(self.tool, "extract_paths_and_summary_with_llm", return_value=llm_result) as llm:
+            result = self.tool.extract_paths_and_summary(f"Read {plain} and /dev.")
+            llm.assert_called_once()
+            self.assertEqual(result["tier"], TIER_LLM)
+            self.assertEqual(result["project_paths"], [])
+            result = self.tool.extract_paths_and_summary(f"Refactored {inner}.")
+        # A path inside a repository resolves to its root
+        self.assertEqual(result["project_paths"], [self.backend])
+        self.assertEqual(llm.call_count, 1)
+
+    def test_llm_resolves_what_is_left(self):
+        llm_result = {"project_paths": ["billing-service"], "work_summary": "Worked on billing."}
+        with mock.patch.object(self.tool, "extract_paths_and_summary_with_llm", return_value=llm_result) as llm:
+            result = self.tool.extract_paths_and_summary("Worked on backend-api and the billing service.")
+        # Only the text the cheap tiers could not resolve goes to the model
+        llm.assert_called_once_with("Worked on and the billing service.")
+        self.assertEqual(result["tier"], TIER_LLM)
+        self.assertEqual(result["project_paths"], [self.backend, "billing-service"])
+        self.assertEqual(result["work_summary"], "Worked on and the billing service.")
+
+    def test_ordinary_words_that_name_repos_need_confirmation(self):
+        test_repo = make_repo(self.workspace, name="test")
+        docs_repo = make_repo(self.workspace, name="docs")
+        self.tool.repo_index.refresh(force=True)
+        text = "Fixed the login bug in backend-api, then had to test it and read the docs."
+        llm_result = {"project_paths": ["docs"], "work_summary": "Fixed the login bug."}
+        with mock.patch.object(self.tool, "extract_paths_and_summary_with_llm", return_value=llm_result) as llm:
+            result = self.tool.extract_paths_and_summary(text)
+        # The ambiguous words stay in the text and the model decides which are projects
+        llm.assert_called_once_with("Fixed the login bug in, then had to test it and read the docs.")
+        self.assertEqual(result["tier"], TIER_LLM)
+        self.assertEqual(result["project_paths"], [self.backend, docs_repo])
+        self.assertEqual(result["work_summary"], "Fixed the login bug in, then had to test it and read the docs.")
+
+        with mock.patch.object(self.tool, "extract_paths_and_summary_with_llm") as llm:
+            result = self.tool.extract_paths_and_summary("Wrote `test` cases for backend-api.")
+        llm.assert_not_called()
+        self.assertEqual(result["project_paths"], [test_repo, self.backend])
+        self.assertEqual(result["work_summary"], "Wrote cases for.")
+
+    def test_llm_tier_sends_the_warm_up_options(self):
+        warm_up = get_model_health(self.tool.qwen.host, self.tool.qwen.model, num_ctx=DEFAULT_NUM_CTX).summarizer
+        request = self.tool.qwen._build_payload("prompt", False)
+        self.assertEqual(request["options"], warm_up._build_payload("", False)["options"])
+        self.assertEqual(request["keep_alive"], get_default_keep_alive())
+
 if __name__ == "__main__":
     unittest.main()
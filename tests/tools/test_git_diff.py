@@ -0,0 +1,114 @@
+import unittest
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+from git import Repo
+from src.tools.git_diff import get_file_patches, parse_diff_header_path, split_patch_stream, EMPTY_TREE_SHA, DiffLimits, DiffBudget, READ_LINE_LIMIT
+from src.tools.git_tools import GitTools
+from tests.tools.git_repo_helpers import make_repo, commit_file, git
+
+class TestGitDiff(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.repo_dir = make_repo(self.workspace)
+        commit_file(self.repo_dir, "a.txt", "one\n", "Add a")
+        commit_file(self.repo_dir, "dir with space/b.txt", "two\n", "Add b")
+        commit_file(self.repo_dir, "quote\"ü.txt", "three\n", "Add quoted")
+        self.repo = Repo(self.repo_dir)
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def test_parse_header_paths(self):
+        self.assertEqual(parse_diff_header_path(b"diff --git a/src/x.py b/src/x.py\n"), "src/x.py")
+        self.assertEqual(parse_diff_header_path(b"diff --git a/a b.txt b/a b.txt\n"), "a b.txt")
+        self.assertEqual(parse_diff_header_path(b'diff --git "a/q\\"\\303\\274.txt" "b/q\\"\\303\\274.txt"\n'), 'q"ü.txt')
+
+    def test_split_matches_single_file_diffs(self):
+        patches = get_file_patches(self.repo, EMPTY_TREE_SHA, 'HEAD')
+        self.assertEqual(sorted(patches), sorted(["a.txt", "dir with space/b.txt", "quote\"ü.txt"]))
+        for path, patch in patches.items():
+            self.assertEqual(patch, self.repo.git.diff(EMPTY_TREE_SHA, 'HEAD', '--', path))
+
+    def test_pathspec_limits_files(self):
+        patches = get_file_patches(self.repo, EMPTY_TREE_SHA, 'HEAD', paths=["dir with space/b.txt"])
+        self.assertEqual(list(patches), ["dir with space/b.txt"])
+        self.assertIn("+two", patches["dir with space/b.txt"])
+
+    def test_prefix_config_does_not_change_the_split(self):
+        for key in ("diff.noprefix", "diff.mnemonicPrefix"):
+            git(self.repo_dir, "config", key, "true")
+        patches = get_file_patches(self.repo, EMPTY_TREE_SHA, 'HEAD')
+        self.assertEqual(sorted(patches), sorted(["a.txt", "dir with space/b.txt", "quote\"ü.txt"]))
+        self.assertIn("+one", patches["a.txt"])
+        with open(os.path.join(self.repo_dir, "a.txt"), "a", encoding="utf-8") as f:
+            f.write("more\n")
+        changes = GitTools([self.repo_dir]).get_current_changes(with_diffs=True)[0]
+        self.assertIn("+more", changes["diffs"]["a.txt"])
+
+    def test_split_empty_stream(self):
+        self.assertEqual(list(split_patch_stream(io.BytesIO(b""))), [])
+
+class TestDiffLimits(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.repo_dir = make_repo(self.workspace)
+        commit_file(self.repo_dir, "small.py", "x = 1\n", "Add small")
+        commit_file(self.repo_dir, "big.py", "".join(f"line {i}\n" for i in range(5000)), "Add big")
+        commit_file(self.repo_dir, "bundle.js", "var a=1;" * (READ_LINE_LIMIT // 2), "Add one-line bundle")
+        commit_file(self.repo_dir, "package-lock.json", "{}\n" * 300, "Add lockfile")
+        with open(os.path.join(self.repo_dir, "logo.png"), "wb") as f:
+            f.write(b"\x89PNG\x00\x01" * 1000)
+        commit_file(self.repo_dir, "marker.txt", "m\n", "Add marker")
+        self.repo = Repo(self.repo_dir)
+        self.repo.git.add("logo.png")
+        self.repo.git.commit("-q", "-m", "Add logo")
+        self.limits = DiffLimits(max_file_bytes=1024)
+        self.patches = get_file_patches(self.repo, EMPTY_TREE_SHA, 'HEAD', limits=self.limits)
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def test_small_patches_are_unchanged(self):
+        self.assertEqual(self.patches["small.py"], self.repo.git.diff(EMPTY_TREE_SHA, 'HEAD', '--', 'small.py'))
+
+    def test_large_patches_are_truncated(self):
+        for path in ("big.py", "bundle.js"):
+            patch = self.patches[path]
+            self.assertLess(len(patch), 1400)
+            self.assertIn("[diff truncated after", patch)
+        self.assertIn("+5000 -0 lines in total", self.patches["big.py"])
+        self.assertTrue(self.patches["big.py"].startswith("diff --git a/big.py b/big.py\nnew file mode"))
+
+    def test_binary_and_generated_files_get_a_stat_line(self):
+        self.assertEqual(self.patches["logo.png"], "diff --git a/logo.png b/logo.png\n[binary file, diff omitted]")
+        self.assertEqual(self.patches["package-lock.json"],
+                         "diff --git a/package-lock.json b/package-lock.json\n[diff omitted, generated file: +300 -0 lines]")
+
+    def test_generated_globs(self):
+        limits = DiffLimits()
+        for path in ("yarn.lock", "web/package-lock.json", "static/app.min.js", "tests/__snapshots__/view.snap",
+                     "vendor/lib/a.go", "web/node_modules/x/index.js", "api/user_pb2.py"):
+            self.assertTrue(limits.is_generated(path), path)
+        for path in ("src/app.js", "docs/vendors.md", "lockfile.py"):
+            self.assertFalse(limits.is_generated(path), path)
+        self.assertNotEqual(limits.cache_tag(), DiffLimits(max_file_bytes=10).cache_tag())
+
+    def test_budget_replaces_patches_once_spent(self):
+        budget = DiffBudget(len(self.patches["small.py"]) + 10)
+        self.assertEqual(budget.admit(self.patches["small.py"]), self.patches["small.py"])
+        self.assertEqual(budget.admit(self.patches["big.py"]),
+                         "diff --git a/big.py b/big.py\n[diff omitted, run size limit reached: +5000 -0 lines]")
+        self.assertEqual(budget.admit(self.patches["small.py"]),
+                         "diff --git a/small.py b/small.py\n[diff omitted, run size limit reached: +1 -0 lines]")
+        self.assertEqual(DiffBudget(None).admit(self.patches["big.py"]), self.patches["big.py"])
+
+if __name__ == '__main__':
+    unittest.main()
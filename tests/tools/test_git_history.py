@@ -0,0 +1,90 @@
+import unittest
+import io
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+from git import Repo
+from src.tools.git_history import iter_commit_history, list_commit_shas, history_filters, parse_log_stream, ALL_REFS
+from tests.tools.git_repo_helpers import make_repo, commit_file, git
+
+class TrickleStream:
+    """Binary stream that returns a few bytes per read, to exercise records split across chunks."""
+    def __init__(self, data, size=7):
+        self.data = io.BytesIO(data)
+        self.size = size
+
+    def read(self, _n=-1):
+        return self.data.read(self.size)
+
+class TestGitHistory(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.repo_dir = make_repo(self.workspace)
+        # Let GitPython report non-ASCII paths unquoted so its stats can be compared directly
+        git(self.repo_dir, "config", "core.quotepath", "false")
+        commit_file(self.repo_dir, "a.txt", "a\n", "First commit\n\nWith a body")
+        commit_file(self.repo_dir, "dir with space/ünï.txt", "u\n", "Unicode path", author="Other Person <other@example.com>")
+        git(self.repo_dir, "checkout", "-q", "-b", "feature")
+        commit_file(self.repo_dir, "feature.txt", "f\n", "Feature work")
+        git(self.repo_dir, "checkout", "-q", "main")
+        commit_file(self.repo_dir, "a.txt", "a\nb\n", "Change a")
+        git(self.repo_dir, "merge", "-q", "--no-ff", "-m", "Merge feature", "feature")
+        git(self.repo_dir, "mv", "a.txt", "renamed.txt")
+        git(self.repo_dir, "commit", "-q", "-m", "Rename a")
+        self.repo = Repo(self.repo_dir)
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def test_matches_gitpython_commit_stats(self):
+        records = list(iter_commit_history(self.repo))
+        commits = list(self.repo.iter_commits())
+        self.assertEqual([r["commit"] for r in records], [c.hexsha for c in commits])
+        for record, commit in zip(records, commits):
+            self.assertEqual(sorted(record["files"]), sorted(commit.stats.files.keys()))
+            self.assertEqual(record["message"], commit.message)
+            self.assertEqual(record["author"], commit.author.name)
+            self.assertEqual(record["author_email"], commit.author.email)
+            self.assertEqual(record["committed_date"], commit.committed_date)
+
+    def test_parse_records_split_across_reads(self):
+        raw = self.repo.git.log('-z', '--numstat', '--no-renames', '--diff-merges=first-parent',
+                                '--format=%x1e%H%x1f%an%x1f%ae%x1f%ct%x1f%B', stdout_as_string=False)
+        expected = list(parse_log_stream(io.BytesIO(raw)))
+        self.assertEqual(list(parse_log_stream(TrickleStream(raw))), expected)
+        self.assertEqual(len(expected), len(list(self.repo.iter_commits())))
+
+    def test_empty_history_window(self):
+        tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        self.assertEqual(list(iter_commit_history(self.repo, since_date=tomorrow)), [])
+
+    def test_filters_and_refs_match_rev_list(self):
+        git(self.repo_dir, "checkout", "-q", "-b", "side")
+        commit_file(self.repo_dir, "side.txt", "s\n", "Side work", author="Other Person <other@example.com>")
+        git(self.repo_dir, "checkout", "-q", "main")
+        for refs in (None, ["side"], ALL_REFS):
+            for filters in ([], history_filters(author="OTHER person"), history_filters(author="other@EXAMPLE")):
+                records = list(iter_commit_history(self.repo, extra_args=filters, refs=refs))
+                self.assertEqual([r["commit"] for r in records], list_commit_shas(self.repo, extra_args=filters, refs=refs))
+                if filters:
+                    self.assertTrue(records)
+                    self.assertEqual({r["author"] for r in records}, {"Other Person"})
+        messages = [r["message"].strip() for r in iter_commit_history(self.repo, extra_args=history_filters(author="other"), refs=ALL_REFS)]
+        self.assertEqual(messages, ["Side work", "Unicode path"])
+
+    def test_since_covers_the_whole_day(self):
+        today = datetime.now().strftime('%Y-%m-%d')
+        commit_file(self.repo_dir, "early.txt", "e\n", "Early commit", date=f"{today}T00:00:01")
+        messages = [r["message"].strip() for r in iter_commit_history(self.repo, extra_args=history_filters(since_date=today, until_date=today))]
+        self.assertIn("Early commit", messages)
+        self.assertEqual(history_filters(since_date="2024-06-03", until_date="2024-06-04"),
+                         ["--since=2024-06-03 00:00:00", "--until=2024-06-04 23:59:59"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+from git import Repo
+from src.tools.git_status import get_working_tree_status, get_working_tree_fingerprint, parse_porcelain_v2
+from src.tools.git_tools import GitTools
+from tests.tools.git_repo_helpers import make_repo, commit_file, git
+
+class TestGitStatus(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.repo_dir = make_repo(self.workspace)
+        for name in ("edited.txt", "staged.txt", "deleted.txt", "staged_deleted.txt"):
+            commit_file(self.repo_dir, name, f"{name}\n", f"Add {name}")
+        self._write("edited.txt", "edited\n")
+        self._write("staged.txt", "staged\n")
+        git(self.repo_dir, "add", "staged.txt")
+        os.remove(os.path.join(self.repo_dir, "deleted.txt"))
+        git(self.repo_dir, "rm", "-q", "staged_deleted.txt")
+        self._write("new dir/untracked.txt", "untracked\n")
+        self._write("new_staged.txt", "new\n")
+        git(self.repo_dir, "add", "new_staged.txt")
+        self.repo = Repo(self.repo_dir)
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def _write(self, path, content):
+        full_path = os.path.join(self.repo_dir, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def test_single_status_run(self):
+        status = get_working_tree_status(self.repo)
+        self.assertEqual(sorted(status["added"]), ["new dir/untracked.txt", "new_staged.txt"])
+        self.assertEqual(sorted(status["modified"]), ["edited.txt", "staged.txt"])
+        self.assertEqual(sorted(status["removed"]), ["deleted.txt", "staged_deleted.txt"])
+
+    def test_parse_entries(self):
+        output = (b"1 MM N... 100644 100644 100644 aaa bbb both.txt\0"
+                  b"2 R. N... 100644 100644 100644 aaa bbb R100 new name.txt\0old name.txt\0"
+                  b"? untracked file.txt\0")
+        status = parse_porcelain_v2(output)
+        self.assertEqual(status["modified"], ["both.txt"])
+        self.assertEqual(status["added"], ["untracked file.txt"])
+        self.assertEqual(status["removed"], [])
+
+    def test_current_changes_batched_diffs(self):
+        result = GitTools([self.repo_dir]).get_current_changes(with_diffs=True)[0]
+        self.assertIn("+edited", result["diffs"]["edited.txt"])
+        self.assertEqual(result["diffs"]["edited.txt"], self.repo.git.diff("edited.txt"))
+        # Only staged, so there is no working tree diff
+        self.assertEqual(result["diffs"]["staged.txt"], "")
+        self.assertNotIn("deleted.txt", result["diffs"])
+
+class TestWorkingTreeFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.repo_dir = make_repo(self.workspace)
+        commit_file(self.repo_dir, "a.txt", "a\n", "Add a")
+        self.repo = Repo(self.repo_dir)
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def _write(self, content, mtime):
+        path = os.path.join(self.repo_dir, "a.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.utime(path, (mtime, mtime))
+
+    def test_fingerprint_tracks_uncommitted_edits(self):
+        clean = get_working_tree_fingerprint(self.repo)
+        self.assertEqual(get_working_tree_fingerprint(self.repo), clean)
+        self._write("edit 1\n", 1_000_000_000)
+        first_edit = get_working_tree_fingerprint(self.repo)
+        self.assertNotEqual(first_edit, clean)
+        # Editing an already modified file does not change `git status`, but must change the fingerprint
+        self._write("edit 22\n", 1_000_000_100)
+        self.assertNotEqual(get_working_tree_fingerprint(self.repo), first_edit)
+        git(self.repo_dir, "checkout", "--", "a.txt")
+        self.assertEqual(get_working_tree_fingerprint(self.repo), clean)
+
+if __name__ == '__main__':
+    unittest.main()
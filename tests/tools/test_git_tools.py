@@ -1,10 +1,17 @@
 import unittest
 import os
+import shutil
 import sys
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
 
 sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 sys.path.insert(0, sysPath)
-from src.tools.git_tools import GitTools
+from src.tools import git_tools as git_tools_module
+from src.tools.git_diff import DiffLimits
+from src.tools.git_tools import GitTools, DIFF_MODE_RANGE, DEFAULT_REPO_TIMEOUT
+from tests.tools.git_repo_helpers import make_repo, commit_file, git
 
 class TestGitTools(unittest.TestCase):
     @classmethod
@@ -43,5 +50,236 @@ class TestGitTools(unittest.TestCase):
             self.assertIsInstance(result['changed_files'], list)
             self.assertIsInstance(result['diffs'], dict)
 
+class TestGitToolsParallelScan(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.project_dirs = []
+        for i in range(4):
+            repo_dir = make_repo(self.workspace, name=f"repo{i}")
+            commit_file(repo_dir, f"file{i}.txt", f"content {i}\n", f"Commit in repo{i}")
+            self.project_dirs.append(repo_dir)
+        # A directory that is not a git repository must keep its slot in the results
+        self.not_a_repo = os.path.join(self.workspace, "plain")
+        os.makedirs(self.not_a_repo)
+        self.project_dirs.insert(2, self.not_a_repo)
+        self.since = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+    def tearDown(self):
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def test_parallel_matches_sequential_order(self):
+        sequential = GitTools(self.project_dirs, max_workers=1)
+        parallel = GitTools(self.project_dirs, max_workers=4)
+        seq_results = sequential.get_changes_since_date(self.since, with_commit_messages=True)
+        par_results = parallel.get_changes_since_date(self.since, with_commit_messages=True)
+        self.assertEqual(len(par_results), len(self.project_dirs))
+        self.assertIsNone(par_results[2])
+        for seq, par, dir_path in zip(seq_results, par_results, self.project_dirs):
+            if dir_path == self.not_a_repo:
+                continue
+            self.assertEqual(par["project_dir"], dir_path)
+            self.assertEqual(seq["changed_files"], par["changed_files"])
+            self.assertEqual(len(par["commit_messages"]), 1)
+
+    def test_current_changes_keep_project_order(self):
+        with open(os.path.join(self.project_dirs[0], "file0.txt"), "a", encoding="utf-8") as f:
+            f.write("more\n")
+        results = GitTools(self.project_dirs, max_workers=3).get_current_changes(with_diffs=True)
+        self.assertEqual([r["project_dir"] if r else None for r in results],
+                         [d if d != self.not_a_repo else None for d in self.project_dirs])
+        self.assertEqual(results[0]["modified"], ["file0.txt"])
+        self.assertIn("+more", results[0]["diffs"]["file0.txt"])
+
+    def test_failing_repo_does_not_block_others(self):
+        git_tools = GitTools(self.project_dirs, max_workers=4)
+
+        def worker(repo, dir_path):
+            if dir_path == self.project_dirs[0]:
+                raise RuntimeError("broken repo")
+            return dir_path
+        results = git_tools._map_repos(worker)
+        self.assertIsNone(results[0])
+        self.assertEqual(results[1], self.project_dirs[1])
+        self.assertEqual(results[-1], self.project_dirs[-1])
+
+    def test_slow_repo_times_out(self):
+        import threading
+        release = threading.Event()
+        git_tools = GitTools(self.project_dirs, max_workers=4, repo_timeout=0.5)
+
+        def worker(repo, dir_path):
+            if dir_path == self.project_dirs[1]:
+                release.wait(5)
+            return dir_path
+        try:
+            results = git_tools._map_repos(worker)
+        finally:
+            release.set()
+        self.assertIsNone(results[1])
+        self.assertEqual(results[0], self.project_dirs[0])
+
+    def test_timeout_applies_to_sequential_and_single_repo_scans(self):
+        import threading
+        self.assertEqual(GitTools(self.project_dirs).repo_timeout, DEFAULT_REPO_TIMEOUT)
+        release = threading.Event()
+
+        def worker(repo, dir_path):
+            release.wait(5)
+            return dir_path
+        try:
+            for git_tools in (GitTools(self.project_dirs[:1], repo_timeout=0.5),
+                              GitTools(self.project_dirs[:2], max_workers=1, repo_timeout=0.5)):
+                self.assertIsNone(git_tools._map_repos(worker)[0])
+        finally:
+            release.set()
+
+    def test_timeout_counts_from_the_start_of_each_repo(self):
+        import threading
+        import time
+        release = threading.Event()
+        repo_dirs = [d for d in self.project_dirs if d != self.not_a_repo]
+        git_tools = GitTools(repo_dirs, max_workers=1, repo_timeout=1.0)
+
+        def slow_worker(repo, dir_path):
+            time.sleep(0.4)
+            return dir_path
+        self.assertEqual(git_tools._map_repos(slow_worker), repo_dirs)
+
+        def hung_first_worker(repo, dir_path):
+            if dir_path == repo_dirs[0]:
+                release.wait(5)
+            return dir_path
+        git_tools.repo_timeout = 0.3
+        try:
+            self.assertEqual(git_tools._map_repos(hung_first_worker), [None] + repo_dirs[1:])
+        finally:
+            release.set()
+
+    def test_repo_states(self):
+        git_tools = GitTools(self.project_dirs)
+        states = git_tools.get_repo_states()
+        self.assertIsNone(states[2])
+        first = states[0]
+        self.assertEqual(first["head"], git(self.project_dirs[0], "rev-parse", "HEAD").strip())
+        commit_file(self.project_dirs[0], "more.txt", "more\n", "Another commit")
+        with open(os.path.join(self.project_dirs[1], "file1.txt"), "a", encoding="utf-8") as f:
+            f.write("edit\n")
+        new_states = git_tools.get_repo_states()
+        self.assertNotEqual(new_states[0]["head"], first["head"])
+        self.assertEqual(new_states[1]["head"], states[1]["head"])
+        self.assertNotEqual(new_states[1]["working_tree"], states[1]["working_tree"])
+        self.assertEqual(new_states[3], states[3])
+
+class TestGitToolsRangeDiffs(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.repo_dir = make_repo(self.workspace)
+        commit_file(self.repo_dir, "app.py", "line 1\n", "Old commit", date="2020-01-01T12:00:00")
+        commit_file(self.repo_dir, "old.py", "old\n", "Old file", date="2020-01-01T12:00:00")
+        commit_file(self.repo_dir, "app.py", "line 1\nline 2\n", "First change")
+        commit_file(self.repo_dir, "app.py", "line 1\nline 2\nline 3\n", "Second change")
+        commit_file(self.repo_dir, "theirs.py", "theirs\n", "Someone else", author="Other Person <other@example.com>")
+        self.since = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+    def tearDown(self):
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def test_range_diff_is_net_change_of_author_files(self):
+        git_tools = GitTools([self.repo_dir])
+        result = git_tools.get_changes_since_date(self.since, with_diffs=True, diff_mode=DIFF_MODE_RANGE)[0]
+        self.assertEqual(sorted(result["changed_files"]), ["app.py"])
+        self.assertEqual(list(result["diffs"]), ["app.py"])
+        # Both commits inside the window end up in one patch against the pre-window base
+        self.assertIn("+line 2", result["diffs"]["app.py"])
+        self.assertIn("+line 3", result["diffs"]["app.py"])
+        self.assertNotIn("+line 1", result["diffs"]["app.py"])
+
+    def test_commit_diffs_are_against_the_parent_and_budgeted(self):
+        result = GitTools([self.repo_dir]).get_changes_since_date(self.since, with_diffs=True)[0]
+        self.assertIn("+line 2", result["diffs"]["app.py"])
+        self.assertNotIn("-line 2", result["diffs"]["app.py"])
+        tight = GitTools([self.repo_dir], diff_limits=DiffLimits(max_run_bytes=0))
+        result = tight.get_changes_since_date(self.since, with_diffs=True)[0]
+        self.assertEqual(result["diffs"]["app.py"], "diff --git a/app.py b/app.py\n[diff omitted, run size limit reached: +1 -0 lines]")
+
+    def test_commit_records_cover_all_authors(self):
+        records = GitTools([self.repo_dir]).get_commit_records(self.since)[0]
+        self.assertEqual(records["project_dir"], self.repo_dir)
+        self.assertEqual([record["message"].strip() for record in records["commits"]],
+                         ["Someone else", "Second change", "First change"])
+        self.assertEqual(records["commits"][0]["author_email"], "other@example.com")
+
+    def test_unknown_diff_mode(self):
+        with self.assertRaises(ValueError):
+            GitTools([self.repo_dir]).get_changes_since_date(self.since, with_diffs=True, diff_mode="bogus")
+
+class TestGitToolsFilters(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.alice_repo = make_repo(self.workspace, "alice_repo", user_name="Alice", user_email="alice@example.com")
+        self.bob_repo = make_repo(self.workspace, "bob_repo", user_name="Bob", user_email="bob@example.com")
+        for repo_dir in (self.alice_repo, self.bob_repo):
+            commit_file(repo_dir, "alice.txt", "a\n", "Alice's work", author="Alice <alice@example.com>")
+            commit_file(repo_dir, "bob.txt", "b\n", "Bob's work", author="Bob <bob@example.com>")
+        self.since = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+    def tearDown(self):
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def messages(self, result):
+        return [c["message"] for c in result["commit_messages"]]
+
+    def test_each_repo_uses_its_own_identity(self):
+        git_tools = GitTools([self.alice_repo, self.bob_repo])
+        self.assertEqual(git_tools.resolve_authors(), {self.alice_repo: "Alice", self.bob_repo: "Bob"})
+        results = git_tools.get_changes_since_date(self.since, with_commit_messages=True)
+        self.assertEqual(self.messages(results[0]), ["Alice's work"])
+        self.assertEqual(self.messages(results[1]), ["Bob's work"])
+        self.assertEqual(git_tools.resolve_authors("bob"), {self.alice_repo: "bob", self.bob_repo: "bob"})
+
+    def test_other_authors_are_filtered_by_git(self):
+        read = []
+        iter_commit_history = git_tools_module.iter_commit_history
+
+        def recording_history(*args, **kwargs):
+            for record in iter_commit_history(*args, **kwargs):
+                read.append(record["author"])
+                yield record
+        with mock.patch.object(git_tools_module, "iter_commit_history", side_effect=recording_history):
+            GitTools([self.alice_repo]).get_changes_since_date(self.since, with_commit_messages=True)
+        self.assertEqual(read, ["Alice"])
+
+    def test_range_diffs_follow_the_selected_branches(self):
+        git(self.alice_repo, "checkout", "-q", "-b", "feature")
+        commit_file(self.alice_repo, "feature.txt", "f\n", "Feature work", author="Alice <alice@example.com>")
+        commit_file(self.alice_repo, "alice.txt", "a\nfeature\n", "Feature edit", author="Alice <alice@example.com>")
+        git(self.alice_repo, "checkout", "-q", "main")
+        commit_file(self.alice_repo, "alice.txt", "a\nmain\n", "Main edit", author="Alice <alice@example.com>")
+        git_tools = GitTools([self.alice_repo])
+        feature = git_tools.get_changes_since_date(self.since, with_diffs=True, diff_mode=DIFF_MODE_RANGE, branches=["feature"])[0]
+        self.assertIn("+f", feature["diffs"]["feature.txt"])
+        self.assertIn("+feature", feature["diffs"]["alice.txt"])
+        self.assertNotIn("+main", feature["diffs"]["alice.txt"])
+        everything = git_tools.get_changes_since_date(self.since, with_diffs=True, diff_mode=DIFF_MODE_RANGE, all_branches=True)[0]
+        self.assertIn("+f", everything["diffs"]["feature.txt"])
+        # The file changed differently on both branches gets both patches
+        self.assertIn("+feature", everything["diffs"]["alice.txt"])
+        self.assertIn("+main", everything["diffs"]["alice.txt"])
+
+    def test_until_date_and_branches(self):
+        commit_file(self.alice_repo, "old.txt", "o\n", "Old work", author="Alice <alice@example.com>", date="2020-01-01T12:00:00")
+        git(self.alice_repo, "checkout", "-q", "-b", "feature")
+        commit_file(self.alice_repo, "feature.txt", "f\n", "Feature work", author="Alice <alice@example.com>")
+        git(self.alice_repo, "checkout", "-q", "main")
+        git_tools = GitTools([self.alice_repo])
+        window = git_tools.get_changes_since_date("2019-12-31", until_date="2020-01-01", with_commit_messages=True)[0]
+        self.assertEqual(self.messages(window), ["Old work"])
+        head_only = git_tools.get_changes_since_date(self.since, with_commit_messages=True)[0]
+        self.assertNotIn("Feature work", self.messages(head_only))
+        for kwargs in ({"branches": ["feature"]}, {"all_branches": True}):
+            result = git_tools.get_changes_since_date(self.since, with_commit_messages=True, **kwargs)[0]
+            self.assertIn("Feature work", self.messages(result))
+            self.assertIn("feature.txt", result["changed_files"])
+
 if __name__ == '__main__':
     unittest.main()
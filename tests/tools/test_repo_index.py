@@ -0,0 +1,65 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+from src.tools import repo_index as repo_index_module
+from src.tools.repo_index import RepoIndex, find_repo_root
+from tests.tools.git_repo_helpers import make_repo, git
+
+class TestRepoIndex(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.root = os.path.join(self.workspace, "work")
+        os.makedirs(self.root)
+        self.backend = make_repo(self.root, name="backend-api")
+        git(self.backend, "remote", "add", "origin", "https://example.com/backend-api.git")
+        self.project_a = make_repo(os.path.join(self.root, "clients"), name="ProjectA")
+        os.makedirs(os.path.join(self.project_a, "src"))
+        open(os.path.join(self.project_a, "src", "main.py"), "w").close()
+        self.index_path = os.path.join(self.workspace, "index.json")
+        # Check freshness on every lookup
+        self._interval = repo_index_module.FRESHNESS_CHECK_INTERVAL
+        repo_index_module.FRESHNESS_CHECK_INTERVAL = 0
+
+    def tearDown(self):
+        repo_index_module.FRESHNESS_CHECK_INTERVAL = self._interval
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def test_indexes_names_paths_and_remotes(self):
+        index = RepoIndex([self.root], index_path=self.index_path)
+        repos = {repo["name"]: repo for repo in index.repos}
+        self.assertEqual(set(repos), {"backend-api", "ProjectA"})
+        self.assertEqual(repos["backend-api"]["remote"], "https://example.com/backend-api.git")
+        self.assertIsNone(repos["ProjectA"]["remote"])
+
+    def test_resolves_names_and_paths(self):
+        index = RepoIndex([self.root], index_path=self.index_path)
+        self.assertEqual(index.resolve("backend-api"), self.backend)
+        self.assertEqual(index.resolve("projecta"), self.project_a)
+        self.assertEqual(index.resolve("ProjectA/src/main.py"), self.project_a)
+        self.assertEqual(index.resolve("clients\\ProjectA\\src"), self.project_a)
+        self.assertEqual(index.resolve(os.path.join(self.project_a, "src", "main.py")), self.project_a)
+        self.assertIsNone(index.resolve("unknown-project"))
+        resolved, unresolved = index.resolve_all(["backend-api", "ProjectA/src/main.py", "ProjectA", "nope"])
+        self.assertEqual(resolved, [self.backend, self.project_a])
+        self.assertEqual(unresolved, ["nope"])
+
+    def test_persists_and_invalidates_on_mtime(self):
+        RepoIndex([self.root], index_path=self.index_path).refresh()
+        self.assertTrue(os.path.exists(self.index_path))
+        reloaded = RepoIndex([self.root], index_path=self.index_path)
+        reloaded.refresh()
+        self.assertEqual(len(reloaded.repos), 2)
+        new_repo = make_repo(self.root, name="new-service")
+        self.assertEqual(reloaded.resolve("new-service"), new_repo)
+
+    def test_find_repo_root(self):
+        self.assertEqual(find_repo_root(os.path.join(self.project_a, "src", "main.py")), self.project_a)
+        self.assertIsNone(find_repo_root(os.path.join(self.root, "clients"), stop_at=self.root))
+
+if __name__ == '__main__':
+    unittest.main()
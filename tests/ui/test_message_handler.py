@@ -0,0 +1,29 @@
+import unittest
+import os
+import sys
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+
+from src.ui.message_handler import prepare_message, prepare_stream_message, prepare_timings_message, add_to_history, is_timings_message
+
+class TestAddToHistory(unittest.TestCase):
+    def test_stream_messages_are_updated_in_place(self):
+        history, stream_ids = [], {}
+        add_to_history(history, prepare_message("Starting..."), stream_ids)
+        add_to_history(history, prepare_stream_message("Hel", "summary"), stream_ids)
+        add_to_history(history, prepare_stream_message("Hello", "summary"), stream_ids)
+        add_to_history(history, prepare_message("Done"), stream_ids)
+        self.assertEqual(history, [
+            {"role": "user", "content": "Starting..."},
+            {"role": "user", "content": "Hello"},
+            {"role": "user", "content": "Done"},
+        ])
+
+    def test_timings_message_is_collapsible_and_stripped(self):
+        msg = prepare_timings_message("| Stage | Seconds |")
+        self.assertTrue(is_timings_message(msg))
+        history = add_to_history([], msg, {})
+        self.assertEqual(history, [{"role": "user", "content": "| Stage | Seconds |", "metadata": {"title": "⏱️ Timings"}}])
+
+if __name__ == "__main__":
+    unittest.main()
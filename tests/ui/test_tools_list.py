@@ -0,0 +1,46 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+from unittest import mock
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+
+from src.ui import tools_list
+from src.ui.tools_list import TOOLS, TOOL_MODULES, get_tool_function, get_tool_names
+
+class TestToolsList(unittest.TestCase):
+    def test_import_does_not_load_tools(self):
+        # A fresh interpreter, since this test process may already have imported the tools
+        script = ("import json, sys; import src.ui.tools_list; "
+                  "print(json.dumps([name for name in ('git', 'requests', 'src.ui.uitools.daily_summary_tool') "
+                  "if name in sys.modules]))")
+        output = subprocess.run([sys.executable, "-c", script], cwd=sysPath, capture_output=True, text=True, check=True)
+        self.assertEqual(json.loads(output.stdout), [])
+
+    def test_tool_is_resolved_by_name(self):
+        from src.ui.uitools.daily_summary_tool import tool_daily_summary
+        self.assertIs(get_tool_function("Daily Summary"), tool_daily_summary)
+        self.assertIsNone(get_tool_function("None"))
+        self.assertIsNone(get_tool_function("Unknown"))
+        self.assertEqual(get_tool_names(), list(TOOLS.keys()))
+        self.assertIn("src.ui.uitools.daily_summary_tool", TOOL_MODULES)
+
+    def test_tool_is_imported_once(self):
+        with mock.patch.dict(TOOLS, {"Hello": "src.ui.uitools.hello_world_tool:tool_hello_world"}), \
+             mock.patch.dict(tools_list._resolved_tools, clear=True), \
+             mock.patch.object(tools_list, "resolve_tool", wraps=tools_list.resolve_tool) as resolve:
+            first = get_tool_function("Hello")
+            second = get_tool_function("Hello")
+        self.assertIs(first, second)
+        self.assertEqual(resolve.call_count, 1)
+
+    def test_missing_tool_returns_none(self):
+        with mock.patch.dict(TOOLS, {"Broken": "src.ui.uitools.missing_tool:tool_missing"}), \
+             mock.patch.dict(tools_list._resolved_tools, clear=True):
+            self.assertIsNone(get_tool_function("Broken"))
+            self.assertNotIn("Broken", tools_list._resolved_tools)
+
+if __name__ == "__main__":
+    unittest.main()
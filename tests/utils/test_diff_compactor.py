@@ -0,0 +1,138 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+from git import Repo
+from src.tools.git_diff import get_file_patches, summarize_patch
+from src.utils.diff_compactor import compact_patch, compact_diffs, NO_CHANGES_NOTE
+from tests.tools.git_repo_helpers import make_repo, commit_file
+
+BEFORE = """import os
+import sys
+
+def load(path):
+    with open(path) as f:
+        data = f.read()
+    if not data:
+        return None
+    lines = data.split("\\n")
+    result = []
+    for line in lines:
+        result.append(line)
+    return result
+"""
+
+LOADER_HELPER = """def find(paths, name):
+    for path in paths:
+        if path.endswith(name):
+            return path
+    return None
+
+"""
+
+JS_BEFORE = """function load(text) {
+    const sep = "a b";
+    const limit = 10;
+    const parts = text.split(sep,limit);
+    return parts;
+}
+"""
+
+USERS_BEFORE = """def get_user(user_id):
+    cached = cache.get(user_id)
+    if cached:
+        return cached
+    return db.load(user_id)
+
+
+def delete_user(user_id):
+    check_auth()
+    db.delete(user_id)
+"""
+
+class TestDiffCompactor(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.repo_dir = make_repo(self.workspace)
+        commit_file(self.repo_dir, "load.py", BEFORE, "Add loader")
+
+    def tearDown(self):
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def patch_for(self, content, path="load.py"):
+        commit_file(self.repo_dir, path, content, "Change loader")
+        return get_file_patches(Repo(self.repo_dir), "HEAD~1", "HEAD")[path]
+
+    def test_keeps_changes_and_function_header(self):
+        patch = self.patch_for(BEFORE.replace("        return None", "        return []"))
+        self.assertEqual(compact_patch(patch), "\n".join([
+            "diff --git a/load.py b/load.py",
+            "@@ def load(path):",
+            "     if not data:",
+            "-        return None",
+            "+        return []",
+            "     lines = data.split(\"\\n\")",
+        ]))
+        self.assertEqual(compact_patch(patch, context_lines=0).splitlines()[2:], ["-        return None", "+        return []"])
+
+    def test_drops_whitespace_only_edits(self):
+        commit_file(self.repo_dir, "load.js", JS_BEFORE, "Add js loader")
+        reformatted = JS_BEFORE.replace("split(sep,limit)", "split( sep, limit )").replace("return parts;", "return parts;   \n\n")
+        self.assertEqual(compact_patch(self.patch_for(reformatted, "load.js")),
+                         f"diff --git a/load.js b/load.js\n{NO_CHANGES_NOTE}")
+
+    def test_keeps_whitespace_in_indentation_and_strings(self):
+        commit_file(self.repo_dir, "load.js", JS_BEFORE, "Add js loader")
+        changed = JS_BEFORE.replace('"a b"', '"a  b"').replace("    return parts;", "return parts;")
+        compacted = compact_patch(self.patch_for(changed, "load.js"))
+        self.assertIn('+    const sep = "a  b";', compacted)
+        self.assertIn("+return parts;", compacted)
+        self.assertEqual(sum(line.startswith(("+", "-")) for line in compacted.splitlines()), 4)
+
+    def test_keeps_dedents_and_single_moved_lines_in_python(self):
+        commit_file(self.repo_dir, "users.py", USERS_BEFORE, "Add users")
+        changed = USERS_BEFORE.replace("        return cached", "    return cached")
+        changed = changed.replace("    check_auth()\n    db.delete(user_id)", "    db.delete(user_id)")
+        changed = changed.replace("def get_user(user_id):\n", "def get_user(user_id):\n    check_auth()\n")
+        compacted = compact_patch(self.patch_for(changed, "users.py"))
+        self.assertNotIn(NO_CHANGES_NOTE, compacted)
+        for line in ("-        return cached", "+    return cached", "-    check_auth()", "+    check_auth()"):
+            self.assertIn(line, compacted)
+        reformatted = USERS_BEFORE.replace("cache.get(user_id)", "cache.get( user_id )")
+        self.assertIn("+    cached = cache.get( user_id )", compact_patch(self.patch_for(reformatted, "users.py")))
+
+    def test_drops_moved_blocks(self):
+        reordered = BEFORE.replace("def load(path):", LOADER_HELPER + "def load(path):")
+        commit_file(self.repo_dir, "load.py", reordered, "Add helper")
+        moved = BEFORE + "\n" + LOADER_HELPER
+        self.assertEqual(compact_patch(self.patch_for(moved)), f"diff --git a/load.py b/load.py\n{NO_CHANGES_NOTE}")
+
+    def test_moved_blocks_stay_as_context_of_real_changes(self):
+        reordered = BEFORE.replace("def load(path):", LOADER_HELPER + "def load(path):")
+        commit_file(self.repo_dir, "load.py", reordered, "Add helper")
+        moved = BEFORE + "\n" + LOADER_HELPER.replace("    return None\n", "    return None\n    # fallback\n")
+        compacted = compact_patch(self.patch_for(moved))
+        self.assertIn("+    # fallback", compacted)
+        self.assertNotIn("-", "".join(line[0] for line in compacted.splitlines()[1:]))
+        self.assertEqual(sum(line.startswith("+") for line in compacted.splitlines()), 1)
+
+    def test_notes_and_plain_text_are_kept(self):
+        omitted = summarize_patch("diff --git a/x.bin b/x.bin\n@@ -1 +1 @@\n-a\n+b", "generated file")
+        self.assertEqual(compact_patch(omitted), omitted)
+        self.assertEqual(compact_patch("Error getting diff: boom"), "Error getting diff: boom")
+        truncated = "diff --git a/a b/a\n@@ -1 +1,2 @@\n a\n+b\n[diff truncated after 10 bytes: 5 more bytes, +2 -0 lines in total]"
+        self.assertTrue(compact_patch(truncated).endswith("lines in total]"))
+
+    def test_compact_diffs_reports_tokens(self):
+        patch = self.patch_for(BEFORE.replace("        return None", "        return []"))
+        compacted, stats = compact_diffs({"load.py": patch, "empty.py": ""})
+        self.assertEqual(compacted["empty.py"], "")
+        self.assertEqual(stats["files"], 2)
+        self.assertLess(stats["tokens_after"], stats["tokens_before"])
+
+if __name__ == "__main__":
+    unittest.main()
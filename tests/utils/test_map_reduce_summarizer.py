@@ -0,0 +1,71 @@
+import unittest
+import os
+import sys
+import threading
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+
+from src.utils.map_reduce_summarizer import MapReduceSummarizer, MAP_PROMPT_FILE, REDUCE_PROMPT_FILE
+from src.utils.token_estimator import estimate_tokens
+
+class FakeSummarizer:
+    """Records every prompt it is asked to summarize and answers with a short summary."""
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def summarize(self, prompt_file, replacements=None, **kwargs):
+        with self.lock:
+            self.calls.append((prompt_file, replacements[0][1]))
+            return f"summary {len(self.calls)}"
+
+def file_item(name, lines):
+    body = "".join(f"+line {i} of {name}\n" for i in range(lines))
+    return f"Project: /repo\nFile: {name}\nDiff:\n{body}"
+
+class TestMapReduceSummarizer(unittest.TestCase):
+    def test_small_change_set_is_one_call(self):
+        fake = FakeSummarizer()
+        items = [file_item("a.py", 3), file_item("b.py", 3)]
+        result = MapReduceSummarizer(fake, num_ctx=8192).summarize(items)
+        self.assertEqual(result, "summary 1")
+        self.assertEqual(fake.calls, [(MAP_PROMPT_FILE, "\n\n".join(items))])
+
+    def test_chunks_fit_budget_and_reduce_to_one(self):
+        fake = FakeSummarizer()
+        pipeline = MapReduceSummarizer(fake, num_ctx=1024, response_tokens=256)
+        items = [file_item(f"f{i}.py", 40) for i in range(30)]
+        result = pipeline.summarize(items)
+        map_calls = [text for prompt, text in fake.calls if prompt == MAP_PROMPT_FILE]
+        reduce_calls = [text for prompt, text in fake.calls if prompt == REDUCE_PROMPT_FILE]
+        self.assertGreater(len(map_calls), 1)
+        budget = pipeline._budget(MAP_PROMPT_FILE)
+        for text in map_calls:
+            self.assertLessEqual(estimate_tokens(text), budget)
+        # Every item ends up in exactly one chunk
+        self.assertEqual(sum(text.count("File: ") for text in map_calls), 30)
+        self.assertTrue(reduce_calls)
+        self.assertEqual(result, f"summary {len(fake.calls)}")
+
+    def test_large_item_is_split_with_header(self):
+        pipeline = MapReduceSummarizer(FakeSummarizer(), num_ctx=1024, response_tokens=256)
+        parts = pipeline.pack([file_item("big.py", 500)], 300)
+        self.assertGreater(len(parts), 1)
+        for i, part in enumerate(parts, start=1):
+            self.assertTrue(part.startswith(f"Project: /repo\nFile: big.py\nDiff:\n(part {i}/{len(parts)})"))
+            self.assertLessEqual(estimate_tokens(part), 300)
+
+    def test_single_long_line_is_cut(self):
+        pipeline = MapReduceSummarizer(FakeSummarizer())
+        parts = pipeline.pack(["x" * 10000], 500)
+        self.assertEqual("".join(p.split("\n", 1)[1] for p in parts), "x" * 10000)
+        for part in parts:
+            self.assertLessEqual(estimate_tokens(part), 500)
+
+    def test_empty(self):
+        fake = FakeSummarizer()
+        self.assertEqual(MapReduceSummarizer(fake).summarize([]), "")
+        self.assertEqual(fake.calls, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import os
+import sys
+import threading
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+
+from src.utils.model_health import ModelHealth, get_model_health
+
+class FakeSummarizer:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.checks = 0
+        self.warm_ups = 0
+        self.checked = threading.Event()
+
+    def check_ollama_and_model(self):
+        status = self.statuses[min(self.checks, len(self.statuses) - 1)]
+        self.checks += 1
+        self.checked.set()
+        return {"status": status, "message": "ok" if status else "down"}
+
+    def warm_up(self):
+        self.warm_ups += 1
+        return {"status": True, "message": "loaded"}
+
+class TestModelHealth(unittest.TestCase):
+    def test_fresh_result_is_served_from_cache(self):
+        summarizer = FakeSummarizer([True])
+        health = ModelHealth(summarizer, ttl=60)
+        self.assertTrue(health.get()["status"])
+        self.assertTrue(health.get()["status"])
+        self.assertEqual(summarizer.checks, 1)
+
+    def test_stale_result_is_returned_and_refreshed_in_background(self):
+        summarizer = FakeSummarizer([True, False])
+        health = ModelHealth(summarizer, ttl=0)
+        health.get()
+        summarizer.checked.clear()
+        # The stale success is returned at once, the refresh happens on another thread
+        self.assertTrue(health.get()["status"])
+        self.assertTrue(summarizer.checked.wait(timeout=5))
+        self.assertEqual(summarizer.checks, 2)
+
+    def test_failed_check_is_not_cached(self):
+        summarizer = FakeSummarizer([False, True])
+        health = ModelHealth(summarizer, ttl=60)
+        self.assertFalse(health.get()["status"])
+        self.assertTrue(health.get()["status"])
+        self.assertEqual(summarizer.checks, 2)
+
+    def test_warm_up_loads_model_only_when_healthy(self):
+        summarizer = FakeSummarizer([False, True])
+        health = ModelHealth(summarizer)
+        self.assertFalse(health.warm_up()["status"])
+        self.assertEqual(summarizer.warm_ups, 0)
+        health.start_warm_up().join(timeout=5)
+        self.assertEqual(summarizer.warm_ups, 1)
+        # The warm-up's check is reused by the next request
+        health.get()
+        self.assertEqual(summarizer.checks, 2)
+
+    def test_shared_instance_per_host_model_and_context(self):
+        self.assertIs(get_model_health(num_ctx=4096), get_model_health(num_ctx=4096))
+        self.assertIsNot(get_model_health(num_ctx=4096), get_model_health(num_ctx=2048))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import os
+import sys
+import tempfile
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+
+from src.utils.prompt_registry import PromptRegistry, get_prompt_registry
+
+class TestPromptRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = PromptRegistry(self.tmp.name)
+        self.write("prompt.txt", 'Return JSON like {\n  "a": 1\n}\nContext: {context} and {missing}.')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text, mtime=None):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_render_replaces_placeholders_only(self):
+        prompt, _ = self.registry.render("prompt.txt", [("{context}", "uses {missing} literally")])
+        self.assertEqual(prompt, 'Return JSON like {\n  "a": 1\n}\nContext: uses {missing} literally and {missing}.')
+
+    def test_non_placeholder_replacements_still_apply(self):
+        prompt, _ = self.registry.render("prompt.txt", [("Return JSON", "Give JSON")])
+        self.assertTrue(prompt.startswith("Give JSON like"))
+
+    def test_template_is_cached_until_file_changes(self):
+        first = self.registry.get("prompt.txt")
+        self.assertIs(self.registry.get("prompt.txt"), first)
+        path = self.write("prompt.txt", "New {context}", mtime=first.stamp[0] / 1e9 + 10)
+        second = self.registry.get(path)
+        self.assertIsNot(second, first)
+        self.assertNotEqual(second.version, first.version)
+        self.assertEqual(second.render([("{context}", "text")]), "New text")
+
+    def test_repo_prompts_render(self):
+        registry = get_prompt_registry()
+        for name in os.listdir(registry.prompts_dir):
+            template = registry.get(name)
+            self.assertEqual(template.render(), template.text)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,18 @@
 import unittest
+import asyncio
+import json
 import os
 import sys
+import threading
+import time
+from unittest import mock
 sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 sys.path.insert(0, sysPath)
 
-from src.utils.qwen_summarizer import QwenSummarizer
+import requests
+from benchmarks.fake_ollama import FakeOllamaServer
+from src.utils.qwen_summarizer import QwenSummarizer, get_shared_session, get_model_metrics
+from src.utils.tracing import Trace
 
 class TestQwenSummarizer(unittest.TestCase):
     @classmethod
@@ -98,5 +106,182 @@ class TestQwenSummarizer(unittest.TestCase):
         except Exception as e:
             self.skipTest(f"Qwen API not available or failed: {e}")
 
+def make_response(status_code, body=None):
+    response = mock.Mock(status_code=status_code)
+    response.json.return_value = body or {}
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(f"{status_code} error")
+    return response
+
+class TestQwenSummarizerTransport(unittest.TestCase):
+    def setUp(self):
+        self.summarizer = QwenSummarizer(connect_timeout=1, read_timeout=30, retry_backoff=0)
+        self.session = mock.Mock()
+        self.summarizer.session = self.session
+
+    def test_instances_share_one_session(self):
+        self.assertIs(QwenSummarizer().session, get_shared_session())
+        self.assertIs(QwenSummarizer(model="other").session, get_shared_session())
+
+    def test_timeouts_are_passed(self):
+        self.session.post.return_value = make_response(200, {"response": "ok"})
+        self.assertEqual(self.summarizer.summarize_from_text("hi"), "ok")
+        self.assertEqual(self.session.post.call_args.kwargs["timeout"], (1, 30))
+
+    def test_retries_transient_errors(self):
+        self.session.post.side_effect = [
+            requests.exceptions.ConnectionError("refused"),
+            make_response(503),
+            make_response(200, {"response": "ok"}),
+        ]
+        self.assertEqual(self.summarizer.summarize_from_text("hi"), "ok")
+        self.assertEqual(self.session.post.call_count, 3)
+
+    def test_gives_up_after_max_retries(self):
+        self.summarizer.max_retries = 2
+        self.session.post.side_effect = requests.exceptions.ConnectionError("refused")
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.summarizer.summarize_from_text("hi")
+        self.assertEqual(self.session.post.call_count, 3)
+
+    def test_read_timeout_is_not_retried(self):
+        self.session.post.side_effect = requests.exceptions.ReadTimeout("hung")
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            self.summarizer.summarize_from_text("hi")
+        self.assertEqual(self.session.post.call_count, 1)
+
+    def test_warm_up_sends_empty_prompt_with_request_options(self):
+        self.summarizer.num_ctx = 8192
+        self.summarizer.keep_alive = "30m"
+        self.session.post.return_value = make_response(200, {"response": "", "done": True})
+        self.assertTrue(self.summarizer.warm_up()["status"])
+        payload = json.loads(self.session.post.call_args.kwargs["data"])
+        self.assertEqual(payload["prompt"], "")
+        self.assertEqual(payload["keep_alive"], "30m")
+        self.assertEqual(payload["options"], {"num_ctx": 8192})
+
+class TestQwenSummarizerFakeServer(unittest.TestCase):
+    """End-to-end calls against the benchmark suite's stand-in Ollama server."""
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOllamaServer(tokens_per_second=0, first_token_latency=0,
+                                      response_text="<think>plan</think>\nUpdated the parser.").start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_stream_and_non_stream(self):
+        summarizer = QwenSummarizer(host=self.server.url)
+        self.assertTrue(summarizer.check_ollama_and_model()["status"])
+        self.assertEqual(summarizer.summarize_from_text("hi"), "Updated the parser.")
+        chunks = []
+        result = summarizer.summarize_from_text("hi", stream=True, callback=lambda chunk, done: chunks.append((chunk, done)))
+        self.assertEqual(result, "Updated the parser.")
+        self.assertEqual(chunks[-1], ("Updated the parser.", True))
+        self.assertEqual("".join(chunk for chunk, done in chunks[:-1]), "Updated the parser.")
+
+    def test_model_span_records_ollama_metrics(self):
+        summarizer = QwenSummarizer(host=self.server.url)
+        trace = Trace("test")
+        with trace.activate():
+            summarizer.summarize_from_text("hi", stream=True, callback=lambda chunk, done: None)
+        attributes = trace.spans[0].attributes
+        self.assertEqual(trace.spans[0].name, "model.generate")
+        self.assertGreater(attributes["eval_count"], 0)
+        self.assertIn("first_token_seconds", attributes)
+
+    def test_get_model_metrics_converts_durations(self):
+        metrics = get_model_metrics({"eval_count": 100, "eval_duration": 2_000_000_000, "load_duration": 500_000_000,
+                                     "prompt_eval_count": 50, "prompt_eval_duration": 250_000_000, "response": "x"})
+        self.assertEqual(metrics["eval_duration"], 2.0)
+        self.assertEqual(metrics["load_duration"], 0.5)
+        self.assertEqual(metrics["tokens_per_second"], 50.0)
+        self.assertEqual(metrics["prompt_tokens_per_second"], 200.0)
+        self.assertNotIn("response", metrics)
+
+class TestQwenSummarizerAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrency_limit(self):
+        summarizer = QwenSummarizer(max_concurrency=2)
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def fake_summarize(prompt_text, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return f"summary of {prompt_text}"
+
+        with mock.patch.object(summarizer, "summarize_from_text", side_effect=fake_summarize):
+            results = await asyncio.gather(*(summarizer.asummarize_from_text(f"p{i}") for i in range(6)))
+        self.assertEqual(results, [f"summary of p{i}" for i in range(6)])
+        self.assertEqual(peak[0], 2)
+
+    async def test_stream_yields_chunks(self):
+        summarizer = QwenSummarizer()
+
+        def fake_stream(prompt_text, stream=False, callback=None, remove_think=True):
+            for chunk in ("Hello", ", ", "world"):
+                callback(chunk, False)
+            callback("Hello, world", True)
+            return "Hello, world"
+
+        with mock.patch.object(summarizer, "summarize_from_text", side_effect=fake_stream):
+            chunks = [chunk async for chunk in summarizer.astream("hi")]
+        self.assertEqual(chunks, ["Hello", ", ", "world"])
+
+    async def test_stream_of_cached_summary(self):
+        summarizer = QwenSummarizer()
+
+        def fake_cached(prompt_text, stream=False, callback=None, remove_think=True):
+            callback("cached summary", True)
+            return "cached summary"
+
+        with mock.patch.object(summarizer, "summarize_from_text", side_effect=fake_cached):
+            chunks = [chunk async for chunk in summarizer.astream("hi")]
+        self.assertEqual(chunks, ["cached summary"])
+
+    async def test_stream_raises_errors(self):
+        summarizer = QwenSummarizer()
+        with mock.patch.object(summarizer, "summarize_from_text", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                async for _ in summarizer.astream("hi"):
+                    pass
+
+    async def test_abandoned_streams_keep_their_slot_until_stopped(self):
+        summarizer = QwenSummarizer(max_concurrency=4)
+        active, peak, sent = [0], [0], []
+        lock = threading.Lock()
+
+        def fake_stream(prompt_text, stream=False, callback=None, remove_think=True):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            try:
+                for i in range(50):
+                    if callback:
+                        callback(f"{i} ", False)
+                    sent.append(prompt_text)
+                    time.sleep(0.01)
+                return "done"
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        with mock.patch.object(summarizer, "summarize_from_text", side_effect=fake_stream):
+            streams = [summarizer.astream(f"p{i}") for i in range(4)]
+            for agen in streams:
+                await agen.__anext__()
+            for agen in streams:
+                await agen.aclose()
+            # Starts only once an abandoned generation has stopped
+            self.assertEqual(await summarizer.asummarize_from_text("p4"), "done")
+        self.assertEqual(peak[0], 4)
+        # The abandoned generations stopped at their next chunk instead of running to the end
+        self.assertLess(sum(1 for prompt in sent if prompt != "p4"), 4 * 50)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import os
+import sys
+import threading
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+
+from src.utils.single_flight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.flights = SingleFlight()
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def work(self, callback):
+        self.calls += 1
+        callback("Hello", False)
+        self.started.set()
+        self.release.wait(timeout=5)
+        callback(" world", False)
+        callback("Hello world", True)
+        return "Hello world"
+
+    def run_in_thread(self, key, events, results):
+        def target():
+            try:
+                results.append(self.flights.run(key, self.work, callback=lambda chunk, done: events.append((chunk, done))))
+            except Exception as e:
+                results.append(e)
+        thread = threading.Thread(target=target)
+        thread.start()
+        return thread
+
+    def test_concurrent_callers_share_one_run_and_stream(self):
+        leader_events, follower_events, results = [], [], []
+        leader = self.run_in_thread("key", leader_events, results)
+        self.assertTrue(self.started.wait(timeout=5))
+        # Joins after the first chunk was sent: it is replayed
+        follower = self.run_in_thread("key", follower_events, results)
+        while self.flights.in_flight() and not follower_events:
+            threading.Event().wait(0.01)
+        self.release.set()
+        leader.join(timeout=5)
+        follower.join(timeout=5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ["Hello world", "Hello world"])
+        expected = [("Hello", False), (" world", False), ("Hello world", True)]
+        self.assertEqual(leader_events, expected)
+        self.assertEqual(follower_events, expected)
+        self.assertEqual(self.flights.in_flight(), 0)
+
+    def test_different_keys_run_separately(self):
+        self.release.set()
+        self.flights.run("a", self.work)
+        self.flights.run("b", self.work)
+        self.assertEqual(self.calls, 2)
+
+    def test_errors_reach_every_caller(self):
+        gate = threading.Event()
+        def failing(callback):
+            gate.wait(timeout=5)
+            raise ValueError("boom")
+        results = []
+        def target():
+            try:
+                self.flights.run("key", failing)
+            except ValueError as e:
+                results.append(e)
+        threads = [threading.Thread(target=target) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        while self.flights.in_flight() == 0:
+            threading.Event().wait(0.01)
+        gate.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.flights.in_flight(), 0)
+
+if __name__ == "__main__":
+    unittest.main()
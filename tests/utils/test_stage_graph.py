@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+import threading
+import time
+
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+from src.utils.stage_graph import StageGraph, StopStages
+from src.utils.tracing import Trace, span
+
+class TestStageGraph(unittest.TestCase):
+    def test_results_are_passed_to_dependent_stages(self):
+        stages = StageGraph()
+        stages.add("a", lambda: 1)
+        stages.add("b", lambda: 2)
+        stages.add("sum", lambda a, b: a + b, depends_on=("a", "b"))
+        stages.add("last", lambda: "done", after=("sum",))
+        self.assertEqual(stages.run(), {"a": 1, "b": 2, "sum": 3, "last": "done"})
+
+    def test_independent_stages_overlap(self):
+        barrier = threading.Barrier(2, timeout=5)
+        stages = StageGraph()
+        # Each stage waits for the other, so this only finishes if they run at the same time
+        stages.add("scan", barrier.wait)
+        stages.add("model", barrier.wait)
+        self.assertEqual(sorted(stages.run()), ["model", "scan"])
+
+    def test_after_waits_without_passing_the_result(self):
+        order = []
+        stages = StageGraph()
+        stages.add("check", lambda: (time.sleep(0.1), order.append("check")))
+        stages.add("work", lambda: order.append("work"), after=("check",))
+        stages.run()
+        self.assertEqual(order, ["check", "work"])
+
+    def test_errors_stop_later_stages(self):
+        started = []
+        stages = StageGraph()
+        stages.add("fail", lambda: 1 / 0)
+        stages.add("next", lambda fail: started.append("next"), depends_on=("fail",))
+        with self.assertRaises(ZeroDivisionError):
+            stages.run()
+        self.assertEqual(started, [])
+
+        def stop():
+            raise StopStages("model is down")
+        stages = StageGraph()
+        stages.add("health_check", stop)
+        stages.add("summary", lambda: started.append("summary"), after=("health_check",))
+        with self.assertRaises(StopStages) as raised:
+            stages.run()
+        self.assertEqual(raised.exception.value, "model is down")
+        self.assertEqual(started, [])
+
+    def test_invalid_graphs(self):
+        stages = StageGraph()
+        stages.add("a", lambda: 1)
+        with self.assertRaises(ValueError):
+            stages.add("a", lambda: 2)
+        with self.assertRaises(ValueError):
+            stages.add("b", lambda c: c, depends_on=("c",))
+
+    def test_spans_belong_to_the_active_trace(self):
+        def stage():
+            with span("stage.work"):
+                pass
+        stages = StageGraph()
+        stages.add("work", stage)
+        trace = Trace("run")
+        with trace.activate():
+            stages.run()
+        self.assertEqual([s.name for s in trace.spans], ["stage.work"])
+
+if __name__ == "__main__":
+    unittest.main()
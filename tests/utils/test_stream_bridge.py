@@ -0,0 +1,48 @@
+import unittest
+import os
+import sys
+import threading
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+
+from src.utils.stream_bridge import StreamBridge
+
+class TestStreamBridge(unittest.TestCase):
+    def test_yields_text_before_target_returns(self):
+        release = threading.Event()
+        def target(callback=None):
+            callback("Hello", False)
+            # Blocks until the consumer has seen the first chunk
+            if not release.wait(timeout=5):
+                raise RuntimeError("first chunk was not delivered while the target was running")
+            callback(" world", False)
+            callback("Hello world", True)
+            return "Hello world"
+        bridge = StreamBridge()
+        updates = []
+        for text in bridge.run(target):
+            updates.append(text)
+            release.set()
+        self.assertEqual(updates, ["Hello", "Hello world"])
+        self.assertEqual(bridge.result, "Hello world")
+
+    def test_passes_arguments_and_ignores_final_callback(self):
+        def target(value, callback=None, suffix=""):
+            callback("done", True)
+            return value + suffix
+        bridge = StreamBridge()
+        self.assertEqual(list(bridge.run(target, "a", suffix="b")), [])
+        self.assertEqual(bridge.result, "ab")
+
+    def test_reraises_target_errors(self):
+        def target(callback=None):
+            callback("partial", False)
+            raise ValueError("boom")
+        bridge = StreamBridge()
+        with self.assertRaises(ValueError):
+            for _ in bridge.run(target):
+                pass
+        self.assertEqual(bridge.text, "partial")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from unittest import mock
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+
+from src.utils.qwen_summarizer import QwenSummarizer
+from src.utils.summary_cache import SummaryCache
+
+class TestSummaryCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_key_depends_on_model_template_and_prompt(self):
+        key = SummaryCache.make_key("qwen3", "v1", "prompt")
+        self.assertEqual(key, SummaryCache.make_key("qwen3", "v1", "prompt"))
+        self.assertNotEqual(key, SummaryCache.make_key("qwen2", "v1", "prompt"))
+        self.assertNotEqual(key, SummaryCache.make_key("qwen3", "v2", "prompt"))
+        self.assertNotEqual(key, SummaryCache.make_key("qwen3", "v1", "prompt!"))
+        self.assertNotEqual(key, SummaryCache.make_key("qwen3", "v1", "prompt", remove_think=False))
+
+    def test_memory_lru_eviction(self):
+        cache = SummaryCache(cache_dir=None, max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+        self.assertEqual(cache.get("a"), "A")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "C")
+
+    def test_persists_to_disk(self):
+        SummaryCache(cache_dir=self.cache_dir).put("key", "summary")
+        self.assertEqual(SummaryCache(cache_dir=self.cache_dir).get("key"), "summary")
+
+    def test_disk_eviction(self):
+        cache = SummaryCache(cache_dir=self.cache_dir, max_disk_entries=3)
+        for i in range(5):
+            cache.put(f"key{i}", "summary")
+        cache._evict_disk()
+        self.assertEqual(len(os.listdir(self.cache_dir)), 3)
+
+class TestQwenSummarizerCache(unittest.TestCase):
+    def setUp(self):
+        self.summarizer = QwenSummarizer(summary_cache=SummaryCache(cache_dir=None))
+        self.prompt_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src/prompts/summarize_file_changes.txt'))
+
+    def test_cache_hit_skips_model(self):
+        with mock.patch.object(self.summarizer, "_post_to_model", return_value={"response": "<think>x</think>Done"}) as post:
+            first = self.summarizer.summarize(self.prompt_file, replacements=[("{file_changes_context}", "diff")])
+            second = self.summarizer.summarize(self.prompt_file, replacements=[("{file_changes_context}", "diff")])
+            other = self.summarizer.summarize(self.prompt_file, replacements=[("{file_changes_context}", "other diff")])
+        self.assertEqual(first, "Done")
+        self.assertEqual(second, "Done")
+        self.assertEqual(other, "Done")
+        self.assertEqual(post.call_count, 2)
+
+    def test_force_refresh_calls_model_and_updates_cache(self):
+        self.summarizer.summary_cache.put(SummaryCache.make_key("qwen3", "", "hello", remove_think=True, num_ctx=None), "stale")
+        with mock.patch.object(self.summarizer, "_post_to_model", return_value={"response": "fresh"}) as post:
+            self.assertEqual(self.summarizer.summarize_from_text("hello", force_refresh=True), "fresh")
+            self.assertEqual(self.summarizer.summarize_from_text("hello"), "fresh")
+        self.assertEqual(post.call_count, 1)
+
+    def test_streaming_hit_calls_callback(self):
+        chunks = []
+        self.summarizer.summary_cache.put(SummaryCache.make_key("qwen3", "", "hello", remove_think=True, num_ctx=None), "cached")
+        with mock.patch.object(self.summarizer, "_post_to_model") as post:
+            result = self.summarizer.summarize_from_text("hello", stream=True, callback=lambda c, d: chunks.append((c, d)))
+        post.assert_not_called()
+        self.assertEqual(result, "cached")
+        self.assertEqual(chunks, [("cached", True)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import json
+import os
+import random
+import re
+import sys
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+
+from src.utils.qwen_summarizer import QwenSummarizer
+from src.utils.think_filter import ThinkTagFilter
+
+THINK_RE = re.compile(r'<think>.*?</think>\s*', re.DOTALL)
+
+def run_filter(chunks):
+    think_filter = ThinkTagFilter()
+    out = [think_filter.feed(chunk) for chunk in chunks]
+    out.append(think_filter.flush())
+    return ''.join(out)
+
+def random_chunks(text, rng):
+    chunks, i = [], 0
+    while i < len(text):
+        size = rng.randint(1, 6)
+        chunks.append(text[i:i + size])
+        i += size
+    return chunks
+
+class TestThinkTagFilter(unittest.TestCase):
+    SAMPLES = [
+        "<think>reasoning</think>\n\nAnswer",
+        "Before <think>a</think> middle <think>b\nc</think>   after",
+        "No tags at all, but a < sign and <thin words",
+        "<think>nested <think> open</think>Rest",
+        "Ends with a partial <thi",
+        "<think></think>",
+        "Text </think> stray close",
+    ]
+
+    def test_matches_regex_for_any_chunking(self):
+        rng = random.Random(42)
+        for sample in self.SAMPLES:
+            expected = THINK_RE.sub('', sample)
+            self.assertEqual(run_filter([sample]), expected)
+            for _ in range(50):
+                self.assertEqual(run_filter(random_chunks(sample, rng)), expected, sample)
+
+    def test_tags_split_one_char_per_chunk(self):
+        sample = "A<think>hidden</think>  B"
+        self.assertEqual(run_filter(list(sample)), "AB")
+
+    def test_unclosed_think_is_dropped(self):
+        self.assertEqual(run_filter(["Visible <think>never", " closed"]), "Visible ")
+
+    def test_emits_visible_text_early(self):
+        think_filter = ThinkTagFilter()
+        self.assertEqual(think_filter.feed("Hello <"), "Hello ")
+        self.assertEqual(think_filter.feed("b>bold"), "<b>bold")
+
+class FakeStreamingResponse:
+    def __init__(self, chunks):
+        lines = [json.dumps({"response": chunk, "done": False}) for chunk in chunks]
+        lines.append(json.dumps({"response": "", "done": True}))
+        self.lines = [line.encode('utf-8') for line in lines]
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+    def close(self):
+        pass
+
+class TestStreamingResponse(unittest.TestCase):
+    def test_streaming_callback_receives_clean_chunks_then_full_text(self):
+        calls = []
+        chunks = ["<thi", "nk>plan", "ning</th", "ink>\n", "Hello", " world"]
+        data = QwenSummarizer()._handle_streaming_response(FakeStreamingResponse(chunks), lambda c, d: calls.append((c, d)))
+        self.assertEqual(data["response"], "".join(chunks))
+        self.assertEqual(calls, [("Hello", False), (" world", False), ("Hello world", True)])
+
+    def test_streaming_without_remove_think(self):
+        calls = []
+        chunks = ["<think>x</think>", "Hi"]
+        QwenSummarizer()._handle_streaming_response(FakeStreamingResponse(chunks), lambda c, d: calls.append((c, d)), remove_think=False)
+        self.assertEqual(calls, [("<think>x</think>", False), ("Hi", False), ("<think>x</think>Hi", True)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+sysPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, sysPath)
+
+from src.utils.tracing import Trace, span, propagate, get_current_trace
+
+class TestTracing(unittest.TestCase):
+    def test_spans_nest_and_record_attributes(self):
+        trace = Trace("run")
+        with trace.activate():
+            with span("outer", repos=2) as outer:
+                with span("inner"):
+                    pass
+                outer.set(files=5)
+        trace.finish()
+        spans = trace.to_dict()["spans"]
+        self.assertEqual([s["name"] for s in spans], ["outer", "inner"])
+        self.assertEqual(spans[1]["parent"], spans[0]["id"])
+        self.assertEqual(spans[0]["attributes"], {"repos": 2, "files": 5})
+        self.assertIsNotNone(spans[0]["duration"])
+
+    def test_no_spans_without_trace(self):
+        with span("ignored") as ignored:
+            ignored.set(value=1)
+        self.assertIsNone(get_current_trace())
+
+    def test_propagate_nests_worker_spans(self):
+        trace = Trace("run")
+        with trace.activate(), span("scan"):
+            def work(i):
+                with span("repo", index=i):
+                    return i
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                futures = [executor.submit(propagate(work), i) for i in range(3)]
+                self.assertEqual([f.result() for f in futures], [0, 1, 2])
+        scan, *repos = trace.spans
+        self.assertEqual(len(repos), 3)
+        self.assertTrue(all(s.parent == scan.id for s in repos))
+
+    def test_bind_runs_function_in_trace(self):
+        trace = Trace("run")
+        def work():
+            with span("bound"):
+                return get_current_trace()
+        self.assertIs(trace.bind(work)(), trace)
+        self.assertEqual(trace.spans[0].name, "bound")
+
+    def test_write_log_and_table(self):
+        trace = Trace("run", tool="test")
+        with trace.activate(), span("stage", tokens_per_second=12.5):
+            pass
+        trace.finish()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "logs", "traces.jsonl")
+            trace.write_log(path)
+            trace.write_log(path)
+            with open(path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0]["attributes"], {"tool": "test"})
+        table = trace.format_table()
+        self.assertIn("| stage |", table)
+        self.assertIn("tokens_per_second=12.5", table)
+
+if __name__ == "__main__":
+    unittest.main()